@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Echo-server benchmark for iran_encoding.aio.
+
+A local TCP server transcodes each connection from UTF-8 to Iran System
+with aio.transcode_stream() and sends the result back. Clients stream the
+text of tests/corpus.json through it while a monitor task measures how
+late the event loop wakes from 1 ms sleeps. The run is repeated with the
+conversion on the event loop and offloaded to an executor, and the outputs
+are checked against core.unicode_to_iransystem.
+
+Usage:
+    python benchmarks/bench_aio.py [--size MB] [--clients N] [--read-size BYTES]
+                                   [--backend NAME]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from iran_encoding import aio, backends, core  # noqa: E402
+from tests.test_core import load_corpus_text  # noqa: E402
+
+SEND_SIZE = 1 << 16
+
+
+async def monitor_lag(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(1e-3)
+        lags.append(time.perf_counter() - start - 1e-3)
+
+
+async def client(address, data):
+    reader, writer = await asyncio.open_connection(*address)
+
+    async def send():
+        for start in range(0, len(data), SEND_SIZE):
+            writer.write(data[start:start + SEND_SIZE])
+            await writer.drain()
+        writer.write_eof()
+
+    sender = asyncio.create_task(send())
+    received = await reader.read()
+    await sender
+    writer.close()
+    return received
+
+
+async def run(data, clients, read_size, offload_threshold):
+    async def handle(reader, writer):
+        await aio.transcode_stream(reader, writer, 'utf-8', 'iran_system',
+                                   read_size=read_size, offload_threshold=offload_threshold)
+        writer.close()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', 0)
+    address = server.sockets[0].getsockname()[:2]
+    lags, stop = [], asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(lags, stop))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client(address, data) for _ in range(clients)))
+    seconds = time.perf_counter() - start
+    stop.set()
+    await monitor
+    server.close()
+    await server.wait_closed()
+    return results, seconds, sorted(lags)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the asyncio transcoder.")
+    parser.add_argument("--size", type=float, default=8, help="MB of UTF-8 text per client.")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent connections.")
+    parser.add_argument("--read-size", type=int, default=aio.READ_SIZE, help="Bytes read per conversion.")
+    parser.add_argument("--backend", default=None, help="Default conversion backend.")
+    args = parser.parse_args()
+    if args.backend:
+        backends.set_default_backend(args.backend)
+
+    text = load_corpus_text() + "\n"
+    text = text * max(int(args.size * 1e6 / len(text.encode('utf-8'))), 1)
+    data = text.encode('utf-8')
+    expected = core.unicode_to_iransystem(text)
+    print(f"{args.clients} clients x {len(data) / 1e6:.1f} MB, reads of {args.read_size} bytes")
+
+    for label, threshold in (("inline", float('inf')), ("executor", 0)):
+        results, seconds, lags = asyncio.run(run(data, args.clients, args.read_size, threshold))
+        if any(result != expected for result in results):
+            raise SystemExit(f"{label}: echoed output differs from unicode_to_iransystem")
+        p99 = lags[min(int(0.99 * len(lags)), len(lags) - 1)] * 1e3 if lags else float('nan')
+        worst = lags[-1] * 1e3 if lags else float('nan')
+        print(f"{label:<9} {args.clients * len(data) / seconds / 1e6:>8.1f} MB/s   "
+              f"loop lag p99 {p99:>7.2f} ms  max {worst:>7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the pure Python engine in iran_encoding.core.
+
+Compares the table-driven shaping and decoding against per-byte
+reference loops built on find_pos, using the news corpus from tests/,
+and unicode_to_iransystem against the word-memoizing core.WordEncoder.
+
+Usage:
+    python benchmarks/bench_core.py [--repeat N]
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from iran_encoding import core  # noqa: E402
+
+
+def load_corpus_text():
+    """Join every string field of tests/corpus.json into one document."""
+    with open(ROOT / "tests" / "corpus.json", encoding="utf-8") as f:
+        corpus = json.load(f)
+    return "\n".join(v for item in corpus for v in item.values() if isinstance(v, str))
+
+
+def reference_shape(script_bytes):
+    """Per-byte shaping with linear table scans, as the engine used to work."""
+    result = bytearray(script_bytes)
+    length = len(script_bytes)
+    for i in range(length):
+        prev_byte = script_bytes[i - 1] if i > 0 else 0
+        next_byte = script_bytes[i + 1] if i < length - 1 else 0
+        result[i] = core._contextual_form(
+            script_bytes[i],
+            core.find_pos(prev_byte, core.PREV_CHAR_STR) >= 0,
+            core.find_pos(next_byte, core.NEXT_CHAR_STR) >= 0,
+        )
+    return bytes(result)
+
+
+def reference_decode(in_bytes):
+    """Two-stage per-byte decode with linear table scans."""
+    upper = core.iransystem_to_upper(in_bytes)
+    script = core.iransystem_to_unicode_script(upper)
+    return "".join(chr(core.persian_script_to_unicode(b)) for b in script)
+
+
+def measure(func, arg, repeat):
+    """Return the best time per call in microseconds."""
+    timer = timeit.Timer(lambda: func(arg))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def report(label, baseline, candidate, arg, repeat):
+    """Print timings of a baseline and candidate implementation."""
+    if baseline(arg) != candidate(arg):
+        raise SystemExit(f"{label}: outputs differ")
+    before = measure(baseline, arg, repeat)
+    after = measure(candidate, arg, repeat)
+    print(f"{label:<28} {before:>12.1f} us {after:>12.1f} us {before / after:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pure Python core.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions.")
+    args = parser.parse_args()
+
+    text = load_corpus_text()
+    script = core.reverse_alpha_numeric(
+        bytes(core.unicode_to_persian_script(ord(c)) for c in text)
+    )
+    encoded = core.unicode_to_iransystem(text)
+
+    print(f"corpus: {len(text)} characters")
+    print(f"{'':<28} {'reference':>15} {'table':>15} {'speedup':>9}")
+    report("shaping (corpus)", reference_shape, core.shape_script, script, args.repeat)
+    report("shaping (12 bytes)", reference_shape, core.shape_script, script[:12], args.repeat)
+    report("decode (corpus)", reference_decode, core.iransystem_to_unicode, encoded, args.repeat)
+    report("decode (corpus x 100)", reference_decode, core.iransystem_to_unicode,
+           encoded * 100, args.repeat)
+    report("encode words (corpus x 100)", core.unicode_to_iransystem, core.WordEncoder(),
+           text * 100, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,556 @@
+/*
+ * Microbenchmark for the C conversions in iran_encoding/iran_system.c,
+ * runnable without Python. Every function is checked against a copy of
+ * its FindPos-based implementation (the "legacy" column, kept verbatim
+ * below) and both are timed on the same synthetic text.
+ *
+ * Build and run from the repository root:
+ *
+ *     gcc -O3 -Iiran_encoding -o bench_iran_system \
+ *         benchmarks/bench_iran_system.c iran_encoding/iran_system.c
+ *     ./bench_iran_system [megabytes]     # default 4
+ *     ./bench_iran_system --check         # verify only, exit status 1 on mismatch
+ *
+ * Throughput is input characters per second, in millions (MB/s for the
+ * byte-oriented functions).
+ */
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include "iran_system.h"
+
+extern unsigned char reverseAlphaNumericFlag;
+
+/* ---- Legacy implementations, before the lookup tables ---- */
+
+static unsigned char legacyReverseFlag = 1;
+
+static void LegacyIransystemToUpper(unsigned char *inString, unsigned char *outString) {
+    unsigned int byteCount;
+    unsigned int len = strlen((char*)inString);
+    int posIndex;
+    for (byteCount = 0; byteCount < len; byteCount++) {
+        posIndex = FindPos(inString[byteCount], iransystemLowerStr);
+        if (posIndex < 0) {
+            posIndex = FindPos(inString[byteCount], iransystemLowerStrTail);
+            outString[byteCount] = (posIndex < 0) ? inString[byteCount] : iransystemUpperStrTail[posIndex / 3];
+        } else {
+            outString[byteCount] = iransystemUpperStr[posIndex];
+        }
+    }
+    outString[len] = 0;
+}
+
+static void LegacyReverseIransystem(unsigned char *inString, unsigned char *outString) {
+    unsigned int byteCount, numberCount;
+    unsigned int numberPosition = 0;
+    unsigned int len = strlen((char*)inString);
+
+    for (byteCount = 0; byteCount <= len; byteCount++) {
+        unsigned char current = (byteCount < len) ? inString[byteCount] : 0x20; // Space as end marker
+
+        if (current < 80) {
+            if ((byteCount - numberPosition) > 1) {
+                for (numberCount = numberPosition; numberCount < byteCount; numberCount++) {
+                    outString[numberCount] = inString[byteCount - (numberCount - numberPosition) - 1];
+                }
+            }
+            numberPosition = byteCount + 1;
+            if (byteCount < len) {
+                outString[byteCount] = inString[byteCount];
+            }
+        }
+    }
+    outString[len] = 0;
+}
+
+static void LegacyIransystemToUnicode(unsigned char *inString, unsigned char *outString) {
+    unsigned int byteCount;
+    unsigned int len = strlen((char*)inString);
+    int posIndex;
+    for (byteCount = 0; byteCount < len; byteCount++) {
+        posIndex = FindPos(inString[byteCount], iransystemUpperStr);
+        if (posIndex < 0) {
+            posIndex = FindPos(inString[byteCount], iransystemUpperStrTail);
+            outString[byteCount] = (posIndex < 0) ? inString[byteCount] : unicodeStrTail[posIndex];
+        } else {
+            outString[byteCount] = unicodeStr[posIndex];
+        }
+    }
+    outString[len] = 0;
+}
+
+static void LegacyReverseAlphaNumeric(unsigned char *inString, unsigned char *outString) {
+    unsigned int byteCount, numberCount;
+    unsigned int numberPosition = 0;
+    unsigned int len = strlen((char*)inString);
+
+    for (byteCount = 0; byteCount <= len; byteCount++) {
+        unsigned char current = (byteCount < len) ? inString[byteCount] : 0xFF;
+
+        if (current > 0x7E || current < 0x20) {
+            if ((byteCount - numberPosition) > 1) {
+                for (numberCount = numberPosition; numberCount < byteCount; numberCount++) {
+                    outString[numberCount] = inString[byteCount - (numberCount - numberPosition) - 1];
+                }
+            }
+            numberPosition = byteCount + 1;
+        }
+        if (byteCount < len) {
+            outString[byteCount] = inString[byteCount];
+        }
+    }
+    outString[len] = 0;
+}
+
+static void LegacyUnicodeNumberToIransystem(unsigned char *unicodeString, unsigned char *iransystemString) {
+    unsigned int byteCount;
+    unsigned int len = strlen((char*)unicodeString);
+    int posIndex;
+    if (!len) {
+        iransystemString[0] = 0;
+        return;
+    }
+    for (byteCount = 0; byteCount < len; byteCount++) {
+        iransystemString[byteCount] = unicodeString[byteCount];
+        posIndex = FindPos(iransystemString[byteCount], unicodeNumberStr);
+        if (posIndex >= 0) {
+            iransystemString[byteCount] = iransystemNumberStr[posIndex];
+        }
+    }
+    iransystemString[len] = 0;
+}
+
+static unsigned char LegacyUnicodeToPersianScript(unsigned int unicodeChar) {
+    int posIndex = FindPos16(unicodeChar, wideCharStr);
+    if (posIndex >= 0) {
+        return UTF8Str[posIndex];
+    } else {
+        return (unsigned char)(unicodeChar < 256 ? unicodeChar : '?');
+    }
+}
+
+static void LegacyUnicodeToIransystem(unsigned char *unicodeString, unsigned char *iransystemString) {
+    unsigned char prevByte, nextByte;
+    unsigned int byteCount;
+    unsigned int len;
+    int posIndex;
+
+    len = strlen((char*)unicodeString);
+
+    if (legacyReverseFlag) {
+        LegacyReverseAlphaNumeric(unicodeString, iransystemString);
+    } else {
+        strcpy((char*)iransystemString, (char*)unicodeString);
+    }
+
+    len = strlen((char*)iransystemString);
+    for (byteCount = 0; byteCount < len; byteCount++) {
+        prevByte = (byteCount > 0) ? iransystemString[byteCount - 1] : 0;
+        nextByte = (byteCount < (len - 1)) ? iransystemString[byteCount + 1] : 0;
+
+        posIndex = FindPos(iransystemString[byteCount], unicodeStr);
+        if (posIndex >= 0) {
+            if (FindPos(nextByte, nextCharStr) >= 0) {
+                iransystemString[byteCount] = iransystemLowerStr[posIndex];
+            } else {
+                iransystemString[byteCount] = iransystemUpperStr[posIndex];
+            }
+        } else {
+            switch (iransystemString[byteCount]) {
+                case 218: // ein
+                    if (FindPos(nextByte, nextCharStr) >= 0) {
+                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 227;
+                        else iransystemString[byteCount] = 228;
+                    } else {
+                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 226;
+                        else iransystemString[byteCount] = 225;
+                    }
+                    break;
+                case 219: // ghein
+                    if (FindPos(nextByte, nextCharStr) >= 0) {
+                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 231;
+                        else iransystemString[byteCount] = 232;
+                    } else {
+                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 230;
+                        else iransystemString[byteCount] = 229;
+                    }
+                    break;
+                case 229: // he
+                    if (FindPos(nextByte, nextCharStr) >= 0) {
+                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 250;
+                        else iransystemString[byteCount] = 251;
+                    } else {
+                        iransystemString[byteCount] = 249;
+                    }
+                    break;
+                case 199: // alef
+                    if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 145;
+                    else iransystemString[byteCount] = 144;
+                    break;
+                case 237: // ye
+                    if (FindPos(nextByte, nextCharStr) >= 0) iransystemString[byteCount] = 254;
+                    else {
+                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 252;
+                        else iransystemString[byteCount] = 253;
+                    }
+                    break;
+            }
+        }
+    }
+    iransystemString[len] = 0;
+}
+
+/* Contextual form of a script byte; the ladder above plus digit mapping. */
+static unsigned char LegacyShapeScriptByte(unsigned char current, int prevConnects, int nextConnects) {
+    int posIndex = FindPos(current, unicodeStr);
+    if (posIndex >= 0) {
+        return nextConnects ? iransystemLowerStr[posIndex] : iransystemUpperStr[posIndex];
+    }
+    switch (current) {
+        case 218: // ein
+            if (nextConnects) return prevConnects ? 227 : 228;
+            return prevConnects ? 226 : 225;
+        case 219: // ghein
+            if (nextConnects) return prevConnects ? 231 : 232;
+            return prevConnects ? 230 : 229;
+        case 229: // he
+            if (nextConnects) return prevConnects ? 250 : 251;
+            return 249;
+        case 199: // alef
+            return prevConnects ? 145 : 144;
+        case 237: // ye
+            if (nextConnects) return 254;
+            return prevConnects ? 252 : 253;
+    }
+    posIndex = FindPos(current, unicodeNumberStr);
+    return (posIndex >= 0) ? iransystemNumberStr[posIndex] : current;
+}
+
+/* Reverse each run of two or more printable ASCII bytes in place. */
+static void LegacyReverseAlphaNumericRuns(uint8_t *buffer, size_t length) {
+    size_t byteCount, numberPosition = 0, left, right;
+    uint8_t current, swap;
+    for (byteCount = 0; byteCount <= length; byteCount++) {
+        current = (byteCount < length) ? buffer[byteCount] : 0xFF;
+        if (current > 0x7E || current < 0x20) {
+            for (left = numberPosition, right = byteCount; left + 1 < right; left++, right--) {
+                swap = buffer[left];
+                buffer[left] = buffer[right - 1];
+                buffer[right - 1] = swap;
+            }
+            numberPosition = byteCount + 1;
+        }
+    }
+}
+
+/* Replace script bytes with their contextual forms, judging by the originals. */
+static void LegacyShapeScriptBytes(uint8_t *buffer, size_t length) {
+    size_t byteCount;
+    uint8_t current, prevByte = 0, nextByte;
+    for (byteCount = 0; byteCount < length; byteCount++) {
+        current = buffer[byteCount];
+        nextByte = (byteCount + 1 < length) ? buffer[byteCount + 1] : 0;
+        buffer[byteCount] = LegacyShapeScriptByte(current,
+                                            FindPos(prevByte, prevCharStr) >= 0,
+                                            FindPos(nextByte, nextCharStr) >= 0);
+        prevByte = current;
+    }
+}
+
+/*
+ * Convert script bytes (as produced by UnicodeToPersianScript) to Iran
+ * System. Reentrant replacement for UnicodeToIransystem: the length is
+ * explicit, so NUL bytes are converted rather than ending the input,
+ * options come from `flags` instead of legacyReverseFlag, and ASCII
+ * digits are mapped like core.py does. `out` needs room for `length` bytes
+ * and may be the same buffer as `in`; returns bytes written.
+ */
+static size_t LegacyUnicodeToIransystemEx(const uint8_t *in, size_t length, uint8_t *out, int flags) {
+    if (out != in) {
+        memmove(out, in, length);
+    }
+    if (flags & IRAN_SYSTEM_REVERSE_ALPHANUMERIC) {
+        LegacyReverseAlphaNumericRuns(out, length);
+    }
+    LegacyShapeScriptBytes(out, length);
+    return length;
+}
+
+/*
+ * Convert a whole UTF-32 string to Iran System in one call: code point
+ * mapping followed by UnicodeToIransystemEx with the same `flags`. The
+ * output buffer needs room for `length` bytes; returns bytes written.
+ */
+static size_t LegacyUnicodeToIransystemUtf32(const unsigned int *unicodeString, size_t length,
+                                unsigned char *iransystemString, int flags) {
+    size_t byteCount;
+    for (byteCount = 0; byteCount < length; byteCount++) {
+        iransystemString[byteCount] = LegacyUnicodeToPersianScript(unicodeString[byteCount]);
+    }
+    return LegacyUnicodeToIransystemEx(iransystemString, length, iransystemString, flags);
+}
+
+/* Unicode code point of one Iran System byte: upper form, script, wide. */
+static unsigned int LegacyIransystemByteToUnicode(unsigned char inByte) {
+    unsigned char upperByte, scriptByte;
+    int posIndex = FindPos(inByte, iransystemLowerStr);
+    if (posIndex >= 0) {
+        upperByte = iransystemUpperStr[posIndex];
+    } else {
+        posIndex = FindPos(inByte, iransystemLowerStrTail);
+        upperByte = (posIndex >= 0) ? iransystemUpperStrTail[posIndex / 3] : inByte;
+    }
+    posIndex = FindPos(upperByte, iransystemUpperStr);
+    if (posIndex >= 0) {
+        scriptByte = unicodeStr[posIndex];
+    } else {
+        posIndex = FindPos(upperByte, iransystemUpperStrTail);
+        scriptByte = (posIndex >= 0) ? unicodeStrTail[posIndex] : upperByte;
+    }
+    posIndex = FindPos(scriptByte, UTF8Str);
+    return (posIndex >= 0) ? wideCharStr[posIndex] : scriptByte;
+}
+
+/*
+ * Decode Iran System bytes straight to UTF-32 code points, folding lower
+ * forms to upper forms on the way, like iransystem_to_unicode in core.py.
+ * Long inputs go through a 256-entry table built on the stack, which keeps
+ * the function reentrant. The output buffer needs room for `length` code
+ * points; returns the number written.
+ */
+static size_t LegacyIransystemToUtf32(const unsigned char *iransystemString, size_t length,
+                         unsigned int *unicodeString) {
+    unsigned int table[256];
+    size_t byteCount;
+    int tableIndex;
+
+    if (length < 256) {
+        for (byteCount = 0; byteCount < length; byteCount++) {
+            unicodeString[byteCount] = LegacyIransystemByteToUnicode(iransystemString[byteCount]);
+        }
+        return length;
+    }
+    for (tableIndex = 0; tableIndex < 256; tableIndex++) {
+        table[tableIndex] = LegacyIransystemByteToUnicode((unsigned char)tableIndex);
+    }
+    for (byteCount = 0; byteCount < length; byteCount++) {
+        unicodeString[byteCount] = table[iransystemString[byteCount]];
+    }
+    return length;
+}
+
+/* ---- Inputs ---- */
+
+static size_t length;
+static unsigned char *scriptText;     /* script bytes, NUL terminated */
+static unsigned char *iransystemText; /* Iran System bytes, NUL terminated */
+static unsigned int *unicodeText;     /* UTF-32 code points */
+static unsigned char *output, *legacyOutput;
+static unsigned int *wideOutput, *legacyWideOutput;
+
+static unsigned int randomState = 12345;
+
+static unsigned int NextRandom(void) {
+    randomState = randomState * 1103515245u + 12345u;
+    return randomState >> 16;
+}
+
+/* Persian words with some English words and numbers mixed in. */
+static void MakeInputs(size_t size) {
+    static const unsigned char tail[] = {0xDA, 0xDB, 0xE5, 0xC7, 0xED};
+    static const char *english[] = {"Iran", "System", "DOS", "2024", "v1.1", "OK"};
+    size_t pos = 0, letters = strlen((const char *)unicodeStr);
+    unsigned int choice, wordLength;
+    int wide;
+    const char *word;
+
+    length = size;
+    scriptText = malloc(size + 1);
+    iransystemText = malloc(size + 1);
+    unicodeText = malloc(size * sizeof(unsigned int));
+    output = malloc(size + 1);
+    legacyOutput = malloc(size + 1);
+    wideOutput = malloc(size * sizeof(unsigned int));
+    legacyWideOutput = malloc(size * sizeof(unsigned int));
+    if (!scriptText || !iransystemText || !unicodeText || !output || !legacyOutput
+            || !wideOutput || !legacyWideOutput) {
+        fprintf(stderr, "out of memory\n");
+        exit(2);
+    }
+
+    while (pos < size) {
+        choice = NextRandom() % 10;
+        if (choice == 0) {
+            for (word = english[NextRandom() % 6]; *word && pos < size; word++) {
+                scriptText[pos++] = (unsigned char)*word;
+            }
+        } else {
+            for (wordLength = 2 + NextRandom() % 6; wordLength && pos < size; wordLength--) {
+                scriptText[pos++] = (NextRandom() % 4)
+                    ? unicodeStr[NextRandom() % letters] : tail[NextRandom() % 5];
+            }
+        }
+        if (pos < size) {
+            scriptText[pos++] = (NextRandom() % 8) ? ' ' : '\n';
+        }
+    }
+    scriptText[size] = 0;
+
+    UnicodeToIransystemEx(scriptText, size, iransystemText, IRAN_SYSTEM_REVERSE_ALPHANUMERIC);
+    for (pos = 0; pos < size; pos += 97) {
+        iransystemText[pos] = (unsigned char)(pos % 255 + 1);  /* every byte value */
+    }
+    iransystemText[size] = 0;
+
+    for (pos = 0; pos < size; pos++) {
+        wide = FindPos(scriptText[pos], UTF8Str);
+        unicodeText[pos] = wide >= 0 ? wideCharStr[wide] : scriptText[pos];
+        if (pos % 101 == 0) {
+            unicodeText[pos] = 0x1F600 + pos % 7;  /* unmapped */
+        }
+    }
+}
+
+/* ---- Benchmarked calls ---- */
+
+static void NewUpper(void) { IransystemToUpper(iransystemText, output); }
+static void OldUpper(void) { LegacyIransystemToUpper(iransystemText, legacyOutput); }
+static void NewToUnicode(void) { IransystemToUnicode(iransystemText, output); }
+static void OldToUnicode(void) { LegacyIransystemToUnicode(iransystemText, legacyOutput); }
+static void NewReverseIransystem(void) { ReverseIransystem(iransystemText, output); }
+static void OldReverseIransystem(void) { LegacyReverseIransystem(iransystemText, legacyOutput); }
+static void NewReverseAlphaNumeric(void) { ReverseAlphaNumeric(scriptText, output); }
+static void OldReverseAlphaNumeric(void) { LegacyReverseAlphaNumeric(scriptText, legacyOutput); }
+static void NewNumber(void) { UnicodeNumberToIransystem(scriptText, output); }
+static void OldNumber(void) { LegacyUnicodeNumberToIransystem(scriptText, legacyOutput); }
+static void NewUnicodeToIransystem(void) { UnicodeToIransystem(scriptText, output); }
+static void OldUnicodeToIransystem(void) { LegacyUnicodeToIransystem(scriptText, legacyOutput); }
+
+static void NewPersianScript(void) {
+    size_t pos;
+    for (pos = 0; pos < length; pos++) output[pos] = UnicodeToPersianScript(unicodeText[pos]);
+}
+static void OldPersianScript(void) {
+    size_t pos;
+    for (pos = 0; pos < length; pos++) legacyOutput[pos] = LegacyUnicodeToPersianScript(unicodeText[pos]);
+}
+
+static void NewEx(void) {
+    UnicodeToIransystemEx(scriptText, length, output, IRAN_SYSTEM_REVERSE_ALPHANUMERIC);
+}
+static void OldEx(void) {
+    LegacyUnicodeToIransystemEx(scriptText, length, legacyOutput, IRAN_SYSTEM_REVERSE_ALPHANUMERIC);
+}
+static void NewExLogical(void) { UnicodeToIransystemEx(scriptText, length, output, 0); }
+static void OldExLogical(void) { LegacyUnicodeToIransystemEx(scriptText, length, legacyOutput, 0); }
+static void NewUtf32(void) {
+    UnicodeToIransystemUtf32(unicodeText, length, output, IRAN_SYSTEM_REVERSE_ALPHANUMERIC);
+}
+static void OldUtf32(void) {
+    LegacyUnicodeToIransystemUtf32(unicodeText, length, legacyOutput, IRAN_SYSTEM_REVERSE_ALPHANUMERIC);
+}
+static void NewToUtf32(void) { IransystemToUtf32(iransystemText, length, wideOutput); }
+static void OldToUtf32(void) { LegacyIransystemToUtf32(iransystemText, length, legacyWideOutput); }
+
+typedef struct {
+    const char *name;
+    void (*current)(void);
+    void (*legacy)(void);
+    int wideOutput;
+} Case;
+
+static const Case cases[] = {
+    {"IransystemToUpper", NewUpper, OldUpper, 0},
+    {"IransystemToUnicode", NewToUnicode, OldToUnicode, 0},
+    {"ReverseIransystem", NewReverseIransystem, OldReverseIransystem, 0},
+    {"ReverseAlphaNumeric", NewReverseAlphaNumeric, OldReverseAlphaNumeric, 0},
+    {"UnicodeNumberToIransystem", NewNumber, OldNumber, 0},
+    {"UnicodeToPersianScript", NewPersianScript, OldPersianScript, 0},
+    {"UnicodeToIransystem", NewUnicodeToIransystem, OldUnicodeToIransystem, 0},
+    {"UnicodeToIransystemEx", NewEx, OldEx, 0},
+    {"UnicodeToIransystemEx (logical)", NewExLogical, OldExLogical, 0},
+    {"UnicodeToIransystemUtf32", NewUtf32, OldUtf32, 0},
+    {"IransystemToUtf32", NewToUtf32, OldToUtf32, 1},
+};
+
+static int Matches(const Case *testCase) {
+    if (testCase->wideOutput) {
+        return memcmp(wideOutput, legacyWideOutput, length * sizeof(unsigned int)) == 0;
+    }
+    return memcmp(output, legacyOutput, length) == 0;
+}
+
+static int Check(const Case *testCase) {
+    /* ReverseIransystem used to skip single high bytes; start both from the input. */
+    memcpy(output, iransystemText, length);
+    memcpy(legacyOutput, iransystemText, length);
+    testCase->current();
+    testCase->legacy();
+    if (!Matches(testCase)) {
+        fprintf(stderr, "MISMATCH: %s\n", testCase->name);
+        return 0;
+    }
+    return 1;
+}
+
+static double Seconds(void) {
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return now.tv_sec + now.tv_nsec * 1e-9;
+}
+
+/* Best time of one call, over repeated batches of at least 0.1 s. */
+static double Measure(void (*function)(void)) {
+    double best = 1e30, start, elapsed;
+    int batch, calls;
+    for (batch = 0; batch < 5; batch++) {
+        calls = 0;
+        start = Seconds();
+        do {
+            function();
+            calls++;
+            elapsed = Seconds() - start;
+        } while (elapsed < 0.1);
+        if (elapsed / calls < best) best = elapsed / calls;
+    }
+    return best;
+}
+
+int main(int argc, char **argv) {
+    size_t index, count = sizeof(cases) / sizeof(cases[0]);
+    int checkOnly = argc > 1 && strcmp(argv[1], "--check") == 0;
+    double megabytes = (argc > 1 && !checkOnly) ? atof(argv[1]) : 4.0;
+    double before, after;
+    int failures = 0;
+
+    if (megabytes <= 0) {
+        fprintf(stderr, "usage: %s [megabytes | --check]\n", argv[0]);
+        return 2;
+    }
+    MakeInputs(checkOnly ? 65536 : (size_t)(megabytes * 1024 * 1024));
+
+    for (index = 0; index < count; index++) {
+        failures += !Check(&cases[index]);
+    }
+    reverseAlphaNumericFlag = legacyReverseFlag = 0;
+    failures += !Check(&cases[6]);
+    reverseAlphaNumericFlag = legacyReverseFlag = 1;
+    if (failures) {
+        return 1;
+    }
+    if (checkOnly) {
+        printf("all %zu functions match their legacy implementations\n", count);
+        return 0;
+    }
+
+    printf("%-34s %12s %12s %9s\n", "", "legacy", "tables", "speedup");
+    for (index = 0; index < count; index++) {
+        before = Measure(cases[index].legacy);
+        after = Measure(cases[index].current);
+        printf("%-34s %7.1f MB/s %7.1f MB/s %8.1fx\n", cases[index].name,
+               length / before / 1e6, length / after / 1e6, before / after);
+    }
+    return 0;
+}
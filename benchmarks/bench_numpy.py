@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark iran_encoding.numpy on a column of fixed-width records.
+
+The column holds short Persian records built from the words of
+tests/corpus.json, some with numbers, mixed with English product codes,
+the shape of a name column in a legacy binary file. The per-element
+encode_many/decode_many calls are timed on the same records for
+comparison.
+
+Usage:
+    python benchmarks/bench_numpy.py [--rows N] [--width N] [--repeat N]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import iran_encoding  # noqa: E402
+from iran_encoding.numpy import decode_array, encode_array  # noqa: E402
+from tests.test_core import load_corpus_text  # noqa: E402
+
+
+def make_records(rows, width, seed=0):
+    rnd = random.Random(seed)
+    words = load_corpus_text().split()
+    records = []
+    for _ in range(rows):
+        kind = rnd.random()
+        if kind < 0.15:
+            records.append(f"SKU-{rnd.randint(0, 99999)}")
+            continue
+        parts = [rnd.choice(words) for _ in range(rnd.randint(1, 3))]
+        if kind < 0.35:
+            parts.append(str(rnd.randint(1, 999)))
+        records.append(" ".join(parts)[:width])
+    return records
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy conversions.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Records in the column.")
+    parser.add_argument("--width", type=int, default=24, help="Characters per record.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions.")
+    args = parser.parse_args()
+
+    records = make_records(args.rows, args.width)
+    column = np.array(records, dtype=f'U{args.width}')
+    encoded = encode_array(column)
+    if encoded.tolist() != iran_encoding.encode_many(records):
+        raise SystemExit("encode_array and encode_many outputs differ")
+    encoded_records = encoded.tolist()
+
+    cases = [
+        ("encode_array", lambda: encode_array(column)),
+        ("encode_many", lambda: iran_encoding.encode_many(records)),
+        ("decode_array", lambda: decode_array(encoded)),
+        ("decode_many", lambda: iran_encoding.decode_many(encoded_records)),
+    ]
+    print(f"{args.rows} records of up to {args.width} characters")
+    for label, func in cases:
+        seconds = best_time(func, args.repeat)
+        print(f"{label:<14} {seconds * 1e3:>9.1f} ms {args.rows / seconds / 1e6:>7.2f} M rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark the start-up cost of iran_encoding in fresh interpreters.
+
+Each scenario runs in a new process and times its statements with
+perf_counter, so interpreter start-up itself is excluded. "without
+extension" blocks iran_encoding._speedups the way a missing build would.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BLOCK_EXTENSION = "import sys; sys.modules['iran_encoding._speedups'] = None\n"
+
+SCENARIOS = [
+    ("import iran_encoding", "", "import iran_encoding"),
+    ("import iran_encoding (without extension)", BLOCK_EXTENSION, "import iran_encoding"),
+    ("import iran_encoding.cli", "", "import iran_encoding.cli"),
+    ("import iran_encoding.c_wrapper", "", "import iran_encoding.c_wrapper"),
+    ("c_wrapper first use (loads binary)", "",
+     "import iran_encoding.c_wrapper as c; c.is_available()"),
+    ("first encode", "", "import iran_encoding; iran_encoding.encode('سلام')"),
+    ("first encode (without extension)", BLOCK_EXTENSION,
+     "import iran_encoding; iran_encoding.encode('سلام')"),
+]
+
+TIMER = (
+    "import time\n"
+    "{setup}"
+    "start = time.perf_counter()\n"
+    "{statement}\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def run_once(setup, statement):
+    """Seconds taken by statement in a fresh interpreter."""
+    output = subprocess.run([sys.executable, "-c", TIMER.format(setup=setup, statement=statement)],
+                            cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return float(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark iran_encoding start-up.")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh processes per scenario.")
+    args = parser.parse_args()
+
+    print(f"{'':<44} {'median':>10} {'min':>10}")
+    for label, setup, statement in SCENARIOS:
+        times = [run_once(setup, statement) for _ in range(args.runs)]
+        print(f"{label:<44} {statistics.median(times) * 1e3:>7.1f} ms {min(times) * 1e3:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
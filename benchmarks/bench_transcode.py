@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark iran_encoding.transcode on a large generated file.
+
+The file repeats the text of tests/corpus.json, one item per line, up to
+the requested size. It is encoded from UTF-8 to Iran System and the result
+decoded back with each number of worker processes given, and every output
+is checked against that of the smallest number.
+
+Usage:
+    python benchmarks/bench_transcode.py [--size MB] [--jobs 1 2 4 ...]
+                                         [--backend NAME]
+"""
+import argparse
+import filecmp
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from iran_encoding.transcode import transcode_file  # noqa: E402
+from tests.test_core import load_corpus_text  # noqa: E402
+
+
+def make_file(path, size):
+    block = ((load_corpus_text() + "\n") * 64).encode('utf-8')
+    with open(path, 'wb') as f:
+        for _ in range(max(size // len(block), 1)):
+            f.write(block)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark file transcoding.")
+    parser.add_argument("--size", type=int, default=256, help="Input size in MB.")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1],
+                        help="Worker process counts to time.")
+    parser.add_argument("--backend", default=None, help="Conversion backend.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, "text.txt")
+        make_file(text_path, args.size << 20)
+        size = os.path.getsize(text_path)
+        print(f"{size / 1e6:.0f} MB of UTF-8 text, {os.cpu_count()} CPUs")
+
+        jobs_counts = sorted(set(args.jobs))
+        # The decode case reads the output of the first encode run.
+        cases = [("encode", text_path, 'utf-8', 'iran_system'),
+                 ("decode", os.path.join(directory, f"encode.{jobs_counts[0]}"), 'iran_system', 'utf-8')]
+        for label, source, from_encoding, to_encoding in cases:
+            baseline = None
+            for jobs in jobs_counts:
+                output = os.path.join(directory, f"{label}.{jobs}")
+                start = time.perf_counter()
+                transcode_file(source, output, from_encoding, to_encoding,
+                               backend=args.backend, jobs=jobs)
+                seconds = time.perf_counter() - start
+                if baseline is None:
+                    baseline = seconds, output
+                elif not filecmp.cmp(baseline[1], output, shallow=False):
+                    raise SystemExit(f"{label} output with {jobs} jobs differs from the first run")
+                print(f"{label} jobs={jobs:<3} {seconds:>7.2f} s {size / seconds / 1e6:>8.1f} MB/s "
+                      f"speedup {baseline[0] / seconds:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
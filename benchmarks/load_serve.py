@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Load generator for ``iran-encoding serve``.
+
+Opens a number of keep-alive connections and sends encode (or decode)
+requests for short Persian records built from tests/corpus.json as fast as
+the server answers, then reports requests per second, client-side p50/p99
+latency, and the server's mean batch size and latencies from /metrics.
+
+Without --port or --socket it starts a server on a temporary Unix socket
+and stops it afterwards.
+
+Usage:
+    python benchmarks/load_serve.py [--socket PATH | --port N] [--connections N]
+                                    [--duration S] [--values N] [--decode]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import iran_encoding  # noqa: E402
+from tests.test_core import load_corpus_text  # noqa: E402
+
+
+class Client:
+    """One keep-alive HTTP connection to the server."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, args):
+        if args.socket:
+            return cls(*await asyncio.open_unix_connection(args.socket))
+        return cls(*await asyncio.open_connection(args.host, args.port))
+
+    async def request(self, method, path, payload=None):
+        body = b"" if payload is None else json.dumps(payload).encode('utf-8')
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            if name.lower() == 'content-length':
+                length = int(value)
+        answer = json.loads(await self.reader.readexactly(length))
+        if status != 200:
+            raise RuntimeError(f"server answered {status}: {answer}")
+        return answer
+
+    def close(self):
+        self.writer.close()
+
+
+def make_records(count, seed=0):
+    rnd = random.Random(seed)
+    words = load_corpus_text().split()
+    return [" ".join(rnd.choice(words) for _ in range(rnd.randint(1, 4))) for _ in range(count)]
+
+
+async def worker(args, records, deadline, latencies):
+    client = await Client.connect(args)
+    rnd = random.Random(len(latencies))
+    try:
+        while time.perf_counter() < deadline:
+            values = rnd.sample(records, args.values)
+            if args.decode:
+                path, payload = '/decode', {'hex': values if args.values > 1 else values[0]}
+            else:
+                path, payload = '/encode', {'text': values if args.values > 1 else values[0]}
+            start = time.perf_counter()
+            await client.request('POST', path, payload)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        client.close()
+
+
+async def run(args):
+    records = make_records(10000)
+    if args.decode:
+        records = [data.hex() for data in iran_encoding.encode_many(records)]
+    latencies = []
+    deadline = time.perf_counter() + args.duration
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(args, records, deadline, latencies) for _ in range(args.connections)))
+    elapsed = time.perf_counter() - started
+
+    client = await Client.connect(args)
+    metrics = await client.request('GET', '/metrics')
+    client.close()
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(int(p / 100 * len(latencies)), len(latencies) - 1)] * 1e3
+
+    print(f"{len(latencies)} requests of {args.values} value(s) over {args.connections} connections "
+          f"in {elapsed:.1f} s")
+    print(f"throughput      {len(latencies) / elapsed:>10.0f} requests/s")
+    print(f"client latency  p50 {percentile(50):.3f} ms  p99 {percentile(99):.3f} ms")
+    print(f"server latency  p50 {metrics['latency_ms']['p50']} ms  p99 {metrics['latency_ms']['p99']} ms  "
+          f"mean batch size {metrics['mean_batch_size']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test iran-encoding serve.")
+    parser.add_argument("--socket", help="Unix socket of a running server.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address of a running server.")
+    parser.add_argument("--port", type=int, help="TCP port of a running server.")
+    parser.add_argument("--connections", type=int, default=32, help="Concurrent connections.")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to run.")
+    parser.add_argument("--values", type=int, default=1, help="Values per request.")
+    parser.add_argument("--decode", action="store_true", help="Send decode instead of encode requests.")
+    parser.add_argument("--batch-delay", type=float, default=0.0,
+                        help="--batch-delay of the server started by this script, in ms.")
+    args = parser.parse_args()
+
+    if args.socket or args.port:
+        asyncio.run(run(args))
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        args.socket = os.path.join(directory, "serve.sock")
+        server = subprocess.Popen([sys.executable, "-m", "iran_encoding.cli", "serve", "--socket", args.socket,
+                                   "--batch-delay", str(args.batch_delay)],
+                                  cwd=ROOT, stdout=subprocess.PIPE, text=True)
+        try:
+            server.stdout.readline()  # the "serving on" line
+            asyncio.run(run(args))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
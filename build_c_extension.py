@@ -55,8 +55,122 @@ def build():
     print("Error: Failed to build C extension. Please ensure GCC or Clang is installed.")
     return False
 
+TABLES_BEGIN = "/* BEGIN GENERATED TABLES: python3 build_c_extension.py --tables */\n"
+TABLES_END = "/* END GENERATED TABLES */\n"
+
+def _c_array(declaration, values, width=2):
+    """Format values as a C array initializer, 16 per line."""
+    lines = []
+    for start in range(0, len(values), 16):
+        row = ", ".join(f"0x{value:0{width}X}" for value in values[start:start + 16])
+        lines.append(f"    {row},")
+    return f"{declaration} = {{\n" + "\n".join(lines) + "\n};\n"
+
+def render_tables():
+    """
+    Render the 256-entry lookup tables of iran_system.c from core.py, so
+    the C hot loops index arrays instead of scanning the NUL terminated
+    mapping strings with FindPos.
+    """
+    sys.path.insert(0, str(Path(__file__).parent.absolute()))
+    from iran_encoding import core
+
+    byte_values = range(256)
+    number_map = dict(zip(core.UNICODE_NUMBER_STR, core.IRANSYSTEM_NUMBER_STR))
+    classes = [
+        (1 if b in core.NEXT_CHAR_STR else 0)
+        | (2 if b in core.PREV_CHAR_STR else 0)
+        | (4 if b in core.UNICODE_NUMBER_STR else 0)
+        for b in byte_values
+    ]
+    shapes = [value for table in core._build_shaping_tables() for value in table]
+    parts = [
+        TABLES_BEGIN,
+        _c_array("const unsigned char charClassTable[256]", classes),
+        _c_array("const unsigned char iransystemUpperTable[256]",
+                 core.iransystem_to_upper(bytes(byte_values))),
+        _c_array("const unsigned char iransystemScriptTable[256]",
+                 core.iransystem_to_unicode_script(bytes(byte_values))),
+        _c_array("const unsigned short iransystemUnicodeTable[256]",
+                 [ord(c) for c in core._build_decoding_table()], width=4),
+        _c_array("const unsigned char iransystemNumberTable[256]",
+                 [number_map.get(b, b) for b in byte_values]),
+        _c_array("const unsigned char persianScriptTable[PERSIAN_SCRIPT_TABLE_SIZE]",
+                 [core.unicode_to_persian_script(code) for code in range(0x700)]),
+        _c_array("const unsigned char shapeTable[4 * 256]", shapes),
+        TABLES_END,
+    ]
+    return "\n".join(parts[:-1]) + parts[-1]
+
+def _py_sequence(name, value, chunk=16):
+    """Format a str or bytes constant as a parenthesized literal, chunk items per line."""
+    lines = [f"    {value[start:start + chunk]!a}" for start in range(0, len(value), chunk)]
+    return f"{name} = (\n" + "\n".join(lines) + "\n)\n"
+
+def render_python_tables():
+    """
+    Render iran_encoding/_tables.py, the lookup tables core.py would
+    otherwise build at every import.
+    """
+    sys.path.insert(0, str(Path(__file__).parent.absolute()))
+    from iran_encoding import core
+
+    prev_flags, next_flags = core._build_connect_flags()
+    shaping = core._build_shaping_tables()
+    parts = [
+        '"""\nLookup tables of core.py, generated by ``python3 build_c_extension.py '
+        '--tables``\nfrom the builders in core.py. Do not edit.\n"""\n',
+        _py_sequence("DECODING_TABLE", core._build_decoding_table()),
+        _py_sequence("PREV_CONNECT_FLAGS", prev_flags),
+        _py_sequence("NEXT_CONNECT_FLAGS", next_flags),
+        "SHAPING_TABLES = (\n" + "".join(
+            _py_sequence("", table).replace(" = (\n", "(\n", 1).replace("\n)\n", "\n),\n")
+            .replace("\n    ", "\n        ").replace("(\n", "    (\n", 1).replace("\n),", "\n    ),")
+            for table in shaping) + ")\n",
+    ]
+    return "\n".join(parts)
+
+def generate_tables(check=False):
+    """
+    Rewrite the generated tables of iran_system.c and iran_encoding/_tables.py,
+    or with check=True only report whether both are current.
+    """
+    package_dir = Path(__file__).parent.absolute() / "iran_encoding"
+    c_source = package_dir / "iran_system.c"
+    text = c_source.read_text()
+    start = text.index(TABLES_BEGIN)
+    end = text.index(TABLES_END) + len(TABLES_END)
+    outputs = [
+        (c_source, text, text[:start] + render_tables() + text[end:]),
+    ]
+    py_tables = package_dir / "_tables.py"
+    current = py_tables.read_text(encoding="utf-8") if py_tables.exists() else ""
+    outputs.append((py_tables, current, render_python_tables()))
+
+    if check:
+        return all(updated == existing for _, existing, updated in outputs)
+    for path, existing, updated in outputs:
+        if updated != existing:
+            path.write_text(updated, encoding="utf-8")
+            print(f"Updated tables in {path.name}")
+    return True
+
+def build_speedups():
+    """Build the native iran_encoding._speedups module in place."""
+    print("Building iran_encoding._speedups...")
+    root_dir = Path(__file__).parent.absolute()
+    try:
+        subprocess.run([sys.executable, "setup.py", "build_ext", "--inplace"],
+                       cwd=str(root_dir), check=True)
+    except subprocess.CalledProcessError:
+        print("Error: Failed to build iran_encoding._speedups.")
+        return False
+    return True
+
 if __name__ == "__main__":
-    if build():
+    if "--tables" in sys.argv[1:]:
+        sys.exit(0 if generate_tables() else 1)
+    if build() and build_speedups():
         print("\nBuild completed successfully.")
     else:
         print("\nBuild failed.")
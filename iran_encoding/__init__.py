@@ -3,22 +3,63 @@ Iran System Encoding Package - Main Module
 
 This package provides encoding and decoding functions for the Iran System character set.
 It uses a pure Python implementation of the original C logic by default,
-ensuring consistent behavior and professional results.
+ensuring consistent behavior and professional results. When the optional
+native extension (iran_encoding._speedups) is built, the same conversions
+run in C instead. Each conversion can run on one of several backends
+(pure Python, ctypes or the native extension); see iran_encoding.backends.
+iran_encoding.cache puts an optional LRU cache in front of encode() and
+decode().
 """
-import re
-from .core import unicode_to_iransystem, iransystem_to_unicode
+from itertools import accumulate, chain, compress
+from operator import not_
+from . import backends, codec
+
+codec.register()
+
 
 __version__ = "1.1.0"
 __author__ = "Community Contributors"
-__all__ = ['encode', 'decode', 'decode_hex', 'detect_locale']
+__all__ = ['encode', 'decode', 'decode_hex', 'detect_locale', 'encode_many', 'decode_many',
+           'encode_async', 'decode_async']
 
-# Persian letters range (approximate, covering main Persian alphabet)
-PERSIAN_LETTERS_PATTERN = re.compile(r'[\u0621-\u064A\u067E\u0686\u0698\u06AF\u06A9\u06CC]')
+# Persian letters range (approximate, covering main Persian alphabet). The
+# compiled PERSIAN_LETTERS_PATTERN is created on first use, as importing re
+# costs more than importing this package.
+PERSIAN_LETTERS = r'[\u0621-\u064A\u067E\u0686\u0698\u06AF\u06A9\u06CC]'
+_persian_letters_pattern = None
+# The LRUCache of iran_encoding.cache.enable(), None while caching is off.
+_cache = None
 PERSIAN_DIGITS_MAP = {
     '۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4',
     '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9'
 }
 
+def _get_persian_letters_pattern():
+    """Compile PERSIAN_LETTERS on the first call and return the pattern."""
+    global _persian_letters_pattern
+    if _persian_letters_pattern is None:
+        import re
+        _persian_letters_pattern = re.compile(PERSIAN_LETTERS)
+    return _persian_letters_pattern
+
+def _search_persian_letters(text):
+    """
+    Stand-in for PERSIAN_LETTERS_PATTERN.search: the first call compiles the
+    pattern and rebinds this name to the bound search method itself.
+    """
+    global _search_persian_letters
+    _search_persian_letters = _get_persian_letters_pattern().search
+    return _search_persian_letters(text)
+
+def __getattr__(name):
+    if name == 'PERSIAN_LETTERS_PATTERN':
+        return _get_persian_letters_pattern()
+    if name in ('encode_async', 'decode_async'):
+        # Defined in iran_encoding.aio, which imports asyncio.
+        from . import aio
+        return getattr(aio, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def detect_locale(text):
     """
     Detect if the text should be treated as Persian ('fa') or English ('en').
@@ -26,11 +67,11 @@ def detect_locale(text):
     Returns:
         str: 'fa' if text contains Persian letters, 'en' otherwise.
     """
-    if PERSIAN_LETTERS_PATTERN.search(text):
+    if _search_persian_letters(text):
         return 'fa'
     return 'en'
 
-def encode(text, visual_ordering=True):
+def encode(text, visual_ordering=True, backend=None):
     """
     Encode a Unicode string to Iran System encoding bytes.
     
@@ -38,38 +79,62 @@ def encode(text, visual_ordering=True):
         text (str): The Unicode string to encode.
         visual_ordering (bool): Whether to apply visual ordering (default True).
                                This follows the original C logic.
+        backend (str): Conversion backend ('python', 'ctypes', 'native' or
+                       'auto'); defaults to backends.get_default_backend().
         
     Returns:
         bytes: Iran System encoded bytes or ASCII bytes depending on locale.
     """
-    locale = detect_locale(text)
-    
-    if locale == 'fa':
-        # Use the core Iran System logic
-        return unicode_to_iransystem(text, reverse_flag=visual_ordering)
-    else:
-        # English/ASCII locale
-        # Convert Persian digits to ASCII if present
-        processed_text = text
-        for p_digit, a_digit in PERSIAN_DIGITS_MAP.items():
-            processed_text = processed_text.replace(p_digit, a_digit)
+    # Pure ASCII text has no Persian letters or digits to convert.
+    if text.isascii():
+        return text.encode('ascii')
+    if _cache is not None:
+        return _cache.encode(text, visual_ordering, backend)
+    return _encode_text(text, visual_ordering, backend)
 
-        return processed_text.encode('ascii', errors='replace')
+def _encode_text(text, visual_ordering, backend):
+    """encode() of text that is not pure ASCII."""
+    # Same decision as detect_locale, inlined to save a call per field.
+    if _search_persian_letters(text):
+        # Use the core Iran System logic: one translate/encode pass maps the
+        # code points, then run reversal and shaping each take one pass.
+        convert = backends.encoder(backend, len(text))
+        return convert(text, reverse_flag=visual_ordering)
 
-def decode(iransystem_bytes):
+    # English/ASCII locale
+    # Convert Persian digits to ASCII if present. str.replace returns the
+    # same object when a digit is absent, so this allocates nothing extra
+    # and beats str.translate, which is slow on non-ASCII strings.
+    processed_text = text
+    for p_digit, a_digit in PERSIAN_DIGITS_MAP.items():
+        processed_text = processed_text.replace(p_digit, a_digit)
+
+    return processed_text.encode('ascii', errors='replace')
+
+def decode(iransystem_bytes, backend=None):
     """
     Decode Iran System encoded bytes to a Unicode string.
     
     Args:
         iransystem_bytes (bytes): Iran System encoded bytes.
+        backend (str): Conversion backend, as for encode().
         
     Returns:
         str: Decoded Unicode string.
     """
-    # If the bytes look like pure ASCII (all < 128) and we don't see typical Iran System markers,
-    # it might just be ASCII. However, Iran System is a superset of ASCII for 0-127.
-    # The core logic handles this correctly.
-    return iransystem_to_unicode(iransystem_bytes)
+    # Iran System is a superset of ASCII for 0-127, so pure ASCII input
+    # decodes directly without going through the Iran System tables.
+    if isinstance(iransystem_bytes, (bytes, bytearray)) and iransystem_bytes.isascii():
+        return iransystem_bytes.decode('ascii')
+    if _cache is not None:
+        return _cache.decode(iransystem_bytes, backend)
+    return _decode_bytes(iransystem_bytes, backend)
+
+def _decode_bytes(iransystem_bytes, backend):
+    """decode() of bytes that are not pure ASCII."""
+    return backends.decoder(backend, len(iransystem_bytes))(iransystem_bytes)
+
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
 
 def decode_hex(hex_string):
     """
@@ -81,6 +146,107 @@ def decode_hex(hex_string):
     Returns:
         str: Decoded Unicode string.
     """
-    clean_hex = re.sub(r'[^0-9a-fA-F]', '', hex_string)
+    clean_hex = "".join(filter(_HEX_DIGITS.__contains__, hex_string))
     iransystem_bytes = bytes.fromhex(clean_hex)
     return decode(iransystem_bytes)
+
+
+# Batches are joined with NUL before conversion. NUL is a run boundary for
+# the alphanumeric reversal, never joins a neighbour and maps to itself, so
+# a joined conversion splits back into exactly the per-item results.
+_BATCH_SEPARATOR = "\x00"
+
+
+def _item_offsets(lengths):
+    """Offsets array with a start index per item plus the total length."""
+    from array import array  # imports collections, so only when needed
+    return array('Q', accumulate(chain((0,), lengths)))
+
+
+def _encode_group(texts, convert):
+    """Convert a group of strings in one call and split the joined result."""
+    joined = _BATCH_SEPARATOR.join(texts)
+    if joined.count(_BATCH_SEPARATOR) != len(texts) - 1:
+        # Some item contains NUL itself, so the split would be ambiguous.
+        return [convert(text) for text in texts]
+    return convert(joined).split(b"\x00")
+
+
+def _encode_english(text):
+    for p_digit, a_digit in PERSIAN_DIGITS_MAP.items():
+        text = text.replace(p_digit, a_digit)
+    return text.encode('ascii', errors='replace')
+
+
+def encode_many(texts, visual_ordering=True, concatenate=False, backend=None):
+    """
+    Encode many Unicode strings to Iran System bytes in one call.
+
+    Locale detection is done per item, exactly as in encode(), but all items
+    of the same locale are converted together in a single pass.
+
+    Args:
+        texts (iterable of str): The Unicode strings to encode.
+        visual_ordering (bool): Whether to apply visual ordering (default True).
+        concatenate (bool): Return one buffer plus offsets instead of a list.
+        backend (str): Conversion backend, as for encode(); with 'auto' the
+                       choice follows the size of the whole batch.
+
+    Returns:
+        list of bytes: One encoded value per input string, or, when
+        concatenate is True, a ``(bytes, array('Q'))`` tuple where item i
+        is ``buffer[offsets[i]:offsets[i + 1]]``.
+    """
+    texts = list(texts)
+    persian = list(map(bool, map(_get_persian_letters_pattern().search, texts)))
+    persian_texts = list(compress(texts, persian))
+    english_texts = list(compress(texts, map(not_, persian)))
+
+    def convert_persian(text):
+        convert = backends.encoder(backend, len(text))
+        return convert(text, reverse_flag=visual_ordering)
+
+    if not english_texts:
+        results = _encode_group(persian_texts, convert_persian)
+    elif not persian_texts:
+        results = _encode_group(english_texts, _encode_english)
+    else:
+        persian_results = iter(_encode_group(persian_texts, convert_persian))
+        english_results = iter(_encode_group(english_texts, _encode_english))
+        results = [next(persian_results) if is_persian else next(english_results)
+                   for is_persian in persian]
+
+    if concatenate:
+        # Every code point encodes to exactly one byte.
+        return b"".join(results), _item_offsets(map(len, texts))
+    return results
+
+
+def decode_many(byte_strings, concatenate=False, backend=None):
+    """
+    Decode many Iran System byte strings to Unicode in one call.
+
+    Decoding is context free, so the whole batch is decoded as one buffer.
+
+    Args:
+        byte_strings (iterable of bytes-like): Iran System encoded values.
+        concatenate (bool): Return one string plus offsets instead of a list.
+        backend (str): Conversion backend, as for encode().
+
+    Returns:
+        list of str: One decoded value per input, or, when concatenate is
+        True, a ``(str, array('Q'))`` tuple where item i is
+        ``text[offsets[i]:offsets[i + 1]]``.
+    """
+    byte_strings = list(byte_strings)
+    if concatenate:
+        # Every byte decodes to exactly one character.
+        decoded = decode(b"".join(byte_strings), backend)
+        return decoded, _item_offsets(map(len, map(memoryview, byte_strings)))
+
+    if not byte_strings:
+        return []
+    joined = b"\x00".join(byte_strings)
+    if joined.count(b"\x00") != len(byte_strings) - 1:
+        return [decode(value, backend) for value in byte_strings]
+    return decode(joined, backend).split(_BATCH_SEPARATOR)
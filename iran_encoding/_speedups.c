@@ -0,0 +1,220 @@
+/**
+ * Native CPython extension for the Iran System conversions.
+ *
+ * Mirrors unicode_to_iransystem, script_bytes_to_iransystem and
+ * iransystem_to_unicode from core.py. Byte inputs may be any object
+ * supporting the buffer protocol, and the conversion loops run without
+ * the GIL for inputs of GIL_RELEASE_MINSIZE elements or more, so threads
+ * can transcode in parallel.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include "iran_system.h"
+
+/* Smaller inputs finish faster than releasing and re-taking the GIL. */
+#define GIL_RELEASE_MINSIZE 4096
+
+/* Conversion kernels over the iran_system.c lookup tables; none of them
+   touch Python objects. */
+
+#define SCRIPT_BYTE(code) \
+    ((code) < PERSIAN_SCRIPT_TABLE_SIZE ? persianScriptTable[(code)] : '?')
+
+static void
+map_code_points(int kind, const void *data, Py_ssize_t length, unsigned char *out)
+{
+    Py_ssize_t i;
+    if (kind == PyUnicode_1BYTE_KIND) {
+        const Py_UCS1 *in = (const Py_UCS1 *)data;
+        for (i = 0; i < length; i++) out[i] = persianScriptTable[in[i]];
+    } else if (kind == PyUnicode_2BYTE_KIND) {
+        const Py_UCS2 *in = (const Py_UCS2 *)data;
+        for (i = 0; i < length; i++) out[i] = SCRIPT_BYTE(in[i]);
+    } else {
+        const Py_UCS4 *in = (const Py_UCS4 *)data;
+        for (i = 0; i < length; i++) out[i] = SCRIPT_BYTE(in[i]);
+    }
+}
+
+static void
+script_to_iransystem(unsigned char *buffer, Py_ssize_t length, int reverse_flag)
+{
+    UnicodeToIransystemEx(buffer, (size_t)length, buffer,
+                          reverse_flag ? IRAN_SYSTEM_REVERSE_ALPHANUMERIC : 0);
+}
+
+static void
+encode_kernel(int kind, const void *data, Py_ssize_t length,
+              unsigned char *out, int reverse_flag)
+{
+    map_code_points(kind, data, length, out);
+    script_to_iransystem(out, length, reverse_flag);
+}
+
+static Py_UCS4
+decoded_max_char(const unsigned char *in, Py_ssize_t length)
+{
+    /* OR-ing keeps values below 0x80 / 0x100 on the same side of those
+       limits, which is all PyUnicode_New needs to pick the right kind. */
+    Py_ssize_t i;
+    Py_UCS4 max_char = 0;
+    for (i = 0; i < length; i++) {
+        max_char |= iransystemUnicodeTable[in[i]];
+    }
+    return max_char;
+}
+
+static void
+decode_kernel(const unsigned char *in, Py_ssize_t length, int kind, void *out)
+{
+    Py_ssize_t i;
+    if (kind == PyUnicode_1BYTE_KIND) {
+        Py_UCS1 *out1 = (Py_UCS1 *)out;
+        for (i = 0; i < length; i++) out1[i] = (Py_UCS1)iransystemUnicodeTable[in[i]];
+    } else {
+        Py_UCS2 *out2 = (Py_UCS2 *)out;
+        for (i = 0; i < length; i++) out2[i] = iransystemUnicodeTable[in[i]];
+    }
+}
+
+/* Module functions */
+
+PyDoc_STRVAR(unicode_to_iransystem_doc,
+"unicode_to_iransystem(unicode_string, reverse_flag=True)\n--\n\n"
+"Convert a Unicode string to Iran System bytes.");
+
+static PyObject *
+unicode_to_iransystem(PyObject *module, PyObject *args, PyObject *kwargs)
+{
+    static char *keywords[] = {"unicode_string", "reverse_flag", NULL};
+    PyObject *text, *result;
+    int reverse_flag = 1, kind;
+    const void *data;
+    Py_ssize_t length;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "U|p:unicode_to_iransystem",
+                                     keywords, &text, &reverse_flag)) {
+        return NULL;
+    }
+    if (PyUnicode_READY(text) < 0) {
+        return NULL;
+    }
+    length = PyUnicode_GET_LENGTH(text);
+    kind = PyUnicode_KIND(text);
+    data = PyUnicode_DATA(text);
+
+    result = PyBytes_FromStringAndSize(NULL, length);
+    if (result == NULL) {
+        return NULL;
+    }
+    if (length >= GIL_RELEASE_MINSIZE) {
+        Py_BEGIN_ALLOW_THREADS
+        encode_kernel(kind, data, length, (unsigned char *)PyBytes_AS_STRING(result), reverse_flag);
+        Py_END_ALLOW_THREADS
+    } else {
+        encode_kernel(kind, data, length, (unsigned char *)PyBytes_AS_STRING(result), reverse_flag);
+    }
+    return result;
+}
+
+PyDoc_STRVAR(script_bytes_to_iransystem_doc,
+"script_bytes_to_iransystem(script_bytes, reverse_flag=True)\n--\n\n"
+"Apply the alphanumeric reversal and shaping stages to script bytes.");
+
+static PyObject *
+script_bytes_to_iransystem(PyObject *module, PyObject *args, PyObject *kwargs)
+{
+    static char *keywords[] = {"script_bytes", "reverse_flag", NULL};
+    Py_buffer view;
+    PyObject *result;
+    unsigned char *out;
+    int reverse_flag = 1;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "y*|p:script_bytes_to_iransystem",
+                                     keywords, &view, &reverse_flag)) {
+        return NULL;
+    }
+    result = PyBytes_FromStringAndSize(NULL, view.len);
+    if (result == NULL) {
+        PyBuffer_Release(&view);
+        return NULL;
+    }
+    out = (unsigned char *)PyBytes_AS_STRING(result);
+    if (view.len >= GIL_RELEASE_MINSIZE) {
+        Py_BEGIN_ALLOW_THREADS
+        memcpy(out, view.buf, view.len);
+        script_to_iransystem(out, view.len, reverse_flag);
+        Py_END_ALLOW_THREADS
+    } else {
+        memcpy(out, view.buf, view.len);
+        script_to_iransystem(out, view.len, reverse_flag);
+    }
+    PyBuffer_Release(&view);
+    return result;
+}
+
+PyDoc_STRVAR(iransystem_to_unicode_doc,
+"iransystem_to_unicode(in_bytes)\n--\n\n"
+"Convert Iran System bytes from any buffer object to a Unicode string.");
+
+static PyObject *
+iransystem_to_unicode(PyObject *module, PyObject *arg)
+{
+    Py_buffer view;
+    PyObject *result;
+    Py_UCS4 max_char;
+    const unsigned char *in;
+    int release_gil;
+
+    if (PyObject_GetBuffer(arg, &view, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+    in = (const unsigned char *)view.buf;
+    release_gil = view.len >= GIL_RELEASE_MINSIZE;
+
+    if (release_gil) {
+        Py_BEGIN_ALLOW_THREADS
+        max_char = decoded_max_char(in, view.len);
+        Py_END_ALLOW_THREADS
+    } else {
+        max_char = decoded_max_char(in, view.len);
+    }
+    result = PyUnicode_New(view.len, max_char);
+    if (result == NULL) {
+        PyBuffer_Release(&view);
+        return NULL;
+    }
+    if (release_gil) {
+        Py_BEGIN_ALLOW_THREADS
+        decode_kernel(in, view.len, PyUnicode_KIND(result), PyUnicode_DATA(result));
+        Py_END_ALLOW_THREADS
+    } else {
+        decode_kernel(in, view.len, PyUnicode_KIND(result), PyUnicode_DATA(result));
+    }
+    PyBuffer_Release(&view);
+    return result;
+}
+
+static PyMethodDef speedups_methods[] = {
+    {"unicode_to_iransystem", (PyCFunction)(void (*)(void))unicode_to_iransystem,
+     METH_VARARGS | METH_KEYWORDS, unicode_to_iransystem_doc},
+    {"script_bytes_to_iransystem", (PyCFunction)(void (*)(void))script_bytes_to_iransystem,
+     METH_VARARGS | METH_KEYWORDS, script_bytes_to_iransystem_doc},
+    {"iransystem_to_unicode", (PyCFunction)iransystem_to_unicode,
+     METH_O, iransystem_to_unicode_doc},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    "iran_encoding._speedups",
+    "Native implementation of the Iran System conversions in core.py.",
+    -1,
+    speedups_methods
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    return PyModule_Create(&speedups_module);
+}
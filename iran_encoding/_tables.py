@@ -0,0 +1,136 @@
+"""
+Lookup tables of core.py, generated by ``python3 build_c_extension.py --tables``
+from the builders in core.py. Do not edit.
+"""
+
+DECODING_TABLE = (
+    '\x00\x01\x02\x03\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f'
+    '\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f'
+    ' !"#$%&\'()*+,-./'
+    '0123456789:;<=>?'
+    '@ABCDEFGHIJKLMNO'
+    'PQRSTUVWXYZ[\\]^_'
+    '`abcdefghijklmno'
+    'pqrstuvwxyz{|}~\x7f'
+    '\u06f0\u06f1\u06f2\u06f3\u06f4\u06f5\u06f6\u06f7\u06f8\u06f9\u060c\x8b\x8c\u0622\u0621\u0621'
+    '\u0627\u0627\u0628\u0628\u067e\u067e\u062a\u062a\u062b\u062b\u062c\u062c\u0686\u0686\u062d\u062d'
+    '\u062e\u062e\u062f\u0630\u0631\u0632\u0698\u0633\u0633\u0634\u0634\u0635\u0635\u0636\u0636\u0637'
+    '\xb0\xb1\xb2\xb3\xb4\xb5\xb6\xb7\xb8\xb9\xba\xbb\xbc\xbd\xbe\xbf'
+    '\xc0\u0621\u0622\xc3\xc4\xc5\xc6\u0627\u0628\xc9\u062a\u062b\u062c\u062d\u062e\u062f'
+    '\u0630\u0631\u0632\u0633\u0634\u0635\u0636\xd7\u0637\u0638\u0639\u063a\xdc\u0641\u0642\xdf'
+    '\u0638\u0639\u0639\u0639\u0639\u063a\u063a\u063a\u063a\u0641\u0641\u0642\u0642\u06a9\u06a9\u06af'
+    '\u06af\u0644\xf2\u0644\u0645\u0645\u0646\u0646\u0648\u0647\u0647\u0647\u06cc\u06cc\u06cc\xff'
+)
+
+PREV_CONNECT_FLAGS = (
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x02\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00'
+    b'\x02\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x02\x00\x00\x00\x00\x00\x00\x02\x00\x02\x02\x02\x02\x02\x00'
+    b'\x00\x00\x00\x02\x02\x02\x02\x00\x02\x02\x02\x02\x00\x02\x02\x00'
+    b'\x00\x02\x00\x02\x02\x02\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+)
+
+NEXT_CONNECT_FLAGS = (
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x01\x01\x00'
+    b'\x01\x00\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+    b'\x00\x01\x01\x00\x00\x00\x00\x01\x01\x00\x01\x01\x01\x01\x01\x01'
+    b'\x01\x01\x01\x01\x01\x01\x01\x00\x01\x01\x01\x01\x00\x01\x01\x00'
+    b'\x00\x01\x00\x01\x01\x01\x01\x00\x00\x00\x00\x00\x00\x01\x00\x00'
+    b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+)
+
+SHAPING_TABLES = (
+    (
+        b'\x00\x01\x02\x03\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f'
+        b'\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f'
+        b' !"#$%&\'()*+,-./'
+        b'\x80\x81\x82\x83\x84\x85\x86\x87\x88\x89:;<=>?'
+        b'@ABCDEFGHIJKLMNO'
+        b'PQRSTUVWXYZ[\\]^_'
+        b'`abcdefghijklmno'
+        b'pqrstuvwxyz{|}~\x7f'
+        b'\x80\x94\x82\x83\x84\x85\x86\x87\x88\x89\x81\x8b\x8c\x9c\xa6\x8f'
+        b'\xef\x91\x92\x93\x94\x95\x96\x97\xed\x99\x9a\x9b\x9c\x9d\x9e\x9f'
+        b'\xa0\x8a\xa2\xa3\xa4\xa5\xa6\xa7\xa8\xa9\xaa\xab\xac\xad\xae\xaf'
+        b'\xb0\xb1\xb2\xb3\xb4\xb5\xb6\xb7\xb8\xb9\xba\xbb\xbc\xbd\xbe\xbf'
+        b'\xc0\x8f\x8d\xc3\xc4\xc5\xc6\x90\x92\xc9\x96\x98\x9a\x9e\xa0\xa2'
+        b'\xa3\xa4\xa5\xa7\xa9\xab\xad\xd7\xaf\xe0\xe1\xe5\xdc\xe9\xeb\xdf'
+        b'\xe0\xf1\xe2\xf4\xf6\xf9\xf8\xe7\xe8\xe9\xea\xeb\xec\xfd\xee\xef'
+        b'\xf0\xf1\xf2\xf3\xf4\xf5\xf6\xf7\xf8\xf9\xfa\xfb\xfc\xfd\xfe\xff'
+    ),
+    (
+        b'\x00\x01\x02\x03\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f'
+        b'\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f'
+        b' !"#$%&\'()*+,-./'
+        b'\x80\x81\x82\x83\x84\x85\x86\x87\x88\x89:;<=>?'
+        b'@ABCDEFGHIJKLMNO'
+        b'PQRSTUVWXYZ[\\]^_'
+        b'`abcdefghijklmno'
+        b'pqrstuvwxyz{|}~\x7f'
+        b'\x80\x95\x82\x83\x84\x85\x86\x87\x88\x89\x81\x8b\x8c\x9d\xa6\x8f'
+        b'\xf0\x91\x92\x93\x94\x95\x96\x97\xee\x99\x9a\x9b\x9c\x9d\x9e\x9f'
+        b'\xa0\x8a\xa2\xa3\xa4\xa5\xa6\xa7\xa8\xa9\xaa\xab\xac\xad\xae\xaf'
+        b'\xb0\xb1\xb2\xb3\xb4\xb5\xb6\xb7\xb8\xb9\xba\xbb\xbc\xbd\xbe\xbf'
+        b'\xc0\x8e\x8d\xc3\xc4\xc5\xc6\x90\x93\xc9\x97\x99\x9b\x9f\xa1\xa2'
+        b'\xa3\xa4\xa5\xa8\xaa\xac\xae\xd7\xaf\xe0\xe4\xe8\xdc\xea\xec\xdf'
+        b'\xe0\xf3\xe2\xf5\xf7\xfb\xf8\xe7\xe8\xe9\xea\xeb\xec\xfe\xee\xef'
+        b'\xf0\xf1\xf2\xf3\xf4\xf5\xf6\xf7\xf8\xf9\xfa\xfb\xfc\xfd\xfe\xff'
+    ),
+    (
+        b'\x00\x01\x02\x03\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f'
+        b'\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f'
+        b' !"#$%&\'()*+,-./'
+        b'\x80\x81\x82\x83\x84\x85\x86\x87\x88\x89:;<=>?'
+        b'@ABCDEFGHIJKLMNO'
+        b'PQRSTUVWXYZ[\\]^_'
+        b'`abcdefghijklmno'
+        b'pqrstuvwxyz{|}~\x7f'
+        b'\x80\x94\x82\x83\x84\x85\x86\x87\x88\x89\x81\x8b\x8c\x9c\xa6\x8f'
+        b'\xef\x91\x92\x93\x94\x95\x96\x97\xed\x99\x9a\x9b\x9c\x9d\x9e\x9f'
+        b'\xa0\x8a\xa2\xa3\xa4\xa5\xa6\xa7\xa8\xa9\xaa\xab\xac\xad\xae\xaf'
+        b'\xb0\xb1\xb2\xb3\xb4\xb5\xb6\xb7\xb8\xb9\xba\xbb\xbc\xbd\xbe\xbf'
+        b'\xc0\x8f\x8d\xc3\xc4\xc5\xc6\x91\x92\xc9\x96\x98\x9a\x9e\xa0\xa2'
+        b'\xa3\xa4\xa5\xa7\xa9\xab\xad\xd7\xaf\xe0\xe2\xe6\xdc\xe9\xeb\xdf'
+        b'\xe0\xf1\xe2\xf4\xf6\xf9\xf8\xe7\xe8\xe9\xea\xeb\xec\xfc\xee\xef'
+        b'\xf0\xf1\xf2\xf3\xf4\xf5\xf6\xf7\xf8\xf9\xfa\xfb\xfc\xfd\xfe\xff'
+    ),
+    (
+        b'\x00\x01\x02\x03\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f'
+        b'\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f'
+        b' !"#$%&\'()*+,-./'
+        b'\x80\x81\x82\x83\x84\x85\x86\x87\x88\x89:;<=>?'
+        b'@ABCDEFGHIJKLMNO'
+        b'PQRSTUVWXYZ[\\]^_'
+        b'`abcdefghijklmno'
+        b'pqrstuvwxyz{|}~\x7f'
+        b'\x80\x95\x82\x83\x84\x85\x86\x87\x88\x89\x81\x8b\x8c\x9d\xa6\x8f'
+        b'\xf0\x91\x92\x93\x94\x95\x96\x97\xee\x99\x9a\x9b\x9c\x9d\x9e\x9f'
+        b'\xa0\x8a\xa2\xa3\xa4\xa5\xa6\xa7\xa8\xa9\xaa\xab\xac\xad\xae\xaf'
+        b'\xb0\xb1\xb2\xb3\xb4\xb5\xb6\xb7\xb8\xb9\xba\xbb\xbc\xbd\xbe\xbf'
+        b'\xc0\x8e\x8d\xc3\xc4\xc5\xc6\x91\x93\xc9\x97\x99\x9b\x9f\xa1\xa2'
+        b'\xa3\xa4\xa5\xa8\xaa\xac\xae\xd7\xaf\xe0\xe3\xe7\xdc\xea\xec\xdf'
+        b'\xe0\xf3\xe2\xf5\xf7\xfa\xf8\xe7\xe8\xe9\xea\xeb\xec\xfe\xee\xef'
+        b'\xf0\xf1\xf2\xf3\xf4\xf5\xf6\xf7\xf8\xf9\xfa\xfb\xfc\xfd\xfe\xff'
+    ),
+)
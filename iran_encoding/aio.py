@@ -0,0 +1,410 @@
+"""
+asyncio streaming conversion.
+
+For proxies between modern services and Iran System terminals or printers,
+this module converts data as it flows instead of buffering whole messages::
+
+    from iran_encoding import aio
+
+    # Copy a UTF-8 connection to an Iran System one, converting on the fly.
+    await aio.transcode_stream(client_reader, printer_writer, 'utf-8', 'iran_system')
+
+    # Wrap the two ends of a connection.
+    writer = aio.EncodingWriter(stream_writer)
+    await writer.write("سلام دنیا\\n")
+    reader = aio.DecodingReader(stream_reader)
+    async for text in reader:
+        ...
+
+    # Or convert any (async) iterable of pieces.
+    async for data in aio.encode_chunks(pieces):
+        ...
+
+Encoding goes through a codec.BoundaryEncoder, as the iran_system
+StreamWriter does: it holds back the text after the last character that
+neither joins its neighbours nor belongs to an alphanumeric run, so shaping
+and reversal see the same context as when the whole stream is encoded at
+once. The text before it is converted with unicode_to_iransystem of the
+selected backend, and characters without an Iran System form become '?' as
+in encode(). To keep buffers bounded, at most max_pending characters are held back; past that the held
+text is encoded as if the stream ended there, which only changes the
+output for a run or joined word longer than max_pending. Reads are limited
+to read_size bytes and every write waits for the transport to drain.
+
+Pieces of offload_threshold characters or bytes and more are converted in
+an executor, the loop's default thread pool unless one is given, so the
+event loop keeps running while they are converted. The conversions keep
+state between pieces, so the executor must run them in this process.
+
+encode_async() and decode_async() are awaitable forms of encode() and
+decode() for whole values, also available as iran_encoding.encode_async and
+iran_encoding.decode_async::
+
+    data = await iran_encoding.encode_async(document)
+
+Values shorter than the threshold of configure_async() are converted at
+once on the event loop. Longer ones go to an executor shared by all
+callers: a thread pool, or a process pool when the default backend is the
+pure Python one, whose conversions hold the GIL. At most max_queue
+conversions per event loop are queued or running; further callers wait
+for a free place. async_stats() reports the queue depth and latencies.
+"""
+import asyncio
+import codecs
+import os
+import threading
+import time
+import weakref
+from collections import deque
+
+from . import backends, decode, encode
+from .codec import CODEC_NAME, LOGICAL_CODEC_NAME, BoundaryEncoder
+
+__all__ = ['encode_chunks', 'decode_chunks', 'EncodingWriter', 'DecodingReader', 'transcode_stream',
+           'encode_async', 'decode_async', 'configure_async', 'async_stats']
+
+# Pieces of at least this many characters or bytes are converted in an executor.
+OFFLOAD_THRESHOLD = 1 << 16
+
+# Bytes read from a StreamReader at a time.
+READ_SIZE = 1 << 16
+
+# Characters the encoder may hold back waiting for a boundary.
+MAX_PENDING = 1 << 16
+
+
+def _stream_encoder(visual_ordering, max_pending, backend):
+    """A codec.BoundaryEncoder converting with the backend's unicode_to_iransystem."""
+    return BoundaryEncoder(backends.encoder(backend), visual_ordering, max_pending)
+
+
+def _stream_decoder(backend):
+    """decode(data, final=False) for Iran System; decoding needs no context."""
+    convert = backends.decoder(backend)
+    return lambda data, final=False: convert(data)
+
+
+class _Converter:
+    """Run a conversion on the event loop or, for large pieces, in an executor."""
+
+    def __init__(self, convert, executor, offload_threshold):
+        self.convert = convert
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+
+    async def __call__(self, data, final=False):
+        if len(data) < self.offload_threshold:
+            return self.convert(data, final)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.convert, data, final)
+
+
+async def _pieces(iterable):
+    if hasattr(iterable, '__aiter__'):
+        async for piece in iterable:
+            yield piece
+    else:
+        for piece in iterable:
+            yield piece
+
+
+async def encode_chunks(chunks, visual_ordering=True, executor=None, offload_threshold=OFFLOAD_THRESHOLD,
+                        max_pending=MAX_PENDING, backend=None):
+    """Encode an iterable or async iterable of strings to Iran System, yielding bytes."""
+    convert = _Converter(_stream_encoder(visual_ordering, max_pending, backend).encode,
+                         executor, offload_threshold)
+    async for text in _pieces(chunks):
+        data = await convert(text)
+        if data:
+            yield data
+    data = await convert("", final=True)
+    if data:
+        yield data
+
+
+async def decode_chunks(chunks, executor=None, offload_threshold=OFFLOAD_THRESHOLD, backend=None):
+    """Decode an iterable or async iterable of Iran System bytes, yielding strings."""
+    convert = _Converter(_stream_decoder(backend), executor, offload_threshold)
+    async for data in _pieces(chunks):
+        text = await convert(data)
+        if text:
+            yield text
+
+
+class EncodingWriter:
+    """
+    Write text to an asyncio StreamWriter as Iran System bytes.
+
+    write() waits for the transport to drain, so the buffered output stays
+    bounded. close() writes the held-back tail and closes the writer.
+    """
+
+    def __init__(self, writer, visual_ordering=True, executor=None, offload_threshold=OFFLOAD_THRESHOLD,
+                 max_pending=MAX_PENDING, backend=None):
+        self.writer = writer
+        self._convert = _Converter(_stream_encoder(visual_ordering, max_pending, backend).encode,
+                                   executor, offload_threshold)
+
+    async def write(self, text):
+        self.writer.write(await self._convert(text))
+        await self.writer.drain()
+
+    async def flush(self):
+        """Write the held-back tail, as at the end of the stream."""
+        self.writer.write(await self._convert("", final=True))
+        await self.writer.drain()
+
+    async def close(self):
+        await self.flush()
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class DecodingReader:
+    """
+    Read text from an asyncio StreamReader carrying Iran System bytes.
+
+    Every byte decodes to one character, so read(n) returns at most n
+    characters. Iterating yields pieces of up to read_size characters.
+    """
+
+    def __init__(self, reader, read_size=READ_SIZE, executor=None, offload_threshold=OFFLOAD_THRESHOLD,
+                 backend=None):
+        self.reader = reader
+        self.read_size = read_size
+        self._convert = _Converter(_stream_decoder(backend), executor, offload_threshold)
+
+    async def read(self, n=None):
+        """Up to n characters (read_size by default); '' at the end of the stream."""
+        return await self._convert(await self.reader.read(self.read_size if n is None else n))
+
+    async def readline(self):
+        """The next line, with its line break; '' at the end of the stream."""
+        return await self._convert(await self.reader.readline())
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        text = await self.read()
+        if not text:
+            raise StopAsyncIteration
+        return text
+
+
+async def transcode_stream(reader, writer, from_encoding=CODEC_NAME, to_encoding='utf-8',
+                           visual_ordering=True, errors='strict', read_size=READ_SIZE, executor=None,
+                           offload_threshold=OFFLOAD_THRESHOLD, max_pending=MAX_PENDING, backend=None):
+    """
+    Copy reader to writer until the end of the stream, converting from one
+    encoding to another as iran_encoding.transcode.transcode_file() does;
+    errors applies to the codec other than Iran System. The writer is not
+    closed. Returns the number of bytes written.
+    """
+    from_name, to_name = codecs.lookup(from_encoding).name, codecs.lookup(to_encoding).name
+    if from_name in (CODEC_NAME, LOGICAL_CODEC_NAME):
+        decode = _stream_decoder(backend)
+    else:
+        decode = codecs.getincrementaldecoder(from_encoding)(errors).decode
+    if to_name in (CODEC_NAME, LOGICAL_CODEC_NAME):
+        encode = _stream_encoder(visual_ordering and to_name == CODEC_NAME, max_pending, backend).encode
+    else:
+        encode = codecs.getincrementalencoder(to_encoding)(errors).encode
+    convert = _Converter(lambda data, final: encode(decode(data, final), final), executor, offload_threshold)
+    written = 0
+    while True:
+        data = await reader.read(read_size)
+        converted = await convert(data, final=not data)
+        writer.write(converted)
+        written += len(converted)
+        await writer.drain()
+        if not data:
+            return written
+
+
+### Awaitable encode and decode
+
+# Values of at least this many characters or bytes go to the shared executor.
+ASYNC_THRESHOLD = 1 << 14
+
+# Offloaded calls whose latencies async_stats() summarizes.
+LATENCY_WINDOW = 10000
+
+
+def _timed(function, *args):
+    """Call function in the executor and return its result with the seconds it took."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def _milliseconds(values):
+    values = sorted(values)
+    if not values:
+        return {'p50': None, 'p99': None, 'max': None}
+    return {
+        'p50': round(values[len(values) // 2] * 1e3, 3),
+        'p99': round(values[min(int(0.99 * len(values)), len(values) - 1)] * 1e3, 3),
+        'max': round(values[-1] * 1e3, 3),
+    }
+
+
+class _AsyncPool:
+    """The shared executor of encode_async() and decode_async(), with its statistics."""
+
+    def __init__(self):
+        self.threshold = ASYNC_THRESHOLD
+        self.max_workers = os.cpu_count() or 1
+        self.max_queue = 4 * self.max_workers
+        self.kind = 'auto'
+        self._executor = None
+        self._executor_kind = None
+        self._limits = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.inline = 0
+            self.offloaded = 0
+            self.waiting = 0
+            self.depth = 0
+            self.max_depth = 0
+            self.latencies = deque(maxlen=LATENCY_WINDOW)
+            self.waits = deque(maxlen=LATENCY_WINDOW)
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                kind = self.kind
+                if kind == 'auto':
+                    kind = 'process' if backends.get_default_backend() == 'python' else 'thread'
+                if kind == 'process':
+                    from concurrent.futures import ProcessPoolExecutor
+                    self._executor = ProcessPoolExecutor(self.max_workers)
+                else:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='iran-encoding')
+                self._executor_kind = kind
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor, self._executor_kind = self._executor, None, None
+            self._limits = weakref.WeakKeyDictionary()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _limit(self, loop):
+        # asyncio semaphores belong to one event loop.
+        with self._lock:
+            limit = self._limits.get(loop)
+            if limit is None:
+                limit = self._limits[loop] = asyncio.Semaphore(self.max_queue)
+            return limit
+
+    async def run(self, function, value, *args):
+        if len(value) < self.threshold:
+            with self._lock:
+                self.inline += 1
+            return function(value, *args)
+        loop = asyncio.get_running_loop()
+        executor = self.executor()
+        started = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+        async with self._limit(loop):
+            with self._lock:
+                self.waiting -= 1
+                self.depth += 1
+                self.max_depth = max(self.max_depth, self.depth)
+            try:
+                result, seconds = await loop.run_in_executor(executor, _timed, function, value, *args)
+            finally:
+                with self._lock:
+                    self.depth -= 1
+        total = time.perf_counter() - started
+        with self._lock:
+            self.offloaded += 1
+            self.latencies.append(total)
+            self.waits.append(total - seconds)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'executor': self._executor_kind,
+                'threshold': self.threshold,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'inline': self.inline,
+                'offloaded': self.offloaded,
+                'queue_depth': self.depth,
+                'max_queue_depth': self.max_depth,
+                'waiting': self.waiting,
+                'latency_ms': _milliseconds(self.latencies),
+                'queue_wait_ms': _milliseconds(self.waits),
+            }
+
+
+_pool = _AsyncPool()
+
+
+def configure_async(threshold=None, max_workers=None, max_queue=None, kind=None):
+    """
+    Configure encode_async() and decode_async().
+
+    Args:
+        threshold (int): Values of at least this many characters or bytes
+                         are converted in the executor; smaller ones inline.
+        max_workers (int): Threads or processes of the executor.
+        max_queue (int): Conversions queued or running per event loop at
+                         most; further callers wait.
+        kind (str): 'thread', 'process', or 'auto' for a process pool when
+                    the default backend is 'python' and threads otherwise.
+
+    Changing the executor settings shuts the current executor down; the
+    next offloaded call starts a new one.
+    """
+    if kind not in (None, 'auto', 'thread', 'process'):
+        raise ValueError(f"unknown executor kind {kind!r}; choose 'auto', 'thread' or 'process'")
+    if threshold is not None:
+        _pool.threshold = threshold
+    if max_workers is not None or max_queue is not None or kind is not None:
+        _pool.shutdown()
+        if max_workers is not None:
+            _pool.max_workers = max_workers
+        if max_queue is not None:
+            _pool.max_queue = max_queue
+        if kind is not None:
+            _pool.kind = kind
+
+
+def async_stats(reset=False):
+    """
+    Statistics of encode_async() and decode_async(): calls run inline and
+    offloaded, the current and largest number of offloaded calls queued or
+    running, callers waiting for a place, and p50/p99/max of the latency of
+    offloaded calls and of their wait before running, over the last
+    LATENCY_WINDOW calls. reset=True clears them after reading.
+    """
+    stats = _pool.stats()
+    if reset:
+        _pool.reset_stats()
+    return stats
+
+
+async def encode_async(text, visual_ordering=True, backend=None):
+    """encode() without blocking the event loop on long text."""
+    # Workers started with spawn do not inherit a default set at run time.
+    return await _pool.run(encode, text, visual_ordering, backend or backends.get_default_backend())
+
+
+async def decode_async(iransystem_bytes, backend=None):
+    """decode() without blocking the event loop on long input."""
+    return await _pool.run(decode, iransystem_bytes, backend or backends.get_default_backend())
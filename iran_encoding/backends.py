@@ -0,0 +1,298 @@
+"""
+Backend registry for the Iran System conversions.
+
+A backend supplies the two conversion functions of core.py,
+``unicode_to_iransystem(text, reverse_flag=True)`` and
+``iransystem_to_unicode(data)``. Three are built in:
+
+- ``python``: the pure Python core, always available.
+- ``ctypes``: iran_system.c through c_wrapper for encoding; decoding uses
+  the core, which is faster than the C call.
+- ``native``: the iran_encoding._speedups extension.
+
+encode(), decode() and the batch functions take a ``backend`` argument. When
+it is omitted they use the default backend, which is read from the
+``IRAN_ENCODING_BACKEND`` environment variable and otherwise is ``native``
+when the extension is built and ``python`` when it is not. A variable that
+names an unknown or unavailable backend gives one warning and the built-in
+choice.
+
+The pseudo-backend ``auto`` picks a backend by input size. On first use it
+times every available backend on a range of sizes, keeps the sizes where the
+fastest one changes and caches them in
+``$XDG_CACHE_HOME/iran_encoding/crossover.json``, so later processes skip
+the measurement. The cache is ignored when the package version, Python
+version or set of available backends changes.
+"""
+import os
+from _thread import allocate_lock
+from bisect import bisect_right
+
+ENV_VAR = 'IRAN_ENCODING_BACKEND'
+AUTO = 'auto'
+
+# Input sizes timed by calibrate(), in characters or bytes.
+CALIBRATION_SIZES = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+# Mixed Persian/English sample used for calibration.
+_CALIBRATION_TEXT = "سلام دنیا، این یک متن آزمایشی است 123 Iran System "
+
+
+class Backend:
+    """The conversion functions of one backend."""
+    __slots__ = ('name', 'unicode_to_iransystem', 'iransystem_to_unicode')
+
+    def __init__(self, name, unicode_to_iransystem, iransystem_to_unicode):
+        self.name = name
+        self.unicode_to_iransystem = unicode_to_iransystem
+        self.iransystem_to_unicode = iransystem_to_unicode
+
+    def __repr__(self):
+        return f"<Backend {self.name!r}>"
+
+
+_loaders = {}
+_backends = {}
+_unavailable = {}
+# threading, json, timeit and platform are imported where needed; together
+# they cost more to import than the rest of the package.
+_lock = allocate_lock()
+_default = None
+_crossovers = None
+
+
+def register_backend(name, loader):
+    """
+    Register a backend under name.
+
+    loader is called on first use and returns a
+    ``(unicode_to_iransystem, iransystem_to_unicode)`` pair, or raises
+    ImportError when the backend cannot run on this system. Registering an
+    existing name replaces it.
+    """
+    if name == AUTO:
+        raise ValueError(f"'{AUTO}' is reserved for size-based selection")
+    global _crossovers
+    with _lock:
+        _loaders[name] = loader
+        _backends.pop(name, None)
+        _unavailable.pop(name, None)
+        _crossovers = None
+
+
+def get_backend(name):
+    """
+    Return the Backend registered as name.
+
+    Raises ValueError for unknown names and ImportError when the backend is
+    not available here.
+    """
+    backend = _backends.get(name)
+    if backend is not None:
+        return backend
+    if name not in _loaders:
+        raise ValueError(f"unknown backend {name!r}; choose from "
+                         f"{', '.join(sorted(_loaders))} or {AUTO!r}")
+    with _lock:
+        if name in _backends:
+            return _backends[name]
+        if name not in _unavailable:
+            try:
+                encode, decode = _loaders[name]()
+            except ImportError as exc:
+                _unavailable[name] = str(exc)
+            else:
+                _backends[name] = Backend(name, encode, decode)
+                return _backends[name]
+    raise ImportError(f"backend {name!r} is not available: {_unavailable[name]}")
+
+
+def available_backends():
+    """Names of the registered backends that can run here, in registration order."""
+    names = []
+    for name in list(_loaders):
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_default_backend():
+    """Name of the backend used when none is given."""
+    if _default is None:
+        name = os.environ.get(ENV_VAR) or None
+        try:
+            set_default_backend(name)
+        except (ImportError, ValueError) as exc:
+            import warnings
+            warnings.warn(f"ignoring {ENV_VAR}={name!r}: {exc}", RuntimeWarning, stacklevel=2)
+            set_default_backend(None)
+    return _default
+
+
+def set_default_backend(name=None):
+    """
+    Set the backend used when none is given; None restores the built-in
+    choice of ``native`` with a fallback to ``python``.
+    """
+    global _default
+    if name is None:
+        try:
+            get_backend('native')
+        except ImportError:
+            name = 'python'
+        else:
+            name = 'native'
+    elif name != AUTO:
+        get_backend(name)
+    _default = name
+
+
+def _resolve(name, size):
+    if name is None:
+        name = _default or get_default_backend()
+    if name == AUTO:
+        return get_backend(_auto_choice(size))
+    return get_backend(name)
+
+
+def encoder(name=None, size=0):
+    """unicode_to_iransystem of the named backend, or of the auto choice for size."""
+    return _resolve(name, size).unicode_to_iransystem
+
+
+def decoder(name=None, size=0):
+    """iransystem_to_unicode of the named backend, or of the auto choice for size."""
+    return _resolve(name, size).iransystem_to_unicode
+
+
+### Size-based selection
+
+def _auto_choice(size):
+    crossovers = _crossovers or load_crossovers()
+    sizes, names = crossovers
+    return names[max(bisect_right(sizes, size) - 1, 0)]
+
+
+def calibration_path():
+    """File where the measured crossover points are cached."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'iran_encoding', 'crossover.json')
+
+
+def _calibration_key(names):
+    import platform
+    import sys
+    from . import __version__
+    return {
+        'version': __version__,
+        'python': platform.python_version(),
+        'implementation': sys.implementation.name,
+        'machine': platform.machine(),
+        'backends': names,
+    }
+
+
+def _best_time(func, arg):
+    import timeit
+    timer = timeit.Timer(lambda: func(arg))
+    number = max(1, int(2e-3 / max(timer.timeit(1), 1e-7)))
+    return min(timer.repeat(3, number)) / number
+
+
+def calibrate(sizes=CALIBRATION_SIZES):
+    """
+    Time every available backend at each size and return the crossovers as
+    ``(sizes, names)``: names[i] is the fastest backend from sizes[i] up to
+    the next entry. A backend counts as fastest when it wins the combined
+    encode and decode time.
+    """
+    names = available_backends()
+    winners = []
+    for size in sizes:
+        text = (_CALIBRATION_TEXT * (size // len(_CALIBRATION_TEXT) + 1))[:size]
+        data = get_backend('python').unicode_to_iransystem(text)
+        timings = {
+            name: _best_time(get_backend(name).unicode_to_iransystem, text)
+            + _best_time(get_backend(name).iransystem_to_unicode, data)
+            for name in names
+        }
+        winners.append(min(timings, key=timings.get))
+
+    crossover_sizes, crossover_names = [0], [winners[0]]
+    for size, name in zip(sizes[1:], winners[1:]):
+        if name != crossover_names[-1]:
+            crossover_sizes.append(size)
+            crossover_names.append(name)
+    return crossover_sizes, crossover_names
+
+
+def load_crossovers(recalibrate=False):
+    """
+    Return the crossover points for ``auto``, reading the cache file or
+    measuring and writing it when it is missing, stale or recalibrate is
+    True. A cache directory that cannot be written is not an error.
+    """
+    import json
+    global _crossovers
+    with _lock:
+        if _crossovers is not None and not recalibrate:
+            return _crossovers
+    key = _calibration_key(available_backends())
+    path = calibration_path()
+    crossovers = None
+    if not recalibrate:
+        try:
+            with open(path, encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('key') == key:
+                crossovers = (cached['sizes'], cached['backends'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    if crossovers is None:
+        crossovers = calibrate()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'sizes': crossovers[0], 'backends': crossovers[1]}, f)
+            os.replace(temporary, path)
+        except OSError:
+            pass
+    with _lock:
+        _crossovers = crossovers
+    return crossovers
+
+
+### Built-in backends
+
+def _load_python():
+    from .core import iransystem_to_unicode, unicode_to_iransystem
+    return unicode_to_iransystem, iransystem_to_unicode
+
+
+def _load_native():
+    from ._speedups import iransystem_to_unicode, unicode_to_iransystem
+    return unicode_to_iransystem, iransystem_to_unicode
+
+
+def _load_ctypes():
+    from . import c_wrapper
+    from .core import iransystem_to_unicode, unicode_to_iransystem
+    if not c_wrapper.is_available():
+        raise ImportError("the iran_system C library could not be loaded")
+
+    def ctypes_unicode_to_iransystem(unicode_string, reverse_flag=True):
+        result = c_wrapper.unicode_to_iransystem_c(unicode_string, reverse_flag)
+        return unicode_to_iransystem(unicode_string, reverse_flag) if result is None else result
+
+    # Decoding is one codecs.charmap_decode in core, which is three to ten
+    # times faster than the ctypes call and its UTF-32 round trip.
+    return ctypes_unicode_to_iransystem, iransystem_to_unicode
+
+
+register_backend('python', _load_python)
+register_backend('ctypes', _load_ctypes)
+register_backend('native', _load_native)
@@ -1,132 +1,213 @@
 """
 Professional Python wrapper for the Iran System C library.
 Provides performance-optimized alternatives to the pure Python core implementation.
+
+Nothing is compiled at run time. The C functions are loaded with ctypes, on
+first use, from the iran_encoding._speedups extension module that
+``setup.py`` builds ahead of time (it links iran_system.c and exports its
+functions), or else from a shared library built in place by
+build_c_extension.py.
 """
 import ctypes
-import os
-import platform
-import subprocess
+import sys
+import threading
 from pathlib import Path
 
-def _compile_c_library():
-    """Compile the Iran System C library if a compiler is available."""
-    current_dir = Path(__file__).parent
-    c_source = current_dir / "iran_system.c"
-    
-    system = platform.system()
-    if system == "Windows":
-        lib_name = "iran_system.dll"
-    elif system == "Darwin":
-        lib_name = "libiran_system.dylib"
-    else:
-        lib_name = "libiran_system.so"
-    
-    lib_path = current_dir / lib_name
-    
-    # Check if we need to recompile
-    if lib_path.exists():
-        if c_source.exists() and lib_path.stat().st_mtime >= c_source.stat().st_mtime:
-            return str(lib_path)
-    
-    if not c_source.exists():
-        return None
+_lock = threading.Lock()
+_lib = None
+_loaded = False
+
+# The C functions take and return code points as native unsigned ints.
+_UTF32 = 'utf-32-le' if sys.byteorder == 'little' else 'utf-32-be'
+
+def _shared_library_name():
+    if sys.platform == "win32":
+        return "iran_system.dll"
+    if sys.platform == "darwin":
+        return "libiran_system.dylib"
+    return "libiran_system.so"
+
+def _library_candidates():
+    """Paths of prebuilt binaries containing iran_system.c, best first."""
+    from importlib.util import find_spec
+    try:
+        spec = find_spec("iran_encoding._speedups")
+    except (ImportError, ValueError):  # blocked in sys.modules
+        spec = None
+    if spec is not None and spec.origin:
+        yield spec.origin
+    shared_library = Path(__file__).parent / _shared_library_name()
+    if shared_library.exists():
+        yield str(shared_library)
 
-    # Compilation commands to try
-    compilers = [
-        ["gcc", "-shared", "-fPIC", "-O3", "-o", str(lib_path), str(c_source)],
-        ["clang", "-shared", "-fPIC", "-O3", "-o", str(lib_path), str(c_source)],
+def _configure(lib):
+    """Declare the signatures of the C functions used here."""
+    lib.UnicodeToIransystem.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
+    lib.UnicodeToIransystem.restype = None
+
+    lib.IransystemToUnicode.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
+    lib.IransystemToUnicode.restype = None
+
+    lib.UnicodeNumberToIransystem.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
+    lib.UnicodeNumberToIransystem.restype = None
+
+    lib.ReverseIransystem.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
+    lib.ReverseIransystem.restype = None
+
+    lib.UnicodeToPersianScript.argtypes = [ctypes.c_uint]
+    lib.UnicodeToPersianScript.restype = ctypes.c_ubyte
+
+    lib.UnicodeToIransystemEx.argtypes = [
+        ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p, ctypes.c_int
     ]
-    
-    for cmd in compilers:
+    lib.UnicodeToIransystemEx.restype = ctypes.c_size_t
+
+    lib.UnicodeToIransystemUtf32.argtypes = [
+        ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p, ctypes.c_int
+    ]
+    lib.UnicodeToIransystemUtf32.restype = ctypes.c_size_t
+
+    lib.IransystemToUtf32.argtypes = [ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p]
+    lib.IransystemToUtf32.restype = ctypes.c_size_t
+    return lib
+
+def _load_c_library():
+    """Load the first prebuilt binary exporting the C API, or return None."""
+    for path in _library_candidates():
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
-            return str(lib_path)
-        except (subprocess.CalledProcessError, FileNotFoundError):
+            return _configure(ctypes.CDLL(path))
+        except (OSError, AttributeError):  # unloadable, or built from older sources
             continue
-
     return None
 
-def _load_c_library():
-    """Attempt to load the C library, compiling it if necessary."""
-    lib_path = _compile_c_library()
-    if not lib_path:
-        return None
+def get_library():
+    """The loaded C library, loading it on the first call; None if unavailable."""
+    global _lib, _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                _lib = _load_c_library()
+                _loaded = True
+    return _lib
 
-    try:
-        lib = ctypes.CDLL(lib_path)
-
-        # Configure function signatures
-        lib.UnicodeToIransystem.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
-        lib.UnicodeToIransystem.restype = None
-        
-        lib.IransystemToUnicode.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
-        lib.IransystemToUnicode.restype = None
-        
-        lib.UnicodeNumberToIransystem.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
-        lib.UnicodeNumberToIransystem.restype = None
-        
-        lib.ReverseIransystem.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
-        lib.ReverseIransystem.restype = None
-        
-        lib.UnicodeToPersianScript.argtypes = [ctypes.c_uint]
-        lib.UnicodeToPersianScript.restype = ctypes.c_ubyte
-        
-        return lib
-    except Exception:
-        return None
+def library_path():
+    """File the C library was loaded from, or None."""
+    lib = get_library()
+    return lib._name if lib is not None else None
+
+def __getattr__(name):
+    # C_LIB used to be loaded at import; it is now resolved on first access.
+    if name == "C_LIB":
+        return get_library()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Singleton instance of the loaded C library
-C_LIB = _load_c_library()
+# Option flags of the *Ex functions, see iran_system.h
+REVERSE_ALPHANUMERIC = 0x1
 
 def is_available():
     """Check if the C extension is available for use."""
-    return C_LIB is not None
+    return get_library() is not None
 
-def unicode_to_iransystem_c(unicode_str):
+def _flags(reverse_flag):
+    return REVERSE_ALPHANUMERIC if reverse_flag else 0
+
+def _input_buffer(data):
+    """
+    Return (pointer, length) for a bytes-like input without copying it.
+
+    bytes are passed as they are and writable buffers are shared through
+    from_buffer; only read-only buffers other than bytes need a copy.
+    """
+    if isinstance(data, bytes):
+        return data, len(data)
+    view = memoryview(data).cast('B')
+    if view.readonly:
+        return view.tobytes(), len(view)
+    return (ctypes.c_char * len(view)).from_buffer(view), len(view)
+
+def _output_buffer(out, size):
+    """Share a writable buffer with C, checking it can hold size bytes."""
+    view = memoryview(out).cast('B')
+    if view.readonly:
+        raise TypeError("output buffer must be writable")
+    if len(view) < size:
+        raise ValueError(f"output buffer too small: {len(view)} < {size} bytes")
+    return (ctypes.c_char * len(view)).from_buffer(view)
+
+def unicode_to_iransystem_c(unicode_str, reverse_flag=True):
     """
     Convert Unicode string to Iran System using C implementation.
+
+    The whole string crosses into C once as UTF-32, where code point mapping,
+    alphanumeric reversal and shaping all happen in a single call.
     """
-    if not C_LIB:
+    lib = get_library()
+    if not lib:
         return None
-        
+
     try:
-        # Step 1: Convert Unicode to Persian Script bytes using C helper
-        script_bytes = bytearray()
-        for char in unicode_str:
-            script_bytes.append(C_LIB.UnicodeToPersianScript(ord(char)))
-
-        # Step 2: Use the main conversion logic
-        max_size = len(script_bytes) + 256
-        output = ctypes.create_string_buffer(max_size)
-        C_LIB.UnicodeToIransystem(bytes(script_bytes), output)
-        
-        return output.value
+        # surrogatepass keeps lone surrogates as one code unit, which C maps to '?'
+        utf32 = unicode_str.encode(_UTF32, 'surrogatepass')
+        length = len(unicode_str)
+        output = ctypes.create_string_buffer(length)
+        written = lib.UnicodeToIransystemUtf32(utf32, length, output, _flags(reverse_flag))
+        return output.raw[:written]
     except Exception:
         return None
 
+def script_bytes_to_iransystem_c(script_bytes, reverse_flag=True):
+    """
+    Apply the alphanumeric reversal and shaping stages in C.
+
+    Accepts any bytes-like object; NUL bytes are converted, not treated as
+    the end of the input.
+    """
+    lib = get_library()
+    if not lib:
+        return None
+
+    try:
+        pointer, length = _input_buffer(script_bytes)
+        output = bytearray(length)
+        lib.UnicodeToIransystemEx(pointer, length, _output_buffer(output, length),
+                                    _flags(reverse_flag))
+        return bytes(output)
+    except Exception:
+        return None
+
+def script_bytes_to_iransystem_into(script_bytes, out, reverse_flag=True):
+    """
+    Like script_bytes_to_iransystem_c, but write into the writable buffer
+    out (a bytearray, writable memoryview or mmap) and return the number of
+    bytes written. Both buffers are shared with C without copying, and out
+    may be the input buffer itself for in-place conversion.
+    """
+    lib = get_library()
+    if not lib:
+        raise RuntimeError("C library is not available")
+
+    pointer, length = _input_buffer(script_bytes)
+    return lib.UnicodeToIransystemEx(pointer, length, _output_buffer(out, length),
+                                       _flags(reverse_flag))
+
 def iransystem_to_unicode_c(iransystem_bytes):
     """
     Convert Iran System bytes to Unicode using C implementation.
+
+    C folds every byte to its upper form and maps it to its final code point,
+    returning UTF-32 that Python decodes in one step. This is a reference
+    for the C decoder rather than a fast path: core.iransystem_to_unicode,
+    a single codecs.charmap_decode, runs three to ten times faster, and the
+    ctypes backend decodes with it.
     """
-    if not C_LIB:
+    lib = get_library()
+    if not lib:
         return None
-        
+
     try:
-        max_size = len(iransystem_bytes) * 4 + 256
-        output = ctypes.create_string_buffer(max_size)
-        C_LIB.IransystemToUnicode(iransystem_bytes, output)
-        
-        # The result from C is the intermediate "Persian Script" bytes
-        # We need to map them back to actual Unicode characters
-        script_bytes = output.value
-        result = []
-        # Since we don't have a vectorized version of PersianScriptToUnicode in C header yet,
-        # we can do it in Python or just use the Python core for decoding
-        # because decoding is usually less performance-critical than encoding.
-        from .core import persian_script_to_unicode
-        for b in script_bytes:
-            result.append(chr(persian_script_to_unicode(b)))
-        
-        return "".join(result)
+        pointer, length = _input_buffer(iransystem_bytes)
+        output = ctypes.create_string_buffer(length * 4)
+        written = lib.IransystemToUtf32(pointer, length, output)
+        return output.raw[:written * 4].decode(_UTF32)
     except Exception:
         return None
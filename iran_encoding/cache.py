@@ -0,0 +1,164 @@
+"""
+An opt-in LRU cache in front of encode() and decode().
+
+Workloads that convert the same short values over and over, such as
+product, city or customer names, can keep their results instead of
+mapping, reversing and shaping them again::
+
+    from iran_encoding import cache
+
+    cache.enable(max_entries=100_000, max_bytes=64 << 20)
+    iran_encoding.encode("تهران")   # converted and kept
+    iran_encoding.encode("تهران")   # answered from the cache
+    cache.stats()
+
+Encoded values are keyed on (text, visual_ordering) and decoded values on
+the bytes; the backend does not change results, so it is not part of the
+key. Values longer than max_item_size characters or bytes are converted
+without touching the cache, so large documents cannot flush it, and ASCII
+values, which encode() and decode() convert directly, are never cached.
+When either max_entries or max_bytes is exceeded the least recently used
+entries are evicted. The cache is safe to share between threads; a lock
+guards it, and conversions run outside the lock.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+import iran_encoding
+
+__all__ = ['LRUCache', 'enable', 'disable', 'clear', 'stats']
+
+# Default limits of enable().
+MAX_ENTRIES = 65536
+MAX_BYTES = 32 << 20
+
+# Longest value, in characters or bytes, that is cached by default.
+MAX_ITEM_SIZE = 256
+
+
+def _charge(key, value):
+    """Memory of an entry: the value, the key and the text of an encode key."""
+    size = sys.getsizeof(key) + sys.getsizeof(value)
+    if type(key) is tuple:
+        size += sys.getsizeof(key[0])
+    return size
+
+
+class LRUCache:
+    """
+    A bounded cache of conversion results in least recently used order.
+
+    Args:
+        max_entries (int): Entries kept at most.
+        max_bytes (int): Memory of the kept keys and values at most, as
+                         measured by sys.getsizeof.
+        max_item_size (int): Longest value cached; longer ones are
+                             converted but not kept.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, max_item_size=MAX_ITEM_SIZE):
+        if max_entries < 0 or max_bytes < 0 or max_item_size < 0:
+            raise ValueError("cache limits must not be negative")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_item_size = max_item_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0
+
+    def encode(self, text, visual_ordering, backend):
+        """encode() of non-ASCII text through the cache."""
+        if len(text) > self.max_item_size:
+            with self._lock:
+                self.bypassed += 1
+            return iran_encoding._encode_text(text, visual_ordering, backend)
+        return self._convert((text, visual_ordering), iran_encoding._encode_text,
+                             text, visual_ordering, backend)
+
+    def decode(self, iransystem_bytes, backend):
+        """decode() of non-ASCII bytes through the cache."""
+        # bytearray and other buffers are mutable, so only bytes are keys.
+        if len(iransystem_bytes) > self.max_item_size or type(iransystem_bytes) is not bytes:
+            with self._lock:
+                self.bypassed += 1
+            return iran_encoding._decode_bytes(iransystem_bytes, backend)
+        return self._convert(iransystem_bytes, iran_encoding._decode_bytes, iransystem_bytes, backend)
+
+    def _convert(self, key, convert, *args):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = convert(*args)
+        size = _charge(key, value)
+        with self._lock:
+            if size > self.max_bytes or self.max_entries == 0:
+                return value
+            old = self._entries.pop(key, None)
+            if old is not None:
+                # Another thread converted the same value meanwhile.
+                self._bytes -= _charge(key, old)
+            self._entries[key] = value
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                old_key, old = self._entries.popitem(last=False)
+                self._bytes -= _charge(old_key, old)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        """Drop every entry; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Entries, bytes and the hit, miss, eviction and bypass counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'max_item_size': self.max_item_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'bypassed': self.bypassed,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def enable(max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, max_item_size=MAX_ITEM_SIZE):
+    """
+    Put a new LRUCache in front of encode() and decode(), replacing any
+    previous one, and return it.
+    """
+    cache = LRUCache(max_entries, max_bytes, max_item_size)
+    iran_encoding._cache = cache
+    return cache
+
+
+def disable():
+    """Stop caching and drop the cache."""
+    iran_encoding._cache = None
+
+
+def clear():
+    """Drop the entries of the current cache, if any."""
+    if iran_encoding._cache is not None:
+        iran_encoding._cache.clear()
+
+
+def stats():
+    """stats() of the current cache, or None when caching is disabled."""
+    return iran_encoding._cache.stats() if iran_encoding._cache is not None else None
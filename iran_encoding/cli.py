@@ -2,9 +2,86 @@
 This module provides the command-line interface for the iran-encoding package.
 """
 import argparse
-import ast
-import json
-from iran_encoding import encode, decode, decode_hex
+import sys
+from iran_encoding import encode, decode, decode_hex, encode_many, decode_many
+
+# Buffer size of the batch modes' input and output, and the amount of input
+# converted per encode_many/decode_many call.
+BATCH_BUFFER_SIZE = 1 << 20
+
+# Bytes other than hex digits, which the hex input of decode skips.
+_NOT_HEX = bytes(b for b in range(256) if chr(b) not in "0123456789abcdefABCDEF")
+
+
+def _read_batches(paths):
+    """
+    Yield the lines of the files in paths ('-' is stdin) without their line
+    breaks, in lists of about BATCH_BUFFER_SIZE bytes.
+    """
+    for path in paths:
+        if path == "-":
+            stream = open(sys.stdin.fileno(), "rb", buffering=BATCH_BUFFER_SIZE, closefd=False)
+        else:
+            stream = open(path, "rb", buffering=BATCH_BUFFER_SIZE)
+        with stream:
+            while True:
+                lines = stream.readlines(BATCH_BUFFER_SIZE)
+                if not lines:
+                    break
+                yield [line.rstrip(b"\r\n") for line in lines]
+
+
+def _encode_batches(batches, output, output_format, visual_ordering):
+    """Encode UTF-8 lines and write one record per line in output_format."""
+    if output_format == "json":
+        import json
+        # One encoder for every record; json.dumps() with options builds a new one per call.
+        to_json = json.JSONEncoder(ensure_ascii=False).encode
+    elif output_format == "hex":
+        # bytes.hex() takes a separator only from Python 3.8.
+        hex_bytes = [f"{b:02x}" for b in range(256)]
+    for lines in batches:
+        texts = [line.decode("utf-8", "replace") for line in lines]
+        encoded = encode_many(texts, visual_ordering)
+        if output_format == "raw":
+            output.write(b"".join(data + b"\n" for data in encoded))
+        elif output_format == "hex":
+            output.write("".join(" ".join(map(hex_bytes.__getitem__, data)) + "\n"
+                                 for data in encoded).encode("ascii"))
+        else:
+            output.write("".join(f'{{"text": {to_json(text)}, "hex": "{data.hex()}"}}\n'
+                                 for text, data in zip(texts, encoded)).encode("utf-8"))
+
+
+def _decode_batches(batches, output, output_format, hex_input):
+    """Decode Iran System lines and write one UTF-8 record per line in output_format."""
+    if output_format == "json":
+        import json
+        # One encoder for every record; json.dumps() with options builds a new one per call.
+        to_json = json.JSONEncoder(ensure_ascii=False).encode
+    for lines in batches:
+        if hex_input:
+            lines = [bytes.fromhex(line.translate(None, _NOT_HEX).decode("ascii")) for line in lines]
+        decoded = decode_many(lines)
+        if output_format == "raw":
+            output.write("".join(text + "\n" for text in decoded).encode("utf-8"))
+        else:
+            output.write("".join(f'{{"hex": "{data.hex()}", "text": {to_json(text)}}}\n'
+                                 for data, text in zip(lines, decoded)).encode("utf-8"))
+
+
+def _run_batch(args, convert, *options):
+    """Run a batch mode, writing to stdout through a large buffer."""
+    paths = (args.input or []) + (["-"] if args.stdin else [])
+    sys.stdout.flush()
+    with open(sys.stdout.fileno(), "wb", buffering=BATCH_BUFFER_SIZE, closefd=False) as output:
+        try:
+            convert(_read_batches(paths), output, *options)
+        except (OSError, ValueError) as e:
+            output.flush()
+            print(f"Error: {e}", file=sys.stderr)
+            exit(1)
+
 
 def main():
     """The main entry point for the CLI."""
@@ -12,22 +89,66 @@ def main():
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # Encode command
-    encode_parser = subparsers.add_parser("encode", help="Encode a string.")
-    encode_parser.add_argument("text", type=str, help="The string to encode.")
+    encode_parser = subparsers.add_parser("encode", help="Encode a string, or lines of text with --stdin or --input.")
+    encode_parser.add_argument("text", type=str, nargs="?", help="The string to encode.")
     encode_parser.add_argument("--logical", action="store_true", help="Output in logical order instead of visual order.")
     encode_parser.add_argument("--config", type=str, help="A JSON string with configuration options for the reshaper.")
+    encode_parser.add_argument("--stdin", action="store_true", help="Encode each line of UTF-8 text read from stdin.")
+    encode_parser.add_argument("--input", action="append", metavar="FILE",
+                               help="Encode each line of a UTF-8 text file; may be repeated.")
+    encode_parser.add_argument("--format", choices=("raw", "hex", "json"), default="hex",
+                               help="Output of --stdin and --input: raw bytes, space-separated hex "
+                                    "or JSON objects, one line per record (default: hex).")
 
     # Decode command
-    decode_parser = subparsers.add_parser("decode", help="Decode a byte string.")
-    decode_parser.add_argument("data", type=str, help="The byte string to decode (e.g., \"b'\\xde\\xad'\").")
+    decode_parser = subparsers.add_parser("decode", help="Decode a byte string, or lines of bytes with --stdin or --input.")
+    decode_parser.add_argument("data", type=str, nargs="?", help="The byte string to decode (e.g., \"b'\\xde\\xad'\").")
+    decode_parser.add_argument("--stdin", action="store_true", help="Decode each line of Iran System bytes read from stdin.")
+    decode_parser.add_argument("--input", action="append", metavar="FILE",
+                               help="Decode each line of an Iran System file; may be repeated.")
+    decode_parser.add_argument("--hex", action="store_true", help="Input lines are hex strings rather than raw bytes.")
+    decode_parser.add_argument("--format", choices=("raw", "json"), default="raw",
+                               help="Output of --stdin and --input: UTF-8 text or JSON objects, "
+                                    "one line per record (default: raw).")
 
     # Decode-hex command
     decode_hex_parser = subparsers.add_parser("decode-hex", help="Decode a hex string.")
     decode_hex_parser.add_argument("hex_string", type=str, help="The hex string to decode (e.g., 'deadbeef').")
 
+    # Transcode command
+    transcode_parser = subparsers.add_parser("transcode", help="Convert a file between encodings.")
+    transcode_parser.add_argument("input", type=str, help="The file to convert.")
+    transcode_parser.add_argument("output", type=str, help="The file to write.")
+    transcode_parser.add_argument("--from", dest="from_encoding", default="iran_system",
+                                  help="Encoding of the input file (default: iran_system).")
+    transcode_parser.add_argument("--to", dest="to_encoding", default="utf-8",
+                                  help="Encoding of the output file (default: utf-8).")
+    transcode_parser.add_argument("--logical", action="store_true",
+                                  help="Write Iran System in logical order instead of visual order.")
+    transcode_parser.add_argument("--errors", default="strict",
+                                  help="Error handling of the non-Iran System codec (default: strict).")
+    transcode_parser.add_argument("--jobs", type=int, default=1,
+                                  help="Worker processes for large files; 0 uses one per CPU (default: 1).")
+
+    # Serve command
+    serve_parser = subparsers.add_parser("serve", help="Run a local conversion server.")
+    serve_parser.add_argument("--socket", type=str, help="Listen on this Unix socket instead of TCP.")
+    serve_parser.add_argument("--host", type=str, default="127.0.0.1", help="TCP address (default: 127.0.0.1).")
+    serve_parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765).")
+    serve_parser.add_argument("--max-batch", type=int, default=1024, help="Values converted per batch at most (default: 1024).")
+    serve_parser.add_argument("--batch-delay", type=float, default=0.0,
+                              help="Milliseconds to wait for more requests before each batch (default: 0).")
+
     args = parser.parse_args()
 
-    if args.command == "encode":
+    if args.command in ("encode", "decode") and (args.stdin or args.input):
+        if args.command == "encode":
+            _run_batch(args, _encode_batches, args.format, not args.logical)
+        else:
+            _run_batch(args, _decode_batches, args.format, args.hex)
+    elif args.command == "encode" and args.text is None or args.command == "decode" and args.data is None:
+        parser.error(f"{args.command} needs a value, --stdin or --input")
+    elif args.command == "encode":
         try:
             encoded_result = encode(args.text, visual_ordering=not args.logical)
             # Print a space-separated hex string
@@ -38,7 +159,9 @@ def main():
             exit(1)
     elif args.command == "decode":
         try:
-            # Safely evaluate the byte string literal
+            # Safely evaluate the byte string literal. ast is imported here
+            # because the other commands do not need it.
+            import ast
             byte_data = ast.literal_eval(args.data)
             if not isinstance(byte_data, bytes):
                 raise TypeError("Input must be a byte string literal (e.g., b'...')")
@@ -54,6 +177,22 @@ def main():
         except Exception as e:
             print(f"Error: {e}")
             exit(1)
+    elif args.command == "transcode":
+        # Imported here to keep the start-up of the other commands short.
+        from iran_encoding.transcode import transcode_file
+        try:
+            transcode_file(args.input, args.output, args.from_encoding, args.to_encoding,
+                           visual_ordering=not args.logical, errors=args.errors, jobs=args.jobs)
+        except (OSError, ValueError, LookupError) as e:
+            print(f"Error: {e}")
+            exit(1)
+    elif args.command == "serve":
+        from iran_encoding.server import serve
+        try:
+            serve(args.host, args.port, args.socket, args.max_batch, args.batch_delay / 1e3)
+        except OSError as e:
+            print(f"Error: {e}")
+            exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,287 @@
+"""
+Python codec registration for the Iran System encoding.
+
+Importing iran_encoding registers two codecs with the standard ``codecs``
+machinery, so the usual text APIs work directly::
+
+    "سلام".encode("iran_system")
+    data.decode("iran_system")
+    open(path, "w", encoding="iran_system")
+
+``iran_system`` follows unicode_to_iransystem with visual ordering, and
+``iran_system_logical`` skips the alphanumeric reversal. Both always apply
+the Iran System flow; the locale detection of iran_encoding.encode() needs
+the whole text and therefore has no place in a streaming codec.
+
+Shaping looks one byte ahead and the alphanumeric reversal needs complete
+runs, so only the text up to the last byte that neither stays in a run nor
+changes shape with its neighbours (line breaks, Persian digits and
+non-joining letters such as alef, dal or vav) encodes the same whatever
+follows it. The two incremental encoders deal with the rest differently:
+
+* IncrementalEncoder, used by io.TextIOWrapper and so by the built-in
+  open(), encodes each piece as if the text ended there, because
+  TextIOWrapper never passes ``final=True``. It keeps the script bytes after
+  the last boundary, and a following piece that would change how they
+  encode, such as the rest of a joined word or an alphanumeric run in visual
+  order, raises UnicodeEncodeError instead of writing wrong bytes. Writing
+  whole lines never raises.
+* BoundaryEncoder, used by StreamWriter, the file transcoder and the
+  asyncio streams, holds that tail back until more text or the end of the
+  text shows how it encodes, so any split gives the output of the whole
+  text. To keep it bounded, past MAX_PENDING characters the tail is encoded
+  as if the text ended there, which only changes the output for a run or
+  joined word longer than that.
+"""
+import codecs
+
+from .core import (
+    DECODING_TABLE,
+    PERSIAN_SCRIPT_TRANSLATION,
+    PREV_CONNECT_FLAGS,
+    SHAPING_TABLES,
+)
+
+try:
+    from ._speedups import script_bytes_to_iransystem
+except ImportError:  # built without a C compiler
+    from .core import script_bytes_to_iransystem
+
+CODEC_NAME = 'iran_system'
+LOGICAL_CODEC_NAME = 'iran_system_logical'
+
+# Characters a BoundaryEncoder holds back, or an IncrementalEncoder checks
+# again, at most.
+MAX_PENDING = 1 << 16
+
+
+def _is_boundary(script_byte):
+    """
+    True if output split right after this script byte equals the output of
+    the whole text: it ends any alphanumeric run, does not join the next
+    character and its own form does not depend on the next character.
+    """
+    if 0x20 <= script_byte <= 0x7E or PREV_CONNECT_FLAGS[script_byte]:
+        return False
+    return all(SHAPING_TABLES[prev][script_byte] == SHAPING_TABLES[prev | 1][script_byte]
+               for prev in (0, 2))
+
+
+# Translation table marking boundary script bytes with 0x01.
+BOUNDARY_MARKS = bytes(1 if _is_boundary(b) else 0 for b in range(256))
+
+
+def _to_script_bytes(text, errors):
+    """Map code points to script bytes, reporting failures as iran_system."""
+    translated = text.translate(PERSIAN_SCRIPT_TRANSLATION)
+    try:
+        return translated.encode('latin-1', errors)
+    except UnicodeEncodeError as exc:
+        raise UnicodeEncodeError(CODEC_NAME, text, exc.start, exc.end,
+                                 'character maps to <undefined>') from None
+
+
+def _encode(text, errors, reverse_flag):
+    return script_bytes_to_iransystem(_to_script_bytes(text, errors), reverse_flag)
+
+
+def _decode(data, errors):
+    return codecs.charmap_decode(data, errors, DECODING_TABLE)
+
+
+def _end_of_last_boundary(text, limit):
+    """
+    Index just after the last boundary character among the last limit
+    characters of text, or the start of those characters if there is none.
+    """
+    window = 256
+    while True:
+        start = max(len(text) - min(window, limit), 0)
+        # 'replace' keeps one script byte per character.
+        marks = _to_script_bytes(text[start:], 'replace').translate(BOUNDARY_MARKS)
+        end = marks.rfind(b'\x01') + 1
+        if end or not start or window >= limit:
+            return start + end
+        window *= 4
+
+
+class BoundaryEncoder:
+    """
+    Encodes text that arrives in pieces with convert(text, reverse_flag),
+    holding back the text after the last boundary until more text, or
+    ``final=True``, shows how it encodes.
+
+    Args:
+        convert: unicode_to_iransystem or a backend's equivalent.
+        reverse_flag (bool): Passed on to convert.
+        max_pending (int): Characters held back at most; a longer tail is
+                           encoded as if the text ended there.
+    """
+
+    def __init__(self, convert, reverse_flag=True, max_pending=MAX_PENDING):
+        self.convert = convert
+        self.reverse_flag = reverse_flag
+        self.max_pending = max_pending
+        self.pending = ''
+
+    def encode(self, text, final=False):
+        text = self.pending + text
+        if final:
+            split = len(text)
+        else:
+            split = _end_of_last_boundary(text, self.max_pending + 1)
+            if len(text) - split > self.max_pending:
+                split = len(text)
+        self.pending = text[split:]
+        return self.convert(text[:split], self.reverse_flag)
+
+
+### Codec APIs
+
+class Codec(codecs.Codec):
+    reverse_flag = True
+
+    def encode(self, input, errors='strict'):
+        return _encode(input, errors, self.reverse_flag), len(input)
+
+    def decode(self, input, errors='strict'):
+        return _decode(input, errors)
+
+
+class IncrementalEncoder(codecs.IncrementalEncoder):
+    """
+    Encodes each piece as if the text ended there, and raises
+    UnicodeEncodeError for a piece that would change bytes already returned.
+    """
+    reverse_flag = True
+    max_pending = MAX_PENDING
+
+    def __init__(self, errors='strict'):
+        super().__init__(errors)
+        # Script bytes after the last boundary, and what they encoded to.
+        self.tail = b''
+        self.written = b''
+
+    def encode(self, input, final=False):
+        script_bytes = self.tail + _to_script_bytes(input, self.errors)
+        encoded = script_bytes_to_iransystem(script_bytes, self.reverse_flag)
+        if not encoded.startswith(self.written):
+            raise UnicodeEncodeError(
+                CODEC_NAME, input, 0, 1,
+                'continues a joined word or alphanumeric run that is already '
+                'encoded; write whole lines or use codecs.getwriter()')
+        output = encoded[len(self.written):]
+        split = script_bytes.translate(BOUNDARY_MARKS).rfind(b'\x01') + 1
+        if final or len(script_bytes) - split > self.max_pending:
+            split = len(script_bytes)
+        self.tail = script_bytes[split:]
+        self.written = encoded[split:]
+        return output
+
+    def reset(self):
+        self.tail = self.written = b''
+
+    def getstate(self):
+        # A leading 0x01 keeps leading NUL bytes of the tail.
+        return int.from_bytes(b'\x01' + self.tail, 'big') if self.tail else 0
+
+    def setstate(self, state):
+        self.tail = state.to_bytes((state.bit_length() + 7) // 8, 'big')[1:] if state else b''
+        self.written = script_bytes_to_iransystem(self.tail, self.reverse_flag)
+
+
+class IncrementalDecoder(codecs.IncrementalDecoder):
+    def decode(self, input, final=False):
+        return _decode(input, self.errors)[0]
+
+
+class StreamWriter(Codec, codecs.StreamWriter):
+    def __init__(self, stream, errors='strict'):
+        super().__init__(stream, errors)
+        self.encoder = BoundaryEncoder(self._convert, self.reverse_flag)
+
+    def _convert(self, text, reverse_flag):
+        return _encode(text, self.errors, reverse_flag)
+
+    def write(self, object):
+        self.stream.write(self.encoder.encode(object))
+
+    def reset(self):
+        """Write the held-back tail so the output is complete."""
+        self.stream.write(self.encoder.encode('', final=True))
+
+    def close(self):
+        self.reset()
+        self.stream.close()
+
+    def __exit__(self, type, value, tb):
+        self.close()
+
+
+class StreamReader(Codec, codecs.StreamReader):
+    pass
+
+
+### Logical order variants
+
+class LogicalCodec(Codec):
+    reverse_flag = False
+
+
+class LogicalIncrementalEncoder(IncrementalEncoder):
+    reverse_flag = False
+
+
+class LogicalStreamWriter(StreamWriter):
+    reverse_flag = False
+
+
+class LogicalStreamReader(StreamReader):
+    pass
+
+
+### encodings module API
+
+def getregentry(logical=False):
+    """Return the CodecInfo for the visual or logical order codec."""
+    if logical:
+        return codecs.CodecInfo(
+            name=LOGICAL_CODEC_NAME,
+            encode=LogicalCodec().encode,
+            decode=LogicalCodec().decode,
+            incrementalencoder=LogicalIncrementalEncoder,
+            incrementaldecoder=IncrementalDecoder,
+            streamwriter=LogicalStreamWriter,
+            streamreader=LogicalStreamReader,
+        )
+    return codecs.CodecInfo(
+        name=CODEC_NAME,
+        encode=Codec().encode,
+        decode=Codec().decode,
+        incrementalencoder=IncrementalEncoder,
+        incrementaldecoder=IncrementalDecoder,
+        streamwriter=StreamWriter,
+        streamreader=StreamReader,
+    )
+
+
+_ALIASES = {
+    'iran_system': False,
+    'iransystem': False,
+    'iran_system_visual': False,
+    'iran_system_logical': True,
+    'iransystem_logical': True,
+}
+
+
+def search_function(encoding):
+    """codecs search function for the Iran System codec names."""
+    name = encoding.lower().replace('-', '_').replace(' ', '_')
+    if name not in _ALIASES:
+        return None
+    return getregentry(logical=_ALIASES[name])
+
+
+def register():
+    """Register the codecs; called once when iran_encoding is imported."""
+    codecs.register(search_function)
@@ -3,47 +3,53 @@ Core implementation of Iran System encoding logic, ported from C.
 This module provides a pure Python implementation of the original C code
 to ensure consistent behavior across all platforms without external dependencies.
 """
-from typing import List, Union, Optional
+from __future__ import annotations
+
+import codecs
+from itertools import islice
+from operator import getitem, or_
+
+from ._tables import DECODING_TABLE, NEXT_CONNECT_FLAGS, PREV_CONNECT_FLAGS, SHAPING_TABLES
 
 # Character mapping tables ported from iran_system.c
-UNICODE_NUMBER_STR: List[int] = [0x30, 0x31, 0x32, 0x33, 0x34, 0x35, 0x36, 0x37, 0x38, 0x39]
-IRANSYSTEM_NUMBER_STR: List[int] = [0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89]
+UNICODE_NUMBER_STR: list[int] = [0x30, 0x31, 0x32, 0x33, 0x34, 0x35, 0x36, 0x37, 0x38, 0x39]
+IRANSYSTEM_NUMBER_STR: list[int] = [0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89]
 
-UNICODE_STR: List[int] = [
+UNICODE_STR: list[int] = [
     0xC2, 0xC8, 0x81, 0xCA, 0xCB, 0xCC, 0x8D, 0xCD, 0xCE, 0xCF, 0xD0, 0xD1, 0xD2,
     0x8E, 0xD3, 0xD4, 0xD5, 0xD6, 0xD8, 0xD9, 0xDD, 0xDE, 0x98, 0x90, 0xE1, 0xE3,
     0xE4, 0xE6, 0x80, 0x8A, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x20,
     0xA1, 0xC1
 ]
 
-IRANSYSTEM_UPPER_STR: List[int] = [
+IRANSYSTEM_UPPER_STR: list[int] = [
     0x8D, 0x92, 0x94, 0x96, 0x98, 0x9A, 0x9C, 0x9E, 0xA0, 0xA2, 0xA3, 0xA4, 0xA5,
     0xA6, 0xA7, 0xA9, 0xAB, 0xAD, 0xAF, 0xE0, 0xE9, 0xEB, 0xED, 0xEF, 0xF1, 0xF4,
     0xF6, 0xF8, 0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x20,
     0x8A, 0x8F
 ]
 
-IRANSYSTEM_LOWER_STR: List[int] = [
+IRANSYSTEM_LOWER_STR: list[int] = [
     0x8D, 0x93, 0x95, 0x97, 0x99, 0x9B, 0x9D, 0x9F, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5,
     0xA6, 0xA8, 0xAA, 0xAC, 0xAE, 0xAF, 0xE0, 0xEA, 0xEC, 0xEE, 0xF0, 0xF3, 0xF5,
     0xF7, 0xF8, 0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x20,
     0x8A, 0x8E
 ]
 
-NEXT_CHAR_STR: List[int] = [
+NEXT_CHAR_STR: list[int] = [
     0xC2, 0xC7, 0xC8, 0x81, 0xCA, 0xCB, 0xCC, 0x8D, 0xCD, 0xCE, 0xCF, 0xD0, 0xD1,
     0xD2, 0x8E, 0xD3, 0xD4, 0xD5, 0xD6, 0xD8, 0xD9, 0xDD, 0xDE, 0x98, 0x90, 0xE1,
     0xE3, 0xE4, 0xE6, 0xDA, 0xDB, 0xED, 0xE5, 0xC1
 ]
 
-PREV_CHAR_STR: List[int] = [
+PREV_CHAR_STR: list[int] = [
     0xC8, 0x81, 0xCA, 0xCB, 0xCC, 0x8D, 0xCD, 0xCE, 0xD3, 0xD4, 0xD5, 0xD6, 0xD8,
     0xD9, 0xDA, 0xDB, 0xDD, 0xDE, 0x98, 0x90, 0xE1, 0xE3, 0xE4, 0xE5, 0xED, 0xC1
 ]
 
-UNICODE_STR_TAIL: List[int] = [0xDA, 0xDB, 0xE5, 0xC7, 0xED]
-IRANSYSTEM_UPPER_STR_TAIL: List[int] = [0xE1, 0xE5, 0xF9, 0x90, 0xFD]
-IRANSYSTEM_LOWER_STR_TAIL: List[int] = [
+UNICODE_STR_TAIL: list[int] = [0xDA, 0xDB, 0xE5, 0xC7, 0xED]
+IRANSYSTEM_UPPER_STR_TAIL: list[int] = [0xE1, 0xE5, 0xF9, 0x90, 0xFD]
+IRANSYSTEM_LOWER_STR_TAIL: list[int] = [
     0xE2, 0xE3, 0xE4,  # ein
     0xE6, 0xE7, 0xE8,  # ghein
     0xFA, 0xFB, 0xFB,  # he
@@ -51,7 +57,7 @@ IRANSYSTEM_LOWER_STR_TAIL: List[int] = [
     0xFC, 0xFE, 0xFE   # ye
 ]
 
-WIDE_CHAR_STR: List[int] = [
+WIDE_CHAR_STR: list[int] = [
     0x0622, 0x0628, 0x067E, 0x062A, 0x062B, 0x062C, 0x0686, 0x062D, 0x062E, 0x062F,
     0x0630, 0x0631, 0x0632, 0x0698, 0x0633, 0x0634, 0x0635, 0x0636, 0x0637, 0x0638,
     0x0639, 0x063A, 0x0641, 0x0642, 0x06A9, 0x06AF, 0x0644, 0x0645, 0x0646, 0x0648,
@@ -60,7 +66,7 @@ WIDE_CHAR_STR: List[int] = [
     0x00C6
 ]
 
-UTF8_STR: List[int] = [
+UTF8_STR: list[int] = [
     0xC2, 0xC8, 0x81, 0xCA, 0xCB, 0xCC, 0x8D, 0xCD, 0xCE, 0xCF, 0xD0, 0xD1, 0xD2,
     0x8E, 0xD3, 0xD4, 0xD5, 0xD6, 0xD8, 0xD9, 0xDA, 0xDB, 0xDD, 0xDE, 0x98, 0x90,
     0xE1, 0xE3, 0xE4, 0xE6, 0xE5, 0xED, 0x80, 0x8A, 0x82, 0x83, 0x84, 0x85, 0x86,
@@ -68,13 +74,13 @@ UTF8_STR: List[int] = [
 ]
 
 
-def is_digit_irs(c: Union[int, str]) -> bool:
+def is_digit_irs(c: int | str) -> bool:
     """Check if character is a digit or Iran System digit."""
     val = c if isinstance(c, int) else ord(c)
     return (ord('0') <= val <= ord('9')) or (0x80 <= val <= 0x89)
 
 
-def find_pos(in_byte: int, area_list: List[int]) -> int:
+def find_pos(in_byte: int, area_list: list[int]) -> int:
     """Find position of a byte in a list."""
     try:
         return area_list.index(in_byte)
@@ -82,7 +88,7 @@ def find_pos(in_byte: int, area_list: List[int]) -> int:
         return -1
 
 
-def find_pos16(in_val: int, area_list: List[int]) -> int:
+def find_pos16(in_val: int, area_list: list[int]) -> int:
     """Find position of a 16-bit value in a list."""
     try:
         return area_list.index(in_val)
@@ -127,28 +133,37 @@ def reverse(in_bytes: bytes) -> bytes:
     return in_bytes[::-1]
 
 
-def reverse_alpha_numeric(in_bytes: bytes) -> bytes:
-    """
-    Reverse alphanumeric sequences in a way that respects Iran System visual order.
-    Matches the improved logic in the C implementation.
-    """
-    length = len(in_bytes)
-    out = bytearray(in_bytes)
-    number_position = 0
+# Runs of two or more printable ASCII bytes, the spans ReverseAlphaNumeric
+# flips. ALPHA_NUMERIC_RUN_PATTERN is compiled on first use because
+# importing re costs more than the rest of the package.
+ALPHA_NUMERIC_RUN = rb'[\x20-\x7e]{2,}'
+_alpha_numeric_run_pattern = None
 
-    for byte_count in range(length + 1):
-        current = in_bytes[byte_count] if byte_count < length else 0xFF
 
-        if current > 0x7E or current < 0x20:
-            if (byte_count - number_position) > 1:
-                for number_count in range(number_position, byte_count):
-                    out[number_count] = in_bytes[byte_count - (number_count - number_position) - 1]
-            number_position = byte_count + 1
+def _get_alpha_numeric_run_pattern():
+    """Compile ALPHA_NUMERIC_RUN on the first call and return the pattern."""
+    global _alpha_numeric_run_pattern
+    if _alpha_numeric_run_pattern is None:
+        import re
+        _alpha_numeric_run_pattern = re.compile(ALPHA_NUMERIC_RUN)
+    return _alpha_numeric_run_pattern
 
-        if byte_count < length:
-            out[byte_count] = in_bytes[byte_count]
 
-    return bytes(out)
+def _reversed_match(match) -> bytes:
+    return match.group()[::-1]
+
+
+def _reverse_runs(script_bytes: bytes) -> bytes:
+    return _get_alpha_numeric_run_pattern().sub(_reversed_match, script_bytes)
+
+
+def reverse_alpha_numeric(in_bytes: bytes) -> bytes:
+    """
+    Reverse alphanumeric sequences in a way that respects Iran System visual order.
+    Matches the improved logic in the C implementation: every maximal run of
+    printable ASCII bytes (0x20-0x7E) longer than one byte is reversed in place.
+    """
+    return _reverse_runs(bytes(in_bytes))
 
 
 def reverse_iransystem(in_bytes: bytes) -> bytes:
@@ -193,89 +208,179 @@ def unicode_to_persian_script(unicode_char_code: int) -> int:
         return unicode_char_code if unicode_char_code < 256 else ord('?')
 
 
-def unicode_to_iransystem(unicode_string: str, reverse_flag: bool = True) -> bytes:
+# str.translate table from Unicode code points to intermediate script bytes.
+# Code points missing here pass through, and encoding the translated text as
+# latin-1 with errors='replace' turns everything above 0xFF into '?', which
+# is exactly what unicode_to_persian_script does one character at a time.
+PERSIAN_SCRIPT_TRANSLATION = {
+    code: chr(script_byte) for code, script_byte in zip(WIDE_CHAR_STR, UTF8_STR)
+}
+
+
+def unicode_to_persian_script_bytes(unicode_string: str) -> bytes:
+    """Convert a whole Unicode string to intermediate Persian script bytes."""
+    return unicode_string.translate(PERSIAN_SCRIPT_TRANSLATION).encode('latin-1', 'replace')
+
+
+def _contextual_form(current_byte: int, prev_connects: bool, next_connects: bool) -> int:
     """
-    Main function to convert Unicode string to Iran System bytes.
-    Matches the logic of UnicodeToIransystem in C.
+    Pick the Iran System form of a script byte from its joining context.
+    This is the rule ladder of UnicodeToIransystem in C, evaluated once per
+    table entry instead of once per input byte.
     """
-    # First convert Unicode to the intermediate "Persian Script" bytes
-    script_bytes = bytearray()
-    for char in unicode_string:
-        script_bytes.append(unicode_to_persian_script(ord(char)))
+    pos_index = find_pos(current_byte, UNICODE_STR)
+    if pos_index >= 0:
+        if next_connects:
+            return IRANSYSTEM_LOWER_STR[pos_index]
+        return IRANSYSTEM_UPPER_STR[pos_index]
+
+    # Special cases for complex Persian characters
+    if current_byte == 218:  # ein
+        if next_connects:
+            return 227 if prev_connects else 228  # medial / initial
+        return 226 if prev_connects else 225  # final connected / isolated
+    if current_byte == 219:  # ghein
+        if next_connects:
+            return 231 if prev_connects else 232  # medial / initial
+        return 230 if prev_connects else 229  # final connected / isolated
+    if current_byte == 229:  # he
+        if next_connects:
+            return 250 if prev_connects else 251  # medial / initial
+        return 249  # final
+    if current_byte == 199:  # alef
+        return 145 if prev_connects else 144  # connected / isolated
+    if current_byte == 237:  # ye
+        if next_connects:
+            return 254  # medial
+        return 252 if prev_connects else 253  # final connected / isolated
+
+    # Handle numbers
+    p_idx = find_pos(current_byte, UNICODE_NUMBER_STR)
+    if p_idx >= 0:
+        return IRANSYSTEM_NUMBER_STR[p_idx]
+    return current_byte
+
+
+# Joining classes of every script byte: PREV_CONNECT_FLAGS holds 2 where the
+# byte joins the character after it, NEXT_CONNECT_FLAGS holds 1 where it
+# joins the character before it. OR-ing the neighbours' flags gives a
+# context index 0-3 into SHAPING_TABLES, whose entries are the output byte
+# for each (context, current byte) pair. The tables are generated into
+# _tables.py by the builders below, so importing the package builds nothing.
+def _build_connect_flags() -> tuple[bytes, bytes]:
+    """PREV_CONNECT_FLAGS and NEXT_CONNECT_FLAGS, computed from the C tables."""
+    return (bytes(2 if b in PREV_CHAR_STR else 0 for b in range(256)),
+            bytes(1 if b in NEXT_CHAR_STR else 0 for b in range(256)))
+
+
+def _build_shaping_tables() -> tuple[bytes, ...]:
+    """SHAPING_TABLES, one _contextual_form per (context, byte) pair."""
+    return tuple(
+        bytes(_contextual_form(b, bool(context & 2), bool(context & 1)) for b in range(256))
+        for context in range(4)
+    )
+
+
+def shape_script(script_bytes: bytes) -> bytes:
+    """
+    Apply contextual shaping to intermediate script bytes.
+    Each output byte is a lookup in SHAPING_TABLES keyed by the joining
+    classes of its neighbours; all iteration happens in C.
+    """
+    if not script_bytes:
+        return b""
+    prev_flags = (b"\x00" + script_bytes[:-1]).translate(PREV_CONNECT_FLAGS)
+    next_flags = (script_bytes[1:] + b"\x00").translate(NEXT_CONNECT_FLAGS)
+    tables = map(SHAPING_TABLES.__getitem__, map(or_, prev_flags, next_flags))
+    return bytes(map(getitem, tables, script_bytes))
 
-    if reverse_flag:
-        input_bytes = reverse_alpha_numeric(bytes(script_bytes))
-    else:
-        input_bytes = bytes(script_bytes)
 
-    result = bytearray(input_bytes)
-    length = len(input_bytes)
+def script_bytes_to_iransystem(script_bytes: bytes, reverse_flag: bool = True) -> bytes:
+    """Apply the alphanumeric reversal and shaping stages to script bytes."""
+    if reverse_flag:
+        script_bytes = _reverse_runs(script_bytes)
+    return shape_script(script_bytes)
 
-    for byte_count in range(length):
-        prev_byte = input_bytes[byte_count - 1] if byte_count > 0 else 0
-        next_byte = input_bytes[byte_count + 1] if byte_count < (length - 1) else 0
 
-        current_byte = input_bytes[byte_count]
-        pos_index = find_pos(current_byte, UNICODE_STR)
+def unicode_to_iransystem(unicode_string: str, reverse_flag: bool = True) -> bytes:
+    """
+    Main function to convert Unicode string to Iran System bytes.
+    Matches the logic of UnicodeToIransystem in C.
+    """
+    # Each stage is a single C-level pass: str.translate and encode map the
+    # code points, one regex substitution flips the alphanumeric runs, and
+    # the shaping tables resolve the contextual forms.
+    return script_bytes_to_iransystem(unicode_to_persian_script_bytes(unicode_string), reverse_flag)
+
+
+# Words whose shaped form a WordEncoder keeps by default.
+MAX_WORDS = 1 << 16
+
+# Printable ASCII script bytes never join a neighbour and shape the same in
+# every context (only the digits change), and no other byte shapes into
+# printable ASCII. So a space separates words that shape independently, and
+# the alphanumeric runs can still be found after shaping if printable bytes
+# are left unshaped: WORD_SHAPING_TABLES are SHAPING_TABLES with printable
+# ASCII kept as is, and PRINTABLE_FORMS gives the final form of those bytes
+# once the runs have been reversed. test_core checks these properties.
+_PRINTABLE = bytes(range(0x20, 0x7F))
+WORD_SHAPING_TABLES = tuple(table[:0x20] + _PRINTABLE + table[0x7F:] for table in SHAPING_TABLES)
+PRINTABLE_FORMS = bytes(range(0x20)) + SHAPING_TABLES[0][0x20:0x7F] + bytes(range(0x7F, 0x100))
+
+
+def _shape_words(script_bytes: bytes) -> bytes:
+    """shape_script with WORD_SHAPING_TABLES, leaving printable ASCII as is."""
+    if not script_bytes:
+        return b""
+    prev_flags = (b"\x00" + script_bytes[:-1]).translate(PREV_CONNECT_FLAGS)
+    next_flags = (script_bytes[1:] + b"\x00").translate(NEXT_CONNECT_FLAGS)
+    tables = map(WORD_SHAPING_TABLES.__getitem__, map(or_, prev_flags, next_flags))
+    return bytes(map(getitem, tables, script_bytes))
+
+
+class WordEncoder:
+    """
+    unicode_to_iransystem for long documents with a limited vocabulary.
 
-        if pos_index >= 0:
-            if find_pos(next_byte, NEXT_CHAR_STR) >= 0:
-                result[byte_count] = IRANSYSTEM_LOWER_STR[pos_index]
-            else:
-                result[byte_count] = IRANSYSTEM_UPPER_STR[pos_index]
-        else:
-            # Special cases for complex Persian characters
-            if current_byte == 218:  # ein
-                if find_pos(next_byte, NEXT_CHAR_STR) >= 0:
-                    if find_pos(prev_byte, PREV_CHAR_STR) >= 0:
-                        result[byte_count] = 227  # medial
-                    else:
-                        result[byte_count] = 228  # initial
-                else:
-                    if find_pos(prev_byte, PREV_CHAR_STR) >= 0:
-                        result[byte_count] = 226  # final connected
-                    else:
-                        result[byte_count] = 225  # final isolated
-            elif current_byte == 219:  # ghein
-                if find_pos(next_byte, NEXT_CHAR_STR) >= 0:
-                    if find_pos(prev_byte, PREV_CHAR_STR) >= 0:
-                        result[byte_count] = 231  # medial
-                    else:
-                        result[byte_count] = 232  # initial
-                else:
-                    if find_pos(prev_byte, PREV_CHAR_STR) >= 0:
-                        result[byte_count] = 230  # final connected
-                    else:
-                        result[byte_count] = 229  # final isolated
-            elif current_byte == 229:  # he
-                if find_pos(next_byte, NEXT_CHAR_STR) >= 0:
-                    if find_pos(prev_byte, PREV_CHAR_STR) >= 0:
-                        result[byte_count] = 250  # medial
-                    else:
-                        result[byte_count] = 251  # initial
-                else:
-                    result[byte_count] = 249  # final
-            elif current_byte == 199:  # alef
-                if find_pos(prev_byte, PREV_CHAR_STR) >= 0:
-                    result[byte_count] = 145  # connected
-                else:
-                    result[byte_count] = 144  # isolated
-            elif current_byte == 237:  # ye
-                if find_pos(next_byte, NEXT_CHAR_STR) >= 0:
-                    result[byte_count] = 254  # medial
-                else:
-                    if find_pos(prev_byte, PREV_CHAR_STR) >= 0:
-                        result[byte_count] = 252  # final connected
-                    else:
-                        result[byte_count] = 253  # final isolated
-            else:
-                # Handle numbers
-                if ord('0') <= current_byte <= ord('9'):
-                    p_idx = find_pos(current_byte, UNICODE_NUMBER_STR)
-                    if p_idx >= 0:
-                        result[byte_count] = IRANSYSTEM_NUMBER_STR[p_idx]
+    The text is split at spaces and the shaped bytes of each word are kept
+    in a dictionary of at most max_words entries, so only unseen words are
+    mapped and shaped; the oldest words are dropped first. The alphanumeric
+    reversal then runs once over the joined words. The output is the same
+    as that of unicode_to_iransystem. An instance is meant for one thread.
+    """
 
-    return bytes(result)
+    def __init__(self, max_words: int = MAX_WORDS):
+        self.max_words = max_words
+        self.words: dict[str, bytes] = {}
+
+    def __call__(self, unicode_string: str, reverse_flag: bool = True) -> bytes:
+        words = unicode_string.split(" ")
+        parts = list(map(self.words.get, words))
+        if None in parts:
+            self._add_words(words, parts)
+        joined = b" ".join(parts)
+        if reverse_flag:
+            joined = _reverse_runs(joined)
+        return joined.translate(PRINTABLE_FORMS)
+
+    def _add_words(self, words: list[str], parts: list) -> None:
+        """Shape the words missing from parts, fill them in and remember them."""
+        missing = [i for i, part in enumerate(parts) if part is None]
+        unseen = list(dict.fromkeys(words[i] for i in missing))
+        # Shape all unseen words in one pass; a space never joins its
+        # neighbours, so each word shapes as it would on its own.
+        shaped = _shape_words(unicode_to_persian_script_bytes(" ".join(unseen))).split(b" ")
+        new = dict(zip(unseen, shaped))
+        for i in missing:
+            parts[i] = new[words[i]]
+        if len(new) >= self.max_words:
+            self.words = dict(list(new.items())[:self.max_words])
+            return
+        excess = len(self.words) + len(new) - self.max_words
+        if excess > 0:
+            for word in list(islice(self.words, excess)):
+                del self.words[word]
+        self.words.update(new)
 
 
 def persian_script_to_unicode(utf8_char_byte: int) -> int:
@@ -287,28 +392,32 @@ def persian_script_to_unicode(utf8_char_byte: int) -> int:
         return utf8_char_byte
 
 
+def _build_decoding_table() -> str:
+    """
+    Fold the upper-form, script and wide character lookups into a single
+    256-entry table, one Unicode character per Iran System byte value.
+    """
+    table = []
+    for b in range(256):
+        upper_byte = iransystem_to_upper(bytes([b]))
+        script_byte = iransystem_to_unicode_script(upper_byte)[0]
+        table.append(chr(persian_script_to_unicode(script_byte)))
+    return "".join(table)
+
+
+
 def iransystem_to_unicode(in_bytes: bytes) -> str:
     """
     Convert Iran System bytes to Unicode string.
     Ported from IransystemToUnicode in C, improved to handle all forms.
-    """
-    # First convert to upper (isolated/final) forms to handle all visual variants
-    upper_bytes = iransystem_to_upper(in_bytes)
 
-    script_bytes = bytearray()
-    for b in upper_bytes:
-        pos_index = find_pos(b, IRANSYSTEM_UPPER_STR)
-        if pos_index < 0:
-            pos_index = find_pos(b, IRANSYSTEM_UPPER_STR_TAIL)
-            if pos_index < 0:
-                script_bytes.append(b)
-            else:
-                script_bytes.append(UNICODE_STR_TAIL[pos_index])
-        else:
-            script_bytes.append(UNICODE_STR[pos_index])
+    Every byte decodes independently, so the upper-form folding and both
+    mapping stages are precomputed in DECODING_TABLE and applied in C.
+    """
+    return codecs.charmap_decode(in_bytes, 'strict', DECODING_TABLE)[0]
 
-    unicode_chars = []
-    for b in script_bytes:
-        unicode_chars.append(chr(persian_script_to_unicode(b)))
 
-    return "".join(unicode_chars)
+def __getattr__(name):
+    if name == 'ALPHA_NUMERIC_RUN_PATTERN':
+        return _get_alpha_numeric_run_pattern()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
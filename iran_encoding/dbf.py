@@ -0,0 +1,336 @@
+"""
+Streaming reader and writer for dBase (DBF) tables with Iran System text.
+
+Persian DOS databases commonly kept their tables as dBase III ``.dbf``
+files whose character (``C``) fields hold Iran System text in visual order.
+DBFReader memory-maps such a file and yields one dict per record with the
+character fields decoded; DBFWriter writes records one at a time::
+
+    from iran_encoding.dbf import DBFField, DBFReader, DBFWriter
+
+    with DBFReader('CUSTOMER.DBF', fields=['NAME', 'CITY']) as table:
+        for record in table:
+            print(record['NAME'], record['CITY'])
+
+    fields = [DBFField('NAME', 'C', 30), DBFField('BALANCE', 'N', 12, 2)]
+    with DBFWriter('OUT.DBF', fields) as table:
+        table.write({'NAME': 'شرکت نمونه', 'BALANCE': 1250.5})
+
+Only the fields named in ``fields`` are decoded. Records are read with the
+column extraction of iran_encoding.records, a chunk of records at a time,
+so memory use does not grow with the table.
+
+Character fields are decoded with iran_encoding.decode() and encoded as
+iran_encoding.encode() encodes them, in encode_many() batches: the Iran
+System path is iransystem_to_unicode / unicode_to_iransystem, and
+English-only values are written as plain ASCII. Numeric fields become int (no decimals) or float, dates
+datetime.date, logical fields True, False or None, and blank values None.
+Numbers and dates that do not parse, such as the ***** dBase writes for a
+number too wide for its field, are returned as the stored bytes, as are
+other field types such as memo block numbers.
+"""
+import datetime
+import os
+import struct
+from itertools import chain, compress, islice
+
+from . import encode_many
+from .records import CHUNK_RECORDS, Field, RecordFile, RecordLayout
+
+__all__ = ['DBFField', 'DBFReader', 'DBFWriter']
+
+# dBase III header: version, last update (YY MM DD), record count, header
+# size and record size, followed by 20 reserved bytes.
+HEADER = struct.Struct('<BBBBIHH20x')
+# Field descriptor: name, type, reserved, length, decimal count, reserved.
+FIELD_DESCRIPTOR = struct.Struct('<11sc4xBB14x')
+DBASE3 = 0x03
+HEADER_TERMINATOR = b"\r"
+END_OF_FILE = b"\x1a"
+DELETED = b"*"
+
+# Name of the layout field holding each record's deletion flag. It contains
+# characters that dBase does not allow in field names.
+_DELETION_FLAG = '(deleted)'
+
+_TRUE = frozenset(b"TtYy")
+_FALSE = frozenset(b"FfNn")
+
+
+def _parse_number(value, decimals):
+    if not value:
+        return None
+    try:
+        return float(value) if decimals or b"." in value else int(value)
+    except ValueError:  # such as the ***** dBase writes for an overflow
+        return value
+
+
+def _parse_date(value):
+    if not value.strip(b"0"):
+        return None
+    try:
+        return datetime.date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    except ValueError:
+        return value
+
+
+def _parse_logical(value):
+    if value and value[0] in _TRUE:
+        return True
+    if value and value[0] in _FALSE:
+        return False
+    return None
+
+
+class DBFField(Field):
+    """
+    A DBF field: name, type letter, length in bytes and decimal count.
+    Character fields hold Iran System text; the offset is that of the field
+    within the record and is filled in by DBFReader and DBFWriter.
+    """
+    __slots__ = ('type', 'decimals', 'parse')
+
+    def __init__(self, name, type='C', length=1, decimals=0, offset=0):
+        super().__init__(name, offset, length, iran_system=(type == 'C'))
+        self.type = type
+        self.decimals = decimals
+        # Character values need no conversion after decoding.
+        self.parse = None if type == 'C' else self._parse
+
+    @property
+    def length(self):
+        return self.width
+
+    def _parse(self, value):
+        """Convert the stripped bytes of a non-character field to its Python type."""
+        if self.type in ('N', 'F'):
+            return _parse_number(value, self.decimals)
+        if self.type == 'D':
+            return _parse_date(value)
+        if self.type == 'L':
+            return _parse_logical(value)
+        return value or None
+
+    def format(self, value, visual_ordering=True):
+        """The bytes stored for value, padded to the field length."""
+        return self.format_column([value], visual_ordering)[0]
+
+    def format_column(self, values, visual_ordering=True):
+        """
+        The bytes stored for each of values, padded to the field length.
+        Character values are encoded in one encode_many() batch, and
+        numbers are rounded to the decimal count. Raises ValueError for a
+        value that does not fit the field.
+        """
+        length = self.length
+        blank = b" " * length
+        if self.type == 'C':
+            values = ["" if value is None else value for value in values]
+            column = [data.ljust(length) for data in encode_many(values, visual_ordering)]
+        elif self.type in ('N', 'F'):
+            if self.decimals:
+                decimals = self.decimals
+                column = [blank if value is None else b"%*.*f" % (length, decimals, value) for value in values]
+            else:
+                column = [blank if value is None else b"%*d" % (length, round(value)) for value in values]
+        elif self.type == 'D':
+            column = [blank if value is None else b"%04d%02d%02d" % (value.year, value.month, value.day)
+                      for value in values]
+        elif self.type == 'L':
+            column = [b"?" if value is None else b"T" if value else b"F" for value in values]
+        else:
+            column = [blank if value is None else bytes(value).ljust(length) for value in values]
+        for value, data in zip(values, column):
+            if len(data) != length:
+                raise ValueError(f"value {value!r} does not fit field {self.name!r} of length {length}")
+        return column
+
+    def __repr__(self):
+        return f"DBFField({self.name!r}, {self.type!r}, {self.length}, {self.decimals})"
+
+
+class DBFReader:
+    """
+    A DBF table mapped into memory.
+
+    Args:
+        file: A path, or a binary file object with a fileno().
+        fields (list of str): Names of the fields to read (the projection);
+                              all fields by default.
+        include_deleted (bool): Also yield records marked as deleted.
+
+    Iterating yields one dict per record, holding the selected fields.
+    """
+
+    def __init__(self, file, fields=None, include_deleted=False):
+        if isinstance(file, (str, bytes, os.PathLike)):
+            with open(file, 'rb') as f:
+                header = f.read(HEADER.size)
+                descriptors = self._read_descriptors(f, header)
+        else:
+            file.seek(0)
+            header = file.read(HEADER.size)
+            descriptors = self._read_descriptors(file, header)
+        version, year, month, day, count, header_size, record_size = HEADER.unpack(header)
+        self.version = version
+        try:
+            self.last_update = datetime.date(1900 + year, month or 1, day or 1)
+        except ValueError:  # a date no calendar has, written by some tools
+            self.last_update = None
+
+        self.fields = []
+        offset = 1  # after the deletion flag
+        for descriptor in descriptors:
+            name, type, length, decimals = FIELD_DESCRIPTOR.unpack(descriptor)
+            name = name.split(b"\x00")[0].decode('ascii', 'replace')
+            self.fields.append(DBFField(name, type.decode('ascii'), length, decimals, offset))
+            offset += length
+        deletion_flag = Field(_DELETION_FLAG, 0, 1, iran_system=False, strip=False)
+        layout = RecordLayout([deletion_flag] + self.fields, record_size)
+
+        self.selected = [field.name for field in self.fields] if fields is None else list(fields)
+        for name in self.selected:
+            layout[name]  # unknown names fail here rather than on first use
+        self.include_deleted = include_deleted
+        self._records = RecordFile(file, layout, header_size, count)
+
+    @staticmethod
+    def _read_descriptors(f, header):
+        if len(header) < HEADER.size:
+            raise ValueError("not a DBF file: header too short")
+        header_size = HEADER.unpack(header)[5]
+        block = f.read(header_size - HEADER.size)
+        descriptors = []
+        for start in range(0, len(block), FIELD_DESCRIPTOR.size):
+            if block[start:start + 1] in (HEADER_TERMINATOR, b""):
+                break
+            descriptors.append(block[start:start + FIELD_DESCRIPTOR.size])
+        return descriptors
+
+    def close(self):
+        self._records.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """Number of records in the file, deleted ones included."""
+        return len(self._records)
+
+    def __iter__(self):
+        names = self.selected
+        records = self._records
+        chunks = zip(records.column_chunks(_DELETION_FLAG), *map(records.column_chunks, names))
+        for flags, *columns in chunks:
+            rows = [dict(zip(names, values)) for values in zip(*columns)]
+            if DELETED in flags and not self.include_deleted:
+                rows = compress(rows, [flag != DELETED for flag in flags])
+            yield from rows
+
+    def column(self, name, include_deleted=None):
+        """The values of one field, skipping deleted records unless asked not to."""
+        if include_deleted is None:
+            include_deleted = self.include_deleted
+        values = self._records.iter_column(name)
+        if include_deleted:
+            return list(values)
+        flags = self._records.iter_column(_DELETION_FLAG)
+        return [value for flag, value in zip(flags, values) if flag != DELETED]
+
+
+class DBFWriter:
+    """
+    Write a dBase III table one record at a time.
+
+    Args:
+        file: A path, or a binary file object open for writing and seeking.
+        fields (list of DBFField): The table fields; offsets are assigned
+                                   in order.
+        visual_ordering (bool): Visual ordering for character fields, as in encode().
+
+    The record count in the header is written when the writer is closed.
+    """
+
+    def __init__(self, file, fields, visual_ordering=True):
+        self.fields = []
+        offset = 1
+        for field in fields:
+            if not 0 < len(field.name) <= 10 or not field.name.isascii():
+                raise ValueError(f"DBF field name {field.name!r} must be 1 to 10 ASCII characters")
+            self.fields.append(DBFField(field.name, field.type, field.length, field.decimals, offset))
+            offset += field.length
+        self.record_size = offset
+        self.visual_ordering = visual_ordering
+        self.count = 0
+        if isinstance(file, (str, bytes, os.PathLike)):
+            self._file = open(file, 'wb')
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+        self._start = self._file.tell()
+        self._write_header()
+        for field in self.fields:
+            self._file.write(FIELD_DESCRIPTOR.pack(field.name.encode('ascii'), field.type.encode('ascii'),
+                                                   field.length, field.decimals))
+        self._file.write(HEADER_TERMINATOR)
+
+    def _write_header(self):
+        today = datetime.date.today()
+        header_size = HEADER.size + FIELD_DESCRIPTOR.size * len(self.fields) + len(HEADER_TERMINATOR)
+        self._file.write(HEADER.pack(DBASE3, today.year - 1900, today.month, today.day,
+                                     self.count, header_size, self.record_size))
+
+    def write(self, record):
+        """Append one record, given as a dict by field name or a sequence in field order."""
+        self.write_many((record,))
+
+    def write_many(self, records):
+        """
+        Append every record of an iterable. Records are formatted a chunk at
+        a time, one column after another, so the character fields of a chunk
+        are encoded in a single batch.
+        """
+        records = iter(records)
+        while True:
+            chunk = [self._values(record) for record in islice(records, CHUNK_RECORDS)]
+            if not chunk:
+                break
+            columns = [field.format_column(values, self.visual_ordering)
+                       for field, values in zip(self.fields, zip(*chunk))]
+            flags = [b" "] * len(chunk)
+            self._file.write(b"".join(chain.from_iterable(zip(flags, *columns))))
+            self.count += len(chunk)
+
+    def _values(self, record):
+        if isinstance(record, dict):
+            return [record.get(field.name) for field in self.fields]
+        values = list(record)
+        if len(values) != len(self.fields):
+            raise ValueError(f"expected {len(self.fields)} values, got {len(values)}")
+        return values
+
+    def close(self):
+        """Write the end-of-file marker and the final record count."""
+        if self._file is None:
+            return
+        self._file.write(END_OF_FILE)
+        end = self._file.tell()
+        self._file.seek(self._start)
+        self._write_header()
+        self._file.seek(end)
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
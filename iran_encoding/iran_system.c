@@ -58,8 +58,8 @@ const unsigned int wideCharStr[] = {
     0x0622, 0x0628, 0x067E, 0x062A, 0x062B, 0x062C, 0x0686, 0x062D, 0x062E, 0x062F,
     0x0630, 0x0631, 0x0632, 0x0698, 0x0633, 0x0634, 0x0635, 0x0636, 0x0637, 0x0638,
     0x0639, 0x063A, 0x0641, 0x0642, 0x06A9, 0x06AF, 0x0644, 0x0645, 0x0646, 0x0648,
-    0x0647, 0x06CC, 0x0660, 0x0661, 0x0662, 0x0663, 0x0664, 0x0665, 0x0666, 0x0667,
-    0x0668, 0x0669, 0x0020, 0x060C, 0x0627, 0x0626, 0x064A, 0x0621, 0x0643, 0x02DC,
+    0x0647, 0x06CC, 0x06F0, 0x06F1, 0x06F2, 0x06F3, 0x06F4, 0x06F5, 0x06F6, 0x06F7,
+    0x06F8, 0x06F9, 0x0020, 0x060C, 0x0627, 0x0626, 0x064A, 0x0621, 0x0643, 0x02DC,
     0x00C6, 0
 };
 
@@ -70,6 +70,7 @@ const unsigned char UTF8Str[] = {
     0x87, 0x88, 0x89, 0x20, 0xA1, 0xC7, 0xED, 0xED, 0xC1, 0x98, 0x98, 0xC1, 0
 };
 
+/* Global option of the legacy UnicodeToIransystem; the *Ex functions take flags. */
 unsigned char reverseAlphaNumericFlag = 1;
 
 /* Helper functions */
@@ -90,68 +91,400 @@ int FindPos16(unsigned int inByte, const unsigned int *areaString) {
     return -1;
 }
 
-void IransystemToUpper(unsigned char *inString, unsigned char *outString) {
-    unsigned int byteCount;
-    unsigned int len = strlen((char*)inString);
-    int posIndex;
-    for (byteCount = 0; byteCount < len; byteCount++) {
-        posIndex = FindPos(inString[byteCount], iransystemLowerStr);
-        if (posIndex < 0) {
-            posIndex = FindPos(inString[byteCount], iransystemLowerStrTail);
-            outString[byteCount] = (posIndex < 0) ? inString[byteCount] : iransystemUpperStrTail[posIndex / 3];
-        } else {
-            outString[byteCount] = iransystemUpperStr[posIndex];
+/*
+ * Lookup tables. Each conversion indexes one of these per byte instead of
+ * scanning the mapping strings above with FindPos. charClassTable holds a
+ * bitmap of IRAN_SYSTEM_CLASS_* flags; shapeTable is indexed by
+ * (context << 8) | byte, where the context is the previous byte's
+ * IRAN_SYSTEM_CLASS_PREV bit or-ed with the next byte's
+ * IRAN_SYSTEM_CLASS_NEXT bit.
+ */
+/* BEGIN GENERATED TABLES: python3 build_c_extension.py --tables */
+
+const unsigned char charClassTable[256] = {
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x04, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x03, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x03, 0x01, 0x00,
+    0x03, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x03, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+    0x00, 0x03, 0x01, 0x00, 0x00, 0x00, 0x00, 0x01, 0x03, 0x00, 0x03, 0x03, 0x03, 0x03, 0x03, 0x01,
+    0x01, 0x01, 0x01, 0x03, 0x03, 0x03, 0x03, 0x00, 0x03, 0x03, 0x03, 0x03, 0x00, 0x03, 0x03, 0x00,
+    0x00, 0x03, 0x00, 0x03, 0x03, 0x03, 0x01, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x03, 0x00, 0x00,
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+};
+
+const unsigned char iransystemUpperTable[256] = {
+    0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0F,
+    0x10, 0x11, 0x12, 0x13, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1A, 0x1B, 0x1C, 0x1D, 0x1E, 0x1F,
+    0x20, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x29, 0x2A, 0x2B, 0x2C, 0x2D, 0x2E, 0x2F,
+    0x30, 0x31, 0x32, 0x33, 0x34, 0x35, 0x36, 0x37, 0x38, 0x39, 0x3A, 0x3B, 0x3C, 0x3D, 0x3E, 0x3F,
+    0x40, 0x41, 0x42, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48, 0x49, 0x4A, 0x4B, 0x4C, 0x4D, 0x4E, 0x4F,
+    0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F,
+    0x60, 0x61, 0x62, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68, 0x69, 0x6A, 0x6B, 0x6C, 0x6D, 0x6E, 0x6F,
+    0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7A, 0x7B, 0x7C, 0x7D, 0x7E, 0x7F,
+    0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x8A, 0x8B, 0x8C, 0x8D, 0x8F, 0x8F,
+    0x90, 0x90, 0x92, 0x92, 0x94, 0x94, 0x96, 0x96, 0x98, 0x98, 0x9A, 0x9A, 0x9C, 0x9C, 0x9E, 0x9E,
+    0xA0, 0xA0, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA7, 0xA9, 0xA9, 0xAB, 0xAB, 0xAD, 0xAD, 0xAF,
+    0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5, 0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF,
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC4, 0xC5, 0xC6, 0xC7, 0xC8, 0xC9, 0xCA, 0xCB, 0xCC, 0xCD, 0xCE, 0xCF,
+    0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8, 0xD9, 0xDA, 0xDB, 0xDC, 0xDD, 0xDE, 0xDF,
+    0xE0, 0xE1, 0xE1, 0xE1, 0xE1, 0xE5, 0xE5, 0xE5, 0xE5, 0xE9, 0xE9, 0xEB, 0xEB, 0xED, 0xED, 0xEF,
+    0xEF, 0xF1, 0xF2, 0xF1, 0xF4, 0xF4, 0xF6, 0xF6, 0xF8, 0xF9, 0xF9, 0xF9, 0xFD, 0xFD, 0xFD, 0xFF,
+};
+
+const unsigned char iransystemScriptTable[256] = {
+    0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0F,
+    0x10, 0x11, 0x12, 0x13, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1A, 0x1B, 0x1C, 0x1D, 0x1E, 0x1F,
+    0x20, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x29, 0x2A, 0x2B, 0x2C, 0x2D, 0x2E, 0x2F,
+    0x30, 0x31, 0x32, 0x33, 0x34, 0x35, 0x36, 0x37, 0x38, 0x39, 0x3A, 0x3B, 0x3C, 0x3D, 0x3E, 0x3F,
+    0x40, 0x41, 0x42, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48, 0x49, 0x4A, 0x4B, 0x4C, 0x4D, 0x4E, 0x4F,
+    0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F,
+    0x60, 0x61, 0x62, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68, 0x69, 0x6A, 0x6B, 0x6C, 0x6D, 0x6E, 0x6F,
+    0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7A, 0x7B, 0x7C, 0x7D, 0x7E, 0x7F,
+    0x80, 0x8A, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0xA1, 0x8B, 0x8C, 0xC2, 0x8E, 0xC1,
+    0xC7, 0x91, 0xC8, 0x93, 0x81, 0x95, 0xCA, 0x97, 0xCB, 0x99, 0xCC, 0x9B, 0x8D, 0x9D, 0xCD, 0x9F,
+    0xCE, 0xA1, 0xCF, 0xD0, 0xD1, 0xD2, 0x8E, 0xD3, 0xA8, 0xD4, 0xAA, 0xD5, 0xAC, 0xD6, 0xAE, 0xD8,
+    0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5, 0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF,
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC4, 0xC5, 0xC6, 0xC7, 0xC8, 0xC9, 0xCA, 0xCB, 0xCC, 0xCD, 0xCE, 0xCF,
+    0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8, 0xD9, 0xDA, 0xDB, 0xDC, 0xDD, 0xDE, 0xDF,
+    0xD9, 0xDA, 0xE2, 0xE3, 0xE4, 0xDB, 0xE6, 0xE7, 0xE8, 0xDD, 0xEA, 0xDE, 0xEC, 0x98, 0xEE, 0x90,
+    0xF0, 0xE1, 0xF2, 0xF3, 0xE3, 0xF5, 0xE4, 0xF7, 0xE6, 0xE5, 0xFA, 0xFB, 0xFC, 0xED, 0xFE, 0xFF,
+};
+
+const unsigned short iransystemUnicodeTable[256] = {
+    0x0000, 0x0001, 0x0002, 0x0003, 0x0004, 0x0005, 0x0006, 0x0007, 0x0008, 0x0009, 0x000A, 0x000B, 0x000C, 0x000D, 0x000E, 0x000F,
+    0x0010, 0x0011, 0x0012, 0x0013, 0x0014, 0x0015, 0x0016, 0x0017, 0x0018, 0x0019, 0x001A, 0x001B, 0x001C, 0x001D, 0x001E, 0x001F,
+    0x0020, 0x0021, 0x0022, 0x0023, 0x0024, 0x0025, 0x0026, 0x0027, 0x0028, 0x0029, 0x002A, 0x002B, 0x002C, 0x002D, 0x002E, 0x002F,
+    0x0030, 0x0031, 0x0032, 0x0033, 0x0034, 0x0035, 0x0036, 0x0037, 0x0038, 0x0039, 0x003A, 0x003B, 0x003C, 0x003D, 0x003E, 0x003F,
+    0x0040, 0x0041, 0x0042, 0x0043, 0x0044, 0x0045, 0x0046, 0x0047, 0x0048, 0x0049, 0x004A, 0x004B, 0x004C, 0x004D, 0x004E, 0x004F,
+    0x0050, 0x0051, 0x0052, 0x0053, 0x0054, 0x0055, 0x0056, 0x0057, 0x0058, 0x0059, 0x005A, 0x005B, 0x005C, 0x005D, 0x005E, 0x005F,
+    0x0060, 0x0061, 0x0062, 0x0063, 0x0064, 0x0065, 0x0066, 0x0067, 0x0068, 0x0069, 0x006A, 0x006B, 0x006C, 0x006D, 0x006E, 0x006F,
+    0x0070, 0x0071, 0x0072, 0x0073, 0x0074, 0x0075, 0x0076, 0x0077, 0x0078, 0x0079, 0x007A, 0x007B, 0x007C, 0x007D, 0x007E, 0x007F,
+    0x06F0, 0x06F1, 0x06F2, 0x06F3, 0x06F4, 0x06F5, 0x06F6, 0x06F7, 0x06F8, 0x06F9, 0x060C, 0x008B, 0x008C, 0x0622, 0x0621, 0x0621,
+    0x0627, 0x0627, 0x0628, 0x0628, 0x067E, 0x067E, 0x062A, 0x062A, 0x062B, 0x062B, 0x062C, 0x062C, 0x0686, 0x0686, 0x062D, 0x062D,
+    0x062E, 0x062E, 0x062F, 0x0630, 0x0631, 0x0632, 0x0698, 0x0633, 0x0633, 0x0634, 0x0634, 0x0635, 0x0635, 0x0636, 0x0636, 0x0637,
+    0x00B0, 0x00B1, 0x00B2, 0x00B3, 0x00B4, 0x00B5, 0x00B6, 0x00B7, 0x00B8, 0x00B9, 0x00BA, 0x00BB, 0x00BC, 0x00BD, 0x00BE, 0x00BF,
+    0x00C0, 0x0621, 0x0622, 0x00C3, 0x00C4, 0x00C5, 0x00C6, 0x0627, 0x0628, 0x00C9, 0x062A, 0x062B, 0x062C, 0x062D, 0x062E, 0x062F,
+    0x0630, 0x0631, 0x0632, 0x0633, 0x0634, 0x0635, 0x0636, 0x00D7, 0x0637, 0x0638, 0x0639, 0x063A, 0x00DC, 0x0641, 0x0642, 0x00DF,
+    0x0638, 0x0639, 0x0639, 0x0639, 0x0639, 0x063A, 0x063A, 0x063A, 0x063A, 0x0641, 0x0641, 0x0642, 0x0642, 0x06A9, 0x06A9, 0x06AF,
+    0x06AF, 0x0644, 0x00F2, 0x0644, 0x0645, 0x0645, 0x0646, 0x0646, 0x0648, 0x0647, 0x0647, 0x0647, 0x06CC, 0x06CC, 0x06CC, 0x00FF,
+};
+
+const unsigned char iransystemNumberTable[256] = {
+    0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0F,
+    0x10, 0x11, 0x12, 0x13, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1A, 0x1B, 0x1C, 0x1D, 0x1E, 0x1F,
+    0x20, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x29, 0x2A, 0x2B, 0x2C, 0x2D, 0x2E, 0x2F,
+    0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x3A, 0x3B, 0x3C, 0x3D, 0x3E, 0x3F,
+    0x40, 0x41, 0x42, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48, 0x49, 0x4A, 0x4B, 0x4C, 0x4D, 0x4E, 0x4F,
+    0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F,
+    0x60, 0x61, 0x62, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68, 0x69, 0x6A, 0x6B, 0x6C, 0x6D, 0x6E, 0x6F,
+    0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7A, 0x7B, 0x7C, 0x7D, 0x7E, 0x7F,
+    0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x8A, 0x8B, 0x8C, 0x8D, 0x8E, 0x8F,
+    0x90, 0x91, 0x92, 0x93, 0x94, 0x95, 0x96, 0x97, 0x98, 0x99, 0x9A, 0x9B, 0x9C, 0x9D, 0x9E, 0x9F,
+    0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA, 0xAB, 0xAC, 0xAD, 0xAE, 0xAF,
+    0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5, 0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF,
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC4, 0xC5, 0xC6, 0xC7, 0xC8, 0xC9, 0xCA, 0xCB, 0xCC, 0xCD, 0xCE, 0xCF,
+    0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8, 0xD9, 0xDA, 0xDB, 0xDC, 0xDD, 0xDE, 0xDF,
+    0xE0, 0xE1, 0xE2, 0xE3, 0xE4, 0xE5, 0xE6, 0xE7, 0xE8, 0xE9, 0xEA, 0xEB, 0xEC, 0xED, 0xEE, 0xEF,
+    0xF0, 0xF1, 0xF2, 0xF3, 0xF4, 0xF5, 0xF6, 0xF7, 0xF8, 0xF9, 0xFA, 0xFB, 0xFC, 0xFD, 0xFE, 0xFF,
+};
+
+const unsigned char persianScriptTable[PERSIAN_SCRIPT_TABLE_SIZE] = {
+    0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0F,
+    0x10, 0x11, 0x12, 0x13, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1A, 0x1B, 0x1C, 0x1D, 0x1E, 0x1F,
+    0x20, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x29, 0x2A, 0x2B, 0x2C, 0x2D, 0x2E, 0x2F,
+    0x30, 0x31, 0x32, 0x33, 0x34, 0x35, 0x36, 0x37, 0x38, 0x39, 0x3A, 0x3B, 0x3C, 0x3D, 0x3E, 0x3F,
+    0x40, 0x41, 0x42, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48, 0x49, 0x4A, 0x4B, 0x4C, 0x4D, 0x4E, 0x4F,
+    0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F,
+    0x60, 0x61, 0x62, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68, 0x69, 0x6A, 0x6B, 0x6C, 0x6D, 0x6E, 0x6F,
+    0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7A, 0x7B, 0x7C, 0x7D, 0x7E, 0x7F,
+    0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x8A, 0x8B, 0x8C, 0x8D, 0x8E, 0x8F,
+    0x90, 0x91, 0x92, 0x93, 0x94, 0x95, 0x96, 0x97, 0x98, 0x99, 0x9A, 0x9B, 0x9C, 0x9D, 0x9E, 0x9F,
+    0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA, 0xAB, 0xAC, 0xAD, 0xAE, 0xAF,
+    0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5, 0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF,
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC4, 0xC5, 0xC1, 0xC7, 0xC8, 0xC9, 0xCA, 0xCB, 0xCC, 0xCD, 0xCE, 0xCF,
+    0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8, 0xD9, 0xDA, 0xDB, 0xDC, 0xDD, 0xDE, 0xDF,
+    0xE0, 0xE1, 0xE2, 0xE3, 0xE4, 0xE5, 0xE6, 0xE7, 0xE8, 0xE9, 0xEA, 0xEB, 0xEC, 0xED, 0xEE, 0xEF,
+    0xF0, 0xF1, 0xF2, 0xF3, 0xF4, 0xF5, 0xF6, 0xF7, 0xF8, 0xF9, 0xFA, 0xFB, 0xFC, 0xFD, 0xFE, 0xFF,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x98, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0xA1, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0xC1, 0xC2, 0x3F, 0x3F, 0x3F, 0xED, 0xC7, 0xC8, 0x3F, 0xCA, 0xCB, 0xCC, 0xCD, 0xCE, 0xCF,
+    0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD8, 0xD9, 0xDA, 0xDB, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0xDD, 0xDE, 0x98, 0xE1, 0xE3, 0xE4, 0xE5, 0xE6, 0x3F, 0xED, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x81, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x8D, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x8E, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x98, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x90,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0xED, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+    0x80, 0x8A, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F, 0x3F,
+};
+
+const unsigned char shapeTable[4 * 256] = {
+    0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0F,
+    0x10, 0x11, 0x12, 0x13, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1A, 0x1B, 0x1C, 0x1D, 0x1E, 0x1F,
+    0x20, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x29, 0x2A, 0x2B, 0x2C, 0x2D, 0x2E, 0x2F,
+    0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x3A, 0x3B, 0x3C, 0x3D, 0x3E, 0x3F,
+    0x40, 0x41, 0x42, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48, 0x49, 0x4A, 0x4B, 0x4C, 0x4D, 0x4E, 0x4F,
+    0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F,
+    0x60, 0x61, 0x62, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68, 0x69, 0x6A, 0x6B, 0x6C, 0x6D, 0x6E, 0x6F,
+    0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7A, 0x7B, 0x7C, 0x7D, 0x7E, 0x7F,
+    0x80, 0x94, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x81, 0x8B, 0x8C, 0x9C, 0xA6, 0x8F,
+    0xEF, 0x91, 0x92, 0x93, 0x94, 0x95, 0x96, 0x97, 0xED, 0x99, 0x9A, 0x9B, 0x9C, 0x9D, 0x9E, 0x9F,
+    0xA0, 0x8A, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA, 0xAB, 0xAC, 0xAD, 0xAE, 0xAF,
+    0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5, 0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF,
+    0xC0, 0x8F, 0x8D, 0xC3, 0xC4, 0xC5, 0xC6, 0x90, 0x92, 0xC9, 0x96, 0x98, 0x9A, 0x9E, 0xA0, 0xA2,
+    0xA3, 0xA4, 0xA5, 0xA7, 0xA9, 0xAB, 0xAD, 0xD7, 0xAF, 0xE0, 0xE1, 0xE5, 0xDC, 0xE9, 0xEB, 0xDF,
+    0xE0, 0xF1, 0xE2, 0xF4, 0xF6, 0xF9, 0xF8, 0xE7, 0xE8, 0xE9, 0xEA, 0xEB, 0xEC, 0xFD, 0xEE, 0xEF,
+    0xF0, 0xF1, 0xF2, 0xF3, 0xF4, 0xF5, 0xF6, 0xF7, 0xF8, 0xF9, 0xFA, 0xFB, 0xFC, 0xFD, 0xFE, 0xFF,
+    0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0F,
+    0x10, 0x11, 0x12, 0x13, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1A, 0x1B, 0x1C, 0x1D, 0x1E, 0x1F,
+    0x20, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x29, 0x2A, 0x2B, 0x2C, 0x2D, 0x2E, 0x2F,
+    0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x3A, 0x3B, 0x3C, 0x3D, 0x3E, 0x3F,
+    0x40, 0x41, 0x42, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48, 0x49, 0x4A, 0x4B, 0x4C, 0x4D, 0x4E, 0x4F,
+    0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F,
+    0x60, 0x61, 0x62, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68, 0x69, 0x6A, 0x6B, 0x6C, 0x6D, 0x6E, 0x6F,
+    0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7A, 0x7B, 0x7C, 0x7D, 0x7E, 0x7F,
+    0x80, 0x95, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x81, 0x8B, 0x8C, 0x9D, 0xA6, 0x8F,
+    0xF0, 0x91, 0x92, 0x93, 0x94, 0x95, 0x96, 0x97, 0xEE, 0x99, 0x9A, 0x9B, 0x9C, 0x9D, 0x9E, 0x9F,
+    0xA0, 0x8A, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA, 0xAB, 0xAC, 0xAD, 0xAE, 0xAF,
+    0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5, 0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF,
+    0xC0, 0x8E, 0x8D, 0xC3, 0xC4, 0xC5, 0xC6, 0x90, 0x93, 0xC9, 0x97, 0x99, 0x9B, 0x9F, 0xA1, 0xA2,
+    0xA3, 0xA4, 0xA5, 0xA8, 0xAA, 0xAC, 0xAE, 0xD7, 0xAF, 0xE0, 0xE4, 0xE8, 0xDC, 0xEA, 0xEC, 0xDF,
+    0xE0, 0xF3, 0xE2, 0xF5, 0xF7, 0xFB, 0xF8, 0xE7, 0xE8, 0xE9, 0xEA, 0xEB, 0xEC, 0xFE, 0xEE, 0xEF,
+    0xF0, 0xF1, 0xF2, 0xF3, 0xF4, 0xF5, 0xF6, 0xF7, 0xF8, 0xF9, 0xFA, 0xFB, 0xFC, 0xFD, 0xFE, 0xFF,
+    0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0F,
+    0x10, 0x11, 0x12, 0x13, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1A, 0x1B, 0x1C, 0x1D, 0x1E, 0x1F,
+    0x20, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x29, 0x2A, 0x2B, 0x2C, 0x2D, 0x2E, 0x2F,
+    0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x3A, 0x3B, 0x3C, 0x3D, 0x3E, 0x3F,
+    0x40, 0x41, 0x42, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48, 0x49, 0x4A, 0x4B, 0x4C, 0x4D, 0x4E, 0x4F,
+    0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F,
+    0x60, 0x61, 0x62, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68, 0x69, 0x6A, 0x6B, 0x6C, 0x6D, 0x6E, 0x6F,
+    0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7A, 0x7B, 0x7C, 0x7D, 0x7E, 0x7F,
+    0x80, 0x94, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x81, 0x8B, 0x8C, 0x9C, 0xA6, 0x8F,
+    0xEF, 0x91, 0x92, 0x93, 0x94, 0x95, 0x96, 0x97, 0xED, 0x99, 0x9A, 0x9B, 0x9C, 0x9D, 0x9E, 0x9F,
+    0xA0, 0x8A, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA, 0xAB, 0xAC, 0xAD, 0xAE, 0xAF,
+    0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5, 0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF,
+    0xC0, 0x8F, 0x8D, 0xC3, 0xC4, 0xC5, 0xC6, 0x91, 0x92, 0xC9, 0x96, 0x98, 0x9A, 0x9E, 0xA0, 0xA2,
+    0xA3, 0xA4, 0xA5, 0xA7, 0xA9, 0xAB, 0xAD, 0xD7, 0xAF, 0xE0, 0xE2, 0xE6, 0xDC, 0xE9, 0xEB, 0xDF,
+    0xE0, 0xF1, 0xE2, 0xF4, 0xF6, 0xF9, 0xF8, 0xE7, 0xE8, 0xE9, 0xEA, 0xEB, 0xEC, 0xFC, 0xEE, 0xEF,
+    0xF0, 0xF1, 0xF2, 0xF3, 0xF4, 0xF5, 0xF6, 0xF7, 0xF8, 0xF9, 0xFA, 0xFB, 0xFC, 0xFD, 0xFE, 0xFF,
+    0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0F,
+    0x10, 0x11, 0x12, 0x13, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1A, 0x1B, 0x1C, 0x1D, 0x1E, 0x1F,
+    0x20, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x29, 0x2A, 0x2B, 0x2C, 0x2D, 0x2E, 0x2F,
+    0x80, 0x81, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x3A, 0x3B, 0x3C, 0x3D, 0x3E, 0x3F,
+    0x40, 0x41, 0x42, 0x43, 0x44, 0x45, 0x46, 0x47, 0x48, 0x49, 0x4A, 0x4B, 0x4C, 0x4D, 0x4E, 0x4F,
+    0x50, 0x51, 0x52, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5A, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F,
+    0x60, 0x61, 0x62, 0x63, 0x64, 0x65, 0x66, 0x67, 0x68, 0x69, 0x6A, 0x6B, 0x6C, 0x6D, 0x6E, 0x6F,
+    0x70, 0x71, 0x72, 0x73, 0x74, 0x75, 0x76, 0x77, 0x78, 0x79, 0x7A, 0x7B, 0x7C, 0x7D, 0x7E, 0x7F,
+    0x80, 0x95, 0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x81, 0x8B, 0x8C, 0x9D, 0xA6, 0x8F,
+    0xF0, 0x91, 0x92, 0x93, 0x94, 0x95, 0x96, 0x97, 0xEE, 0x99, 0x9A, 0x9B, 0x9C, 0x9D, 0x9E, 0x9F,
+    0xA0, 0x8A, 0xA2, 0xA3, 0xA4, 0xA5, 0xA6, 0xA7, 0xA8, 0xA9, 0xAA, 0xAB, 0xAC, 0xAD, 0xAE, 0xAF,
+    0xB0, 0xB1, 0xB2, 0xB3, 0xB4, 0xB5, 0xB6, 0xB7, 0xB8, 0xB9, 0xBA, 0xBB, 0xBC, 0xBD, 0xBE, 0xBF,
+    0xC0, 0x8E, 0x8D, 0xC3, 0xC4, 0xC5, 0xC6, 0x91, 0x93, 0xC9, 0x97, 0x99, 0x9B, 0x9F, 0xA1, 0xA2,
+    0xA3, 0xA4, 0xA5, 0xA8, 0xAA, 0xAC, 0xAE, 0xD7, 0xAF, 0xE0, 0xE3, 0xE7, 0xDC, 0xEA, 0xEC, 0xDF,
+    0xE0, 0xF3, 0xE2, 0xF5, 0xF7, 0xFA, 0xF8, 0xE7, 0xE8, 0xE9, 0xEA, 0xEB, 0xEC, 0xFE, 0xEE, 0xEF,
+    0xF0, 0xF1, 0xF2, 0xF3, 0xF4, 0xF5, 0xF6, 0xF7, 0xF8, 0xF9, 0xFA, 0xFB, 0xFC, 0xFD, 0xFE, 0xFF,
+};
+/* END GENERATED TABLES */
+
+/* Single-pass kernels over explicit lengths, shared by all entry points. */
+
+static void MapBytes(const uint8_t *restrict in, uint8_t *restrict out, size_t length,
+                     const unsigned char *restrict table) {
+    size_t byteCount;
+    for (byteCount = 0; byteCount < length; byteCount++) {
+        out[byteCount] = table[in[byteCount]];
+    }
+}
+
+static void ReverseRange(uint8_t *buffer, size_t left, size_t right) {
+    uint8_t swap;
+    while (left + 1 < right) {
+        right--;
+        swap = buffer[left];
+        buffer[left] = buffer[right];
+        buffer[right] = swap;
+        left++;
+    }
+}
+
+#define IS_ALPHANUMERIC(byte) ((uint8_t)((byte) - 0x20) <= 0x5E)
+
+/*
+ * Reverse each run of two or more printable ASCII bytes in place. The scan
+ * looks for two neighbouring printable bytes, which is rare in Persian
+ * text (single spaces are not runs), so the branch is well predicted.
+ */
+static void ReverseAlphaNumericRuns(uint8_t *buffer, size_t length) {
+    size_t byteCount, numberPosition;
+    for (byteCount = 0; byteCount + 1 < length; byteCount++) {
+        if (IS_ALPHANUMERIC(buffer[byteCount]) & IS_ALPHANUMERIC(buffer[byteCount + 1])) {
+            numberPosition = byteCount;
+            for (byteCount += 2; byteCount < length && IS_ALPHANUMERIC(buffer[byteCount]); byteCount++);
+            ReverseRange(buffer, numberPosition, byteCount);
         }
     }
+}
+
+/* Replace script bytes with their contextual forms, judging by the originals. */
+static void ShapeScriptBytes(uint8_t *buffer, size_t length) {
+    size_t byteCount;
+    uint8_t current, prevClass = 0;
+    unsigned int context;
+    if (!length) return;
+    for (byteCount = 0; byteCount + 1 < length; byteCount++) {
+        current = buffer[byteCount];
+        context = (prevClass & IRAN_SYSTEM_CLASS_PREV)
+                | (charClassTable[buffer[byteCount + 1]] & IRAN_SYSTEM_CLASS_NEXT);
+        buffer[byteCount] = shapeTable[(context << 8) | current];
+        prevClass = charClassTable[current];
+    }
+    buffer[byteCount] = shapeTable[((prevClass & IRAN_SYSTEM_CLASS_PREV) << 8) | buffer[byteCount]];
+}
+
+/* Out-of-place shaping; every output byte only depends on the input. */
+static void ShapeScriptBytesCopy(const uint8_t *restrict in, uint8_t *restrict out, size_t length) {
+    size_t byteCount;
+    unsigned int context;
+    if (!length) return;
+    if (length == 1) {
+        out[0] = shapeTable[in[0]];
+        return;
+    }
+    out[0] = shapeTable[((charClassTable[in[1]] & IRAN_SYSTEM_CLASS_NEXT) << 8) | in[0]];
+    for (byteCount = 1; byteCount + 1 < length; byteCount++) {
+        context = (charClassTable[in[byteCount - 1]] & IRAN_SYSTEM_CLASS_PREV)
+                | (charClassTable[in[byteCount + 1]] & IRAN_SYSTEM_CLASS_NEXT);
+        out[byteCount] = shapeTable[(context << 8) | in[byteCount]];
+    }
+    out[byteCount] = shapeTable[((charClassTable[in[byteCount - 1]] & IRAN_SYSTEM_CLASS_PREV) << 8)
+                                | in[byteCount]];
+}
+
+/* Legacy API: NUL terminated strings, one strlen per call */
+
+void IransystemToUpper(unsigned char *inString, unsigned char *outString) {
+    size_t len = strlen((char*)inString);
+    MapBytes(inString, outString, len, iransystemUpperTable);
     outString[len] = 0;
 }
 
 void ReverseIransystem(unsigned char *inString, unsigned char *outString) {
-    unsigned int byteCount, numberCount;
-    unsigned int numberPosition = 0;
-    unsigned int len = strlen((char*)inString);
-
-    for (byteCount = 0; byteCount <= len; byteCount++) {
-        unsigned char current = (byteCount < len) ? inString[byteCount] : 0x20; // Space as end marker
-
-        if (current < 80) {
-            if ((byteCount - numberPosition) > 1) {
-                for (numberCount = numberPosition; numberCount < byteCount; numberCount++) {
-                    outString[numberCount] = inString[byteCount - (numberCount - numberPosition) - 1];
-                }
-            }
+    size_t byteCount, numberPosition = 0;
+    size_t len = strlen((char*)inString);
+
+    memmove(outString, inString, len);
+    for (byteCount = 0; byteCount < len; byteCount++) {
+        if (outString[byteCount] < 80) {
+            ReverseRange(outString, numberPosition, byteCount);
             numberPosition = byteCount + 1;
-            if (byteCount < len) {
-                outString[byteCount] = inString[byteCount];
-            }
         }
     }
+    ReverseRange(outString, numberPosition, len);
     outString[len] = 0;
 }
 
 void IransystemToUnicode(unsigned char *inString, unsigned char *outString) {
-    unsigned int byteCount;
-    unsigned int len = strlen((char*)inString);
-    int posIndex;
-    for (byteCount = 0; byteCount < len; byteCount++) {
-        posIndex = FindPos(inString[byteCount], iransystemUpperStr);
-        if (posIndex < 0) {
-            posIndex = FindPos(inString[byteCount], iransystemUpperStrTail);
-            outString[byteCount] = (posIndex < 0) ? inString[byteCount] : unicodeStrTail[posIndex];
-        } else {
-            outString[byteCount] = unicodeStr[posIndex];
-        }
-    }
+    size_t len = strlen((char*)inString);
+    MapBytes(inString, outString, len, iransystemScriptTable);
     outString[len] = 0;
 }
 
 void Reverse(unsigned char *inString, unsigned char *outString) {
-    unsigned int byteCount;
-    unsigned int len = strlen((char*)inString);
-    if (!len) {
-        outString[0] = 0;
-        return;
-    }
+    size_t byteCount;
+    size_t len = strlen((char*)inString);
     for (byteCount = 0; byteCount < len; byteCount++) {
         outString[len - byteCount - 1] = inString[byteCount];
     }
@@ -159,122 +492,100 @@ void Reverse(unsigned char *inString, unsigned char *outString) {
 }
 
 void ReverseAlphaNumeric(unsigned char *inString, unsigned char *outString) {
-    unsigned int byteCount, numberCount;
-    unsigned int numberPosition = 0;
-    unsigned int len = strlen((char*)inString);
-
-    for (byteCount = 0; byteCount <= len; byteCount++) {
-        unsigned char current = (byteCount < len) ? inString[byteCount] : 0xFF;
-
-        if (current > 0x7E || current < 0x20) {
-            if ((byteCount - numberPosition) > 1) {
-                for (numberCount = numberPosition; numberCount < byteCount; numberCount++) {
-                    outString[numberCount] = inString[byteCount - (numberCount - numberPosition) - 1];
-                }
-            }
-            numberPosition = byteCount + 1;
-        }
-        if (byteCount < len) {
-            outString[byteCount] = inString[byteCount];
-        }
-    }
+    size_t len = strlen((char*)inString);
+    memmove(outString, inString, len);
+    ReverseAlphaNumericRuns(outString, len);
     outString[len] = 0;
 }
 
 void UnicodeNumberToIransystem(unsigned char *unicodeString, unsigned char *iransystemString) {
-    unsigned int byteCount;
-    unsigned int len = strlen((char*)unicodeString);
-    int posIndex;
-    if (!len) {
-        iransystemString[0] = 0;
-        return;
-    }
-    for (byteCount = 0; byteCount < len; byteCount++) {
-        iransystemString[byteCount] = unicodeString[byteCount];
-        posIndex = FindPos(iransystemString[byteCount], unicodeNumberStr);
-        if (posIndex >= 0) {
-            iransystemString[byteCount] = iransystemNumberStr[posIndex];
-        }
-    }
+    size_t len = strlen((char*)unicodeString);
+    MapBytes(unicodeString, iransystemString, len, iransystemNumberTable);
     iransystemString[len] = 0;
 }
 
 unsigned char UnicodeToPersianScript(unsigned int unicodeChar) {
-    int posIndex = FindPos16(unicodeChar, wideCharStr);
-    if (posIndex >= 0) {
-        return UTF8Str[posIndex];
-    } else {
-        return (unsigned char)(unicodeChar < 256 ? unicodeChar : '?');
-    }
+    return unicodeChar < PERSIAN_SCRIPT_TABLE_SIZE ? persianScriptTable[unicodeChar] : '?';
 }
 
 void UnicodeToIransystem(unsigned char *unicodeString, unsigned char *iransystemString) {
-    unsigned char prevByte, nextByte;
-    unsigned int byteCount;
-    unsigned int len;
-    int posIndex;
-
-    len = strlen((char*)unicodeString);
+    size_t byteCount;
+    size_t len = strlen((char*)unicodeString);
+    uint8_t current, shaped, prevClass = 0;
+    unsigned int context;
 
+    memmove(iransystemString, unicodeString, len);
     if (reverseAlphaNumericFlag) {
-        ReverseAlphaNumeric(unicodeString, iransystemString);
-    } else {
-        strcpy((char*)iransystemString, (char*)unicodeString);
+        ReverseAlphaNumericRuns(iransystemString, len);
     }
 
-    len = strlen((char*)iransystemString);
+    /*
+     * Unlike UnicodeToIransystemEx this keeps the historical behaviour:
+     * the previous byte is judged in its already shaped form and ASCII
+     * digits are left for UnicodeNumberToIransystem.
+     */
     for (byteCount = 0; byteCount < len; byteCount++) {
-        prevByte = (byteCount > 0) ? iransystemString[byteCount - 1] : 0;
-        nextByte = (byteCount < (len - 1)) ? iransystemString[byteCount + 1] : 0;
-
-        posIndex = FindPos(iransystemString[byteCount], unicodeStr);
-        if (posIndex >= 0) {
-            if (FindPos(nextByte, nextCharStr) >= 0) {
-                iransystemString[byteCount] = iransystemLowerStr[posIndex];
-            } else {
-                iransystemString[byteCount] = iransystemUpperStr[posIndex];
-            }
-        } else {
-            switch (iransystemString[byteCount]) {
-                case 218: // ein
-                    if (FindPos(nextByte, nextCharStr) >= 0) {
-                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 227;
-                        else iransystemString[byteCount] = 228;
-                    } else {
-                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 226;
-                        else iransystemString[byteCount] = 225;
-                    }
-                    break;
-                case 219: // ghein
-                    if (FindPos(nextByte, nextCharStr) >= 0) {
-                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 231;
-                        else iransystemString[byteCount] = 232;
-                    } else {
-                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 230;
-                        else iransystemString[byteCount] = 229;
-                    }
-                    break;
-                case 229: // he
-                    if (FindPos(nextByte, nextCharStr) >= 0) {
-                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 250;
-                        else iransystemString[byteCount] = 251;
-                    } else {
-                        iransystemString[byteCount] = 249;
-                    }
-                    break;
-                case 199: // alef
-                    if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 145;
-                    else iransystemString[byteCount] = 144;
-                    break;
-                case 237: // ye
-                    if (FindPos(nextByte, nextCharStr) >= 0) iransystemString[byteCount] = 254;
-                    else {
-                        if (FindPos(prevByte, prevCharStr) >= 0) iransystemString[byteCount] = 252;
-                        else iransystemString[byteCount] = 253;
-                    }
-                    break;
-            }
-        }
+        current = iransystemString[byteCount];
+        context = (prevClass & IRAN_SYSTEM_CLASS_PREV)
+                | (byteCount + 1 < len
+                   ? charClassTable[iransystemString[byteCount + 1]] & IRAN_SYSTEM_CLASS_NEXT : 0);
+        shaped = shapeTable[(context << 8) | current];
+        iransystemString[byteCount] = (charClassTable[current] & IRAN_SYSTEM_CLASS_DIGIT) ? current : shaped;
+        prevClass = charClassTable[iransystemString[byteCount]];
     }
     iransystemString[len] = 0;
 }
+
+/*
+ * Convert script bytes (as produced by UnicodeToPersianScript) to Iran
+ * System. Reentrant replacement for UnicodeToIransystem: the length is
+ * explicit, so NUL bytes are converted rather than ending the input,
+ * options come from `flags` instead of reverseAlphaNumericFlag, and ASCII
+ * digits are mapped like core.py does. `out` needs room for `length` bytes
+ * and must either be `in` itself or not overlap it; returns bytes written.
+ */
+size_t UnicodeToIransystemEx(const uint8_t *in, size_t length, uint8_t *out, int flags) {
+    if (flags & IRAN_SYSTEM_REVERSE_ALPHANUMERIC) {
+        if (out != in) {
+            memcpy(out, in, length);
+        }
+        ReverseAlphaNumericRuns(out, length);
+        ShapeScriptBytes(out, length);
+    } else if (out == in) {
+        ShapeScriptBytes(out, length);
+    } else {
+        ShapeScriptBytesCopy(in, out, length);
+    }
+    return length;
+}
+
+/*
+ * Convert a whole UTF-32 string to Iran System in one call: code point
+ * mapping followed by UnicodeToIransystemEx with the same `flags`. The
+ * output buffer needs room for `length` bytes; returns bytes written.
+ */
+size_t UnicodeToIransystemUtf32(const unsigned int *unicodeString, size_t length,
+                                unsigned char *iransystemString, int flags) {
+    size_t byteCount;
+    unsigned int code;
+    for (byteCount = 0; byteCount < length; byteCount++) {
+        code = unicodeString[byteCount];
+        iransystemString[byteCount] = code < PERSIAN_SCRIPT_TABLE_SIZE ? persianScriptTable[code] : '?';
+    }
+    return UnicodeToIransystemEx(iransystemString, length, iransystemString, flags);
+}
+
+/*
+ * Decode Iran System bytes straight to UTF-32 code points, folding lower
+ * forms to upper forms on the way, like iransystem_to_unicode in core.py.
+ * The output buffer needs room for `length` code points; returns the
+ * number written.
+ */
+size_t IransystemToUtf32(const unsigned char *iransystemString, size_t length,
+                         unsigned int *unicodeString) {
+    size_t byteCount;
+    for (byteCount = 0; byteCount < length; byteCount++) {
+        unicodeString[byteCount] = iransystemUnicodeTable[iransystemString[byteCount]];
+    }
+    return length;
+}
@@ -1,14 +1,69 @@
 #ifndef IRAN_SYSTEM_H
 #define IRAN_SYSTEM_H
 
+#include <stddef.h>
+#include <stdint.h>
+
+// Exported so ctypes can call the functions in the built extension module
+#if defined(_WIN32)
+#define IRAN_SYSTEM_API __declspec(dllexport)
+#elif defined(__GNUC__)
+#define IRAN_SYSTEM_API __attribute__((visibility("default")))
+#else
+#define IRAN_SYSTEM_API
+#endif
+
+// Option flags of the reentrant *Ex functions
+#define IRAN_SYSTEM_REVERSE_ALPHANUMERIC 0x1
+
+// Character mapping tables (NUL terminated)
+extern const unsigned char unicodeNumberStr[];
+extern const unsigned char iransystemNumberStr[];
+extern const unsigned char unicodeStr[];
+extern const unsigned char iransystemUpperStr[];
+extern const unsigned char iransystemLowerStr[];
+extern const unsigned char nextCharStr[];
+extern const unsigned char prevCharStr[];
+extern const unsigned char unicodeStrTail[];
+extern const unsigned char iransystemUpperStrTail[];
+extern const unsigned char iransystemLowerStrTail[];
+extern const unsigned int wideCharStr[];
+extern const unsigned char UTF8Str[];
+
+// Per-byte class bits of charClassTable
+#define IRAN_SYSTEM_CLASS_NEXT         0x1  /* joins the byte before it */
+#define IRAN_SYSTEM_CLASS_PREV         0x2  /* joins the byte after it */
+#define IRAN_SYSTEM_CLASS_DIGIT        0x4  /* ASCII digit */
+
+// Code points below this map through persianScriptTable; the rest become '?'
+#define PERSIAN_SCRIPT_TABLE_SIZE 0x700
+
+// 256-entry lookup tables generated from the mapping strings
+extern const unsigned char charClassTable[256];
+extern const unsigned char iransystemUpperTable[256];
+extern const unsigned char iransystemScriptTable[256];
+extern const unsigned short iransystemUnicodeTable[256];
+extern const unsigned char iransystemNumberTable[256];
+extern const unsigned char persianScriptTable[PERSIAN_SCRIPT_TABLE_SIZE];
+extern const unsigned char shapeTable[4 * 256];
+
 // Function declarations matching the C implementation
-void UnicodeToIransystem(unsigned char *unicodeString, unsigned char *iransystemString);
-void UnicodeNumberToIransystem(unsigned char *unicodeString, unsigned char *iransystemString);
-void IransystemToUnicode(unsigned char *inString, unsigned char *outString);
-void IransystemToUpper(unsigned char *inString, unsigned char *outString);
-void Reverse(unsigned char *inString, unsigned char *outString);
-void ReverseAlphaNumeric(unsigned char *inString, unsigned char *outString);
-void ReverseIransystem(unsigned char *inString, unsigned char *outString);
-unsigned char UnicodeToPersianScript(unsigned int unicodeChar);
+IRAN_SYSTEM_API int FindPos(unsigned char inByte, const unsigned char *areaString);
+IRAN_SYSTEM_API int FindPos16(unsigned int inByte, const unsigned int *areaString);
+IRAN_SYSTEM_API void UnicodeToIransystem(unsigned char *unicodeString, unsigned char *iransystemString);
+IRAN_SYSTEM_API void UnicodeNumberToIransystem(unsigned char *unicodeString, unsigned char *iransystemString);
+IRAN_SYSTEM_API void IransystemToUnicode(unsigned char *inString, unsigned char *outString);
+IRAN_SYSTEM_API void IransystemToUpper(unsigned char *inString, unsigned char *outString);
+IRAN_SYSTEM_API void Reverse(unsigned char *inString, unsigned char *outString);
+IRAN_SYSTEM_API void ReverseAlphaNumeric(unsigned char *inString, unsigned char *outString);
+IRAN_SYSTEM_API void ReverseIransystem(unsigned char *inString, unsigned char *outString);
+IRAN_SYSTEM_API unsigned char UnicodeToPersianScript(unsigned int unicodeChar);
+
+// Reentrant, length-explicit variants; they return the number of units written
+IRAN_SYSTEM_API size_t UnicodeToIransystemEx(const uint8_t *in, size_t length, uint8_t *out, int flags);
+IRAN_SYSTEM_API size_t UnicodeToIransystemUtf32(const unsigned int *unicodeString, size_t length,
+                                                unsigned char *iransystemString, int flags);
+IRAN_SYSTEM_API size_t IransystemToUtf32(const unsigned char *iransystemString, size_t length,
+                                         unsigned int *unicodeString);
 
 #endif
@@ -0,0 +1,202 @@
+"""
+Vectorized conversions of NumPy arrays.
+
+decode_array() and encode_array() convert whole columns of fixed-width
+records, such as the ``S<n>`` fields of legacy binary files, with NumPy
+operations instead of one Python call per element::
+
+    from iran_encoding.numpy import decode_array, encode_array
+
+    names = decode_array(records['name'])   # S<n> -> U<n>
+    raw = encode_array(names)               # U<n> -> S<n>
+
+Every element converts exactly as iran_encoding.decode() and encode() would
+convert it. The mapping tables of core.py become ``np.take`` lookups, and
+shaping reads the joining classes of each byte's neighbours from shifted
+copies of the row, so no Python code runs per element.
+
+As with NumPy's own ``S`` and ``U`` dtypes, trailing NULs are padding. NUL
+never joins a neighbour or extends an alphanumeric run, so the padding does
+not change how the characters before it convert.
+
+This module needs NumPy, which is installed with ``iran-encoding[numpy]``.
+"""
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover - depends on the environment
+    raise ImportError("iran_encoding.numpy requires NumPy; "
+                      "install it with 'pip install iran-encoding[numpy]'") from exc
+
+from .core import (
+    DECODING_TABLE,
+    NEXT_CONNECT_FLAGS,
+    PERSIAN_SCRIPT_TRANSLATION,
+    PREV_CONNECT_FLAGS,
+    SHAPING_TABLES,
+)
+
+__all__ = ['decode_array', 'encode_array']
+
+# Elements converted per block. Blocks keep the temporaries of a large
+# column in the CPU caches and bound the extra memory to a few megabytes.
+BLOCK_SIZE = 1 << 18
+
+# Code point of each Iran System byte.
+_DECODING_CODE_POINTS = np.array([ord(char) for char in DECODING_TABLE], dtype=np.uint32)
+
+# Per code point, up to one past the last code point any conversion maps,
+# three fields packed in one integer: its byte in an English element (bits
+# 0-7), its script byte (bits 8-15) and whether it is one of the
+# PERSIAN_LETTERS that select the Iran System flow (bit 16). Every code point
+# past the table behaves like the final entry, which encodes to '?'.
+_LETTER = 1 << 16
+
+
+def _build_code_point_table():
+    size = max(PERSIAN_SCRIPT_TRANSLATION) + 2
+    script = [code if code < 256 else 0x3F for code in range(size)]
+    for code, script_char in PERSIAN_SCRIPT_TRANSLATION.items():
+        script[code] = ord(script_char)
+    english = [code if code < 0x80 else 0x3F for code in range(size)]
+    english[0x06F0:0x06FA] = range(0x30, 0x3A)  # Persian digits
+    letters = {*range(0x0621, 0x064B), 0x067E, 0x0686, 0x0698, 0x06A9, 0x06AF, 0x06CC}
+    return np.array([english[code] | script[code] << 8 | (_LETTER if code in letters else 0)
+                     for code in range(size)], dtype=np.uint32)
+
+
+_CODE_POINT_TABLE = _build_code_point_table()
+
+_PREV_CONNECT_FLAGS = np.frombuffer(PREV_CONNECT_FLAGS, dtype=np.uint8)
+_NEXT_CONNECT_FLAGS = np.frombuffer(NEXT_CONNECT_FLAGS, dtype=np.uint8)
+# SHAPING_TABLES flattened, indexed by (context << 8) | byte.
+_SHAPING_TABLE = np.frombuffer(b"".join(SHAPING_TABLES), dtype=np.uint8)
+
+
+def _rows(array, kind):
+    """The elements of array as a C-contiguous 2-D array of units, one row each."""
+    array = np.asarray(array)
+    if array.dtype.kind != kind:
+        raise TypeError(f"expected an array of dtype {kind}<n>, got {array.dtype}")
+    if not array.dtype.isnative:
+        # The view below reads the code points in native byte order.
+        array = array.astype(array.dtype.newbyteorder('='))
+    width = array.dtype.itemsize // (4 if kind == 'U' else 1)
+    unit = np.uint32 if kind == 'U' else np.uint8
+    rows = np.ascontiguousarray(array).view(unit).reshape(array.size, width)
+    return rows, width
+
+
+def decode_array(array):
+    """
+    Decode an array of Iran System records to Unicode.
+
+    Args:
+        array (np.ndarray): An ``S<n>`` array with one record per element,
+                            or a uint8 array whose last axis holds the
+                            bytes of each record.
+
+    Returns:
+        np.ndarray: A ``U<n>`` array of the decoded records, shaped like the
+        input (without the last axis for uint8 input).
+    """
+    array = np.asarray(array)
+    if array.dtype == np.uint8:
+        if array.ndim == 0:
+            raise ValueError("a uint8 array needs an axis holding the record bytes")
+        shape, width = array.shape[:-1], array.shape[-1]
+        if not width:
+            return np.zeros(shape, dtype='U1')
+        rows = np.ascontiguousarray(array).reshape(-1, width)
+    else:
+        shape = array.shape
+        rows, width = _rows(array, 'S')
+        if not width:
+            return np.zeros(shape, dtype='U1')
+    # Decoding is context free: one lookup per byte.
+    return _DECODING_CODE_POINTS.take(rows).view(f'U{width}').reshape(shape)
+
+
+def _encode_rows(code_points, visual_ordering):
+    """Encode a block of code point rows to Iran System byte rows."""
+    fields = _CODE_POINT_TABLE.take(np.minimum(code_points, len(_CODE_POINT_TABLE) - 1))
+    # ASCII and English elements: Persian digits become ASCII digits and any
+    # other non-ASCII character becomes '?'.
+    out = fields.astype(np.uint8)
+    persian_rows = (fields >= _LETTER).any(axis=1)
+    if not persian_rows.any():
+        return out
+
+    # Elements with Persian letters, converted as unicode_to_iransystem does.
+    script = (fields[persian_rows] >> 8).astype(np.uint8)
+    if visual_ordering:
+        script = _reverse_runs(script)
+
+    # Joining context of every byte from its left and right neighbours; the
+    # row edges count as non-joining.
+    context = np.zeros(script.shape, dtype=np.uint16)
+    context[:, 1:] = _PREV_CONNECT_FLAGS.take(script[:, :-1])
+    context[:, :-1] |= _NEXT_CONNECT_FLAGS.take(script[:, 1:])
+    context <<= 8
+    context |= script
+    out[persian_rows] = _SHAPING_TABLE.take(context)
+    return out
+
+
+def _reverse_runs(script):
+    """
+    Reverse every run of two or more printable ASCII bytes within each row,
+    the vectorized form of core.reverse_alpha_numeric.
+    """
+    printable = (script - np.uint8(0x20)) < 0x5F
+    after_printable = np.zeros_like(printable)
+    after_printable[:, 1:] = printable[:, :-1]
+    before_printable = np.zeros_like(printable)
+    before_printable[:, :-1] = printable[:, 1:]
+    # Flat positions of the bytes in runs of two or more. Runs are usually a
+    # small part of the text, so the rest of the work is on these only.
+    positions = np.flatnonzero(printable & (after_printable | before_printable))
+    if not positions.size:
+        return script
+
+    # The byte moving to a position in a run from start to end comes from
+    # start + end - position. The start of each position's run is the
+    # running maximum of the run starts, and its end the running minimum of
+    # the run ends taken from the right.
+    starts = np.where(after_printable.ravel().take(positions), 0, positions)
+    np.maximum.accumulate(starts, out=starts)
+    ends = np.where(before_printable.ravel().take(positions), script.size, positions)
+    ends = np.minimum.accumulate(ends[::-1])[::-1]
+    starts += ends
+    starts -= positions
+    flat = script.ravel()
+    reversed_script = flat.copy()
+    reversed_script[positions] = flat.take(starts)
+    return reversed_script.reshape(script.shape)
+
+
+def encode_array(array, visual_ordering=True):
+    """
+    Encode an array of Unicode records to Iran System bytes.
+
+    Each element is encoded as iran_encoding.encode() encodes it: elements
+    with Persian letters go through the Iran System flow, all others are
+    written as ASCII with Persian digits converted.
+
+    Args:
+        array (np.ndarray): A ``U<n>`` array with one record per element.
+        visual_ordering (bool): Whether to apply visual ordering (default True).
+
+    Returns:
+        np.ndarray: An ``S<n>`` array of the encoded records, shaped like
+        the input.
+    """
+    array = np.asarray(array)
+    rows, width = _rows(array, 'U')
+    if not width:
+        return np.zeros(array.shape, dtype='S1')
+    out = np.empty((len(rows), width), dtype=np.uint8)
+    block_rows = max(BLOCK_SIZE // width, 1)
+    for start in range(0, len(rows), block_rows):
+        block = slice(start, start + block_rows)
+        out[block] = _encode_rows(rows[block], visual_ordering)
+    return out.view(f'S{width}').reshape(array.shape)
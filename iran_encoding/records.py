@@ -0,0 +1,281 @@
+"""
+Memory-mapped reader for fixed-width record files.
+
+Legacy DOS programs often stored their data as flat files of fixed-width
+records, with Iran System text in some fields and plain ASCII numbers or
+codes in others. RecordFile maps such a file into memory and decodes only
+the fields that are read::
+
+    from iran_encoding.records import Field, RecordFile, RecordLayout
+
+    layout = RecordLayout([
+        Field('name', 0, 30),
+        Field('city', 30, 20),
+        Field('amount', 50, 12, iran_system=False),
+    ], record_size=64)  # 62 bytes of fields plus CR LF
+
+    with RecordFile('CUSTOMER.DAT', layout) as records:
+        for record in records:
+            print(record['name'], int(record['amount']))
+        cities = records.column('city')
+
+Records are views on the mapped file: a field is decoded each time it is
+read and never before, and the operating system pages the file in and out
+as needed, so memory use does not grow with the file. column(),
+iter_column() and column_chunks() decode a field of many records with one
+conversion call per chunk, and array() returns a column as a NumPy array
+(see iran_encoding.numpy).
+
+Iran System fields are decoded with iran_encoding.decode(); other fields are
+returned as bytes. Both have the padding characters (spaces and NULs) at
+either end removed unless the field is created with strip=False.
+"""
+import mmap
+import os
+
+from . import decode
+
+__all__ = ['Field', 'RecordLayout', 'RecordFile', 'Record']
+
+# Characters that pad fixed-width fields.
+PADDING = " \x00"
+
+# Records decoded per conversion call by iter_column().
+CHUNK_RECORDS = 1 << 14
+
+
+class Field:
+    """
+    One field of a record: its name, its byte offset and width within the
+    record, and whether it holds Iran System text.
+    """
+    __slots__ = ('name', 'offset', 'width', 'iran_system', 'strip')
+
+    # Optional callable applied to each stripped value, set by subclasses
+    # whose fields hold numbers, dates and the like.
+    parse = None
+
+    def __init__(self, name, offset, width, iran_system=True, strip=True):
+        if offset < 0 or width <= 0:
+            raise ValueError(f"field {name!r} needs a non-negative offset and a positive width")
+        self.name = name
+        self.offset = offset
+        self.width = width
+        self.iran_system = iran_system
+        self.strip = strip
+
+    @property
+    def end(self):
+        return self.offset + self.width
+
+    def convert(self, raw):
+        """Turn the raw bytes of this field into its value."""
+        if self.iran_system:
+            value = decode(raw)
+            value = value.strip(PADDING) if self.strip else value
+        else:
+            value = bytes(raw).strip(PADDING.encode('ascii')) if self.strip else bytes(raw)
+        return value if self.parse is None else self.parse(value)
+
+    def __repr__(self):
+        return (f"Field({self.name!r}, {self.offset}, {self.width}, "
+                f"iran_system={self.iran_system}, strip={self.strip})")
+
+
+class RecordLayout:
+    """
+    The fields of a fixed-width record.
+
+    record_size defaults to the end of the last field; give it explicitly
+    when records carry bytes no field covers, such as a CR LF terminator.
+    """
+
+    def __init__(self, fields, record_size=None):
+        self.fields = list(fields)
+        self.by_name = {field.name: field for field in self.fields}
+        if len(self.by_name) != len(self.fields):
+            raise ValueError("field names must be unique")
+        span = max((field.end for field in self.fields), default=0)
+        self.record_size = span if record_size is None else record_size
+        if self.record_size <= 0 or self.record_size < span:
+            raise ValueError(f"record_size {self.record_size} does not hold the fields ({span} bytes)")
+
+    def __getitem__(self, name):
+        try:
+            return self.by_name[name]
+        except KeyError:
+            raise KeyError(f"no field named {name!r}") from None
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __repr__(self):
+        return f"RecordLayout({self.fields!r}, record_size={self.record_size})"
+
+
+class RecordFile:
+    """
+    A fixed-width record file mapped into memory.
+
+    Args:
+        file: A path, or a binary file object with a fileno().
+        layout (RecordLayout): The record layout.
+        header_size (int): Bytes before the first record.
+        count (int): Number of records, when the file format records it;
+                     by default every complete record in the file.
+
+    Bytes after the last complete record, such as a DOS end-of-file marker,
+    are ignored.
+    """
+
+    def __init__(self, file, layout, header_size=0, count=None):
+        self.layout = layout
+        self.header_size = header_size
+        if isinstance(file, (str, bytes, os.PathLike)):
+            self._file = open(file, 'rb')
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap cannot map an empty file; an empty bytes object stands in.
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._count = max(size - header_size, 0) // layout.record_size
+        if count is not None:
+            self._count = min(self._count, count)
+
+    def close(self):
+        """Unmap the file and close it if it was opened by this reader."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+        self._count = 0
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _record_offset(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("record index out of range")
+        return self.header_size + index * self.layout.record_size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Record(self, self._record_offset(i)) for i in range(*index.indices(self._count))]
+        return Record(self, self._record_offset(index))
+
+    def __iter__(self):
+        record_size = self.layout.record_size
+        for offset in range(self.header_size, self.header_size + self._count * record_size, record_size):
+            yield Record(self, offset)
+
+    def raw(self, index, name):
+        """The undecoded bytes of one field of one record."""
+        field = self.layout[name]
+        start = self._record_offset(index) + field.offset
+        return self._data[start:start + field.width]
+
+    def column_chunks(self, name, start=0, stop=None):
+        """
+        Yield the values of one field for records start to stop, as lists of
+        up to CHUNK_RECORDS values.
+
+        The field bytes of a chunk are gathered with one strided copy per
+        byte position and, for Iran System fields, decoded in a single call.
+        Iran System decoding turns every byte into exactly one character, so
+        the decoded chunk splits back into fields at fixed positions.
+        """
+        field = self.layout[name]
+        start, stop, _ = slice(start, stop).indices(self._count)
+        record_size, width = self.layout.record_size, field.width
+        data = self._data
+        if field.strip:
+            padding = PADDING if field.iran_system else PADDING.encode('ascii')
+        for chunk_start in range(start, stop, CHUNK_RECORDS):
+            count = min(CHUNK_RECORDS, stop - chunk_start)
+            first = self.header_size + chunk_start * record_size + field.offset
+            last = first + count * record_size
+            # Gather the field bytes column by column: byte k of every field
+            # is one strided slice of the mapping.
+            joined = bytearray(count * width)
+            for k in range(width):
+                joined[k::width] = data[first + k:last:record_size]
+            joined = decode(joined) if field.iran_system else bytes(joined)
+            if field.strip:
+                values = [joined[i:i + width].strip(padding) for i in range(0, len(joined), width)]
+            else:
+                values = [joined[i:i + width] for i in range(0, len(joined), width)]
+            yield values if field.parse is None else list(map(field.parse, values))
+
+    def iter_column(self, name, start=0, stop=None):
+        """Yield the values of one field for records start to stop."""
+        for values in self.column_chunks(name, start, stop):
+            yield from values
+
+    def column(self, name, start=0, stop=None):
+        """The values of one field for records start to stop, as a list."""
+        return [value for values in self.column_chunks(name, start, stop) for value in values]
+
+    def array(self, name, start=0, stop=None):
+        """
+        One field of records start to stop as a NumPy array: ``U<width>``
+        for Iran System fields, decoded with iran_encoding.numpy, and
+        ``S<width>`` for the others. As with NumPy's string dtypes, only
+        trailing NULs are removed. Requires NumPy.
+        """
+        import numpy as np
+        from .numpy import decode_array
+
+        field = self.layout[name]
+        start, stop, _ = slice(start, stop).indices(self._count)
+        dtype = np.dtype({'names': [field.name], 'formats': [f'S{field.width}'],
+                          'offsets': [field.offset], 'itemsize': self.layout.record_size})
+        if stop <= start:
+            values = np.empty(0, dtype=f'S{field.width}')
+        else:
+            view = np.frombuffer(self._data, dtype=dtype, count=stop - start,
+                                 offset=self.header_size + start * self.layout.record_size)
+            # Copy the column out so the array does not pin the mapping.
+            values = view[field.name].copy()
+        return decode_array(values) if field.iran_system else values
+
+
+class Record:
+    """
+    One record of a RecordFile. Fields are read by name and decoded on
+    every access; a record is only valid while its file is open.
+    """
+    __slots__ = ('_file', '_offset')
+
+    def __init__(self, file, offset):
+        self._file = file
+        self._offset = offset
+
+    def raw(self, name):
+        """The undecoded bytes of a field."""
+        field = self._file.layout[name]
+        start = self._offset + field.offset
+        return self._file._data[start:start + field.width]
+
+    def __getitem__(self, name):
+        return self._file.layout[name].convert(self.raw(name))
+
+    def keys(self):
+        return [field.name for field in self._file.layout]
+
+    def as_dict(self, names=None):
+        """The decoded fields, all of them or only those named."""
+        return {name: self[name] for name in (self.keys() if names is None else names)}
+
+    def __repr__(self):
+        return f"<Record at byte {self._offset}>"
@@ -0,0 +1,338 @@
+"""
+A long-lived local conversion server.
+
+``iran-encoding serve`` keeps one process with the tables loaded and
+answers HTTP requests on localhost or on a Unix socket, so short-lived
+clients do not pay for starting an interpreter::
+
+    iran-encoding serve --port 8765
+    iran-encoding serve --socket /run/iran-encoding.sock
+
+    curl -s localhost:8765/encode -d '{"text": "سلام دنیا"}'
+    {"hex": "a8f391f420a2f7fe91", "batch_size": 1, "latency_ms": {...}}
+
+Endpoints:
+
+- ``POST /encode`` takes ``{"text": ..., "visual_ordering": true}`` and
+  answers ``{"hex": ...}``; text may be a string or a list of strings, and
+  the hex is a string or a list to match. Values are encoded as encode()
+  encodes them.
+- ``POST /decode`` takes ``{"hex": ...}``, a string or a list, and answers
+  ``{"text": ...}`` as decode() does.
+- ``GET /metrics`` answers request, batch and latency statistics.
+
+Requests that arrive together are converted together: each kind of request
+has a queue, and a batcher takes everything queued, up to max_batch
+values, and converts it with one encode_many() or decode_many() call on a
+conversion thread. While a batch is converted the next one collects, so
+batches grow with the load without a fixed wait. A max_delay above zero
+also waits that long for more requests before each batch. Every answer
+carries its batch size and latencies: the time queued, the time converting
+and the total time in the server.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from . import decode_many, encode_many
+
+__all__ = ['ConversionServer', 'serve']
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Values converted per batch at most.
+MAX_BATCH = 1024
+
+# Largest request body accepted, in bytes.
+MAX_BODY_SIZE = 16 << 20
+
+# Latencies kept for the percentiles of /metrics.
+LATENCY_WINDOW = 10000
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class _RequestError(ValueError):
+    """A request the server cannot answer, with the HTTP status to send."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class _Batcher:
+    """Collects the values of concurrent requests and converts them in batches."""
+
+    def __init__(self, convert, executor, max_batch, max_delay):
+        self.convert = convert
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = asyncio.Queue()
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, values):
+        """
+        Convert values with the next batch. Returns the results with the
+        batch size and the seconds spent queued and converting.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((values, future, time.perf_counter()))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            if self.max_delay:
+                await asyncio.sleep(self.max_delay)
+            size = len(batch[0][0])
+            while size < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                size += len(batch[-1][0])
+            values = [value for item in batch for value in item[0]]
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, self.convert, values)
+            except Exception as exc:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            converting = time.perf_counter() - started
+            start = 0
+            for item_values, future, queued_at in batch:
+                end = start + len(item_values)
+                if not future.done():
+                    future.set_result((results[start:end], len(batch), started - queued_at, converting))
+                start = end
+
+    def close(self):
+        self.task.cancel()
+
+
+class _Metrics:
+    """Counters and recent latencies for /metrics."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests = 0
+        self.values = 0
+        self.errors = 0
+        self.batches = {}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, values, batch_size, latency):
+        self.requests += 1
+        self.values += values
+        self.batches[batch_size] = self.batches.get(batch_size, 0) + 1
+        self.latencies.append(latency)
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(int(p / 100 * len(latencies)), len(latencies) - 1)] * 1e3, 3)
+
+        requests_in_batches = sum(self.batches.values())
+        return {
+            'uptime_s': round(time.time() - self.started, 3),
+            'requests': self.requests,
+            'values': self.values,
+            'errors': self.errors,
+            'mean_batch_size': round(sum(size * count for size, count in self.batches.items())
+                                     / requests_in_batches, 2) if requests_in_batches else None,
+            'latency_ms': {'p50': percentile(50), 'p90': percentile(90), 'p99': percentile(99),
+                           'max': round(latencies[-1] * 1e3, 3) if latencies else None},
+        }
+
+
+def _values(payload, key, kind):
+    """The value or list of values under key, and whether it was a list."""
+    if not isinstance(payload, dict) or key not in payload:
+        raise _RequestError(400, f"the request body must be a JSON object with a {key!r} member")
+    value = payload[key]
+    if isinstance(value, list):
+        if not all(isinstance(item, kind) for item in value):
+            raise _RequestError(400, f"every item of {key!r} must be a {kind.__name__}")
+        return value, True
+    if not isinstance(value, kind):
+        raise _RequestError(400, f"{key!r} must be a {kind.__name__} or a list of them")
+    return [value], False
+
+
+class ConversionServer:
+    """
+    The HTTP conversion server. Use start() and close() from a running event
+    loop, or serve() to run one until interrupted.
+
+    Args:
+        max_batch (int): Values converted per batch at most.
+        max_delay (float): Seconds to wait for more requests before each
+                           batch; 0 converts whatever is queued at once.
+    """
+
+    def __init__(self, max_batch=MAX_BATCH, max_delay=0.0):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.metrics = _Metrics()
+        self._servers = []
+        self._batchers = {}
+        self._executor = None
+        self._socket_path = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        """
+        Start listening on the Unix socket path if given, otherwise on host
+        and port. Returns the address listened on: the path, or a
+        ``(host, port)`` pair with the actual port when port is 0.
+        """
+        # One conversion thread: batches run one at a time while the event
+        # loop keeps reading the requests of the next one.
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix='iran-encoding-convert')
+        self._batchers = {
+            ('encode', True): _Batcher(lambda texts: encode_many(texts, True), self._executor,
+                                       self.max_batch, self.max_delay),
+            ('encode', False): _Batcher(lambda texts: encode_many(texts, False), self._executor,
+                                        self.max_batch, self.max_delay),
+            ('decode', None): _Batcher(decode_many, self._executor, self.max_batch, self.max_delay),
+        }
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle_connection, path)
+            self._socket_path = path
+            address = path
+        else:
+            server = await asyncio.start_server(self._handle_connection, host, port)
+            address = server.sockets[0].getsockname()[:2]
+        self._servers.append(server)
+        return address
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        for batcher in self._batchers.values():
+            batcher.close()
+        self._batchers = {}
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._socket_path is not None:
+            try:
+                os.unlink(self._socket_path)
+            except OSError:
+                pass
+            self._socket_path = None
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split(None, 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_SIZE:
+                    self._respond(writer, 413, {'error': f"request body over {MAX_BODY_SIZE} bytes"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._dispatch(method, target, body)
+                keep_alive = (version.strip() == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                self._respond(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(body)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                     + body)
+
+    async def _dispatch(self, method, target, body):
+        received = time.perf_counter()
+        path = target.split('?', 1)[0]
+        try:
+            if path == '/metrics':
+                if method != 'GET':
+                    raise _RequestError(405, "use GET for /metrics")
+                return 200, self.metrics.snapshot()
+            if path not in ('/encode', '/decode'):
+                raise _RequestError(404, f"no endpoint {path}")
+            if method != 'POST':
+                raise _RequestError(405, f"use POST for {path}")
+            try:
+                payload = json.loads(body)
+            except ValueError as exc:
+                raise _RequestError(400, f"invalid JSON: {exc}") from None
+            if path == '/encode':
+                values, many = _values(payload, 'text', str)
+                visual_ordering = payload.get('visual_ordering', True)
+                if not isinstance(visual_ordering, bool):
+                    raise _RequestError(400, "'visual_ordering' must be true or false")
+                results, batch_size, queued, converting = await self._batchers['encode', visual_ordering].submit(values)
+                key, results = 'hex', [data.hex() for data in results]
+            else:
+                values, many = _values(payload, 'hex', str)
+                try:
+                    values = [bytes.fromhex(value) for value in values]
+                except ValueError as exc:
+                    raise _RequestError(400, f"invalid hex: {exc}") from None
+                results, batch_size, queued, converting = await self._batchers['decode', None].submit(values)
+                key = 'text'
+        except _RequestError as exc:
+            self.metrics.errors += 1
+            return exc.status, {'error': str(exc)}
+        except Exception as exc:
+            self.metrics.errors += 1
+            return 500, {'error': f"{type(exc).__name__}: {exc}"}
+        total = time.perf_counter() - received
+        self.metrics.record(len(values), batch_size, total)
+        return 200, {
+            key: results if many else results[0],
+            'batch_size': batch_size,
+            'latency_ms': {'queued': round(queued * 1e3, 3), 'convert': round(converting * 1e3, 3),
+                           'total': round(total * 1e3, 3)},
+        }
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, max_batch=MAX_BATCH, max_delay=0.0):
+    """Run a ConversionServer until interrupted."""
+
+    async def main():
+        server = ConversionServer(max_batch, max_delay)
+        address = await server.start(host, port, path)
+        where = address if path is not None else f"http://{address[0]}:{address[1]}"
+        print(f"iran-encoding serving on {where}", flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,292 @@
+"""
+Convert whole files between Iran System and other encodings.
+
+    from iran_encoding.transcode import transcode_file
+
+    transcode_file('ARCHIVE.TXT', 'archive.txt', 'iran_system', 'utf-8')
+    transcode_file('archive.txt', 'ARCHIVE.TXT', 'utf-8', 'iran_system')
+
+The input file is memory-mapped and converted CHUNK_SIZE bytes at a time,
+and the output goes through a WRITE_BUFFER_SIZE buffer, so the memory used
+does not depend on the size of the file.
+
+Encoding to Iran System follows unicode_to_iransystem, as the iran_system
+codec does. Shaping looks at the neighbouring characters and the
+alphanumeric reversal needs whole runs, so each chunk is converted through a
+codec.BoundaryEncoder up to its last line break or non-joining letter, and
+the rest is carried into the next chunk. That makes the output the same as
+that of converting the whole file at once, except that at most
+codec.MAX_PENDING characters are carried: a joined word or alphanumeric run
+longer than that is converted as if the text ended there. Decoding Iran
+System needs no context and is done a chunk at a time.
+
+With ``jobs`` above one, a file larger than a chunk is split into chunks
+that end at line breaks, which are converted by a pool of worker processes
+and written in order. The chunks and the converted results go through
+blocks of shared memory rather than being pickled, and at most two chunks
+per worker are in flight, so memory use stays bounded. The output is the
+same as that of the serial conversion. Encodings whose line breaks are not
+the single byte 0x0A, such as UTF-16, are always converted serially, as is
+everything on Python 3.7, which lacks multiprocessing.shared_memory.
+"""
+import codecs
+import mmap
+import os
+import sys
+from contextlib import ExitStack
+
+from . import backends
+from .core import DECODING_TABLE
+from .codec import CODEC_NAME, LOGICAL_CODEC_NAME, BoundaryEncoder
+
+__all__ = ['transcode_file']
+
+# Input bytes converted at a time.
+CHUNK_SIZE = 1 << 20
+
+# Buffer size of the output file.
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Chunks in flight per worker process in parallel mode.
+CHUNKS_PER_JOB = 2
+
+
+def _is_iran_system(encoding):
+    return codecs.lookup(encoding).name in (CODEC_NAME, LOGICAL_CODEC_NAME)
+
+
+def _chunk_decoder(encoding, errors, backend, chunk_size):
+    if _is_iran_system(encoding):
+        # One byte per character and no context: chunks decode on their own.
+        convert = backends.decoder(backend, chunk_size)
+        return lambda data, final=False: convert(data)
+    return codecs.getincrementaldecoder(encoding)(errors).decode
+
+
+def _chunk_encoder(encoding, errors, visual_ordering, backend, chunk_size):
+    if _is_iran_system(encoding):
+        visual_ordering = visual_ordering and codecs.lookup(encoding).name == CODEC_NAME
+        return BoundaryEncoder(backends.encoder(backend, chunk_size), visual_ordering).encode
+    return codecs.getincrementalencoder(encoding)(errors).encode
+
+
+def _open_input(stack, source):
+    if isinstance(source, (str, bytes, os.PathLike)):
+        source = stack.enter_context(open(source, 'rb'))
+    if not os.fstat(source.fileno()).st_size:
+        # mmap cannot map an empty file.
+        return b""
+    data = stack.enter_context(mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ))
+    if hasattr(data, 'madvise'):
+        data.madvise(mmap.MADV_SEQUENTIAL)
+    return data
+
+
+def _open_output(stack, destination, source):
+    if not isinstance(destination, (str, bytes, os.PathLike)):
+        return destination
+    if (isinstance(source, (str, bytes, os.PathLike)) and os.path.exists(destination)
+            and os.path.samefile(source, destination)):
+        raise ValueError("the input and output must be different files")
+    return stack.enter_context(open(destination, 'wb', buffering=WRITE_BUFFER_SIZE))
+
+
+def _splits_at_line_breaks(encoding):
+    """
+    True if encoding writes a line break as the single byte 0x0A and keeps
+    no state across it, so a file in it can be cut after any 0x0A byte.
+    """
+    try:
+        return codecs.encode("\n\n", encoding) == b"\n\n"
+    except UnicodeError:
+        return False
+
+
+def _line_chunks(data, chunk_size):
+    """
+    Yield (start, end) of consecutive chunks of data of up to chunk_size
+    bytes, each ending after a line break. A longer line makes a longer chunk.
+    """
+    start, size = 0, len(data)
+    while start < size:
+        end = start + chunk_size
+        if end < size:
+            cut = data.rfind(b"\n", start, end)
+            if cut < 0:
+                cut = data.find(b"\n", end)
+            end = size if cut < 0 else cut + 1
+        else:
+            end = size
+        yield start, end
+        start = end
+
+
+def _max_expansion(from_encoding, to_encoding, errors):
+    """An upper bound on output bytes per input byte, for sizing result blocks."""
+    if _is_iran_system(to_encoding):
+        # At most one character per input byte, and one byte per character.
+        return 1
+    if _is_iran_system(from_encoding):
+        try:
+            return max(len(codecs.encode(char, to_encoding, errors)) for char in DECODING_TABLE)
+        except UnicodeError:
+            return 1
+    return 4
+
+
+def _convert_chunk(input_name, length, output_name, from_encoding, to_encoding,
+                   visual_ordering, errors, backend):
+    """
+    Convert one line-aligned chunk in a worker process. The chunk is read
+    from the shared memory block input_name and the result written to the
+    block output_name. Returns the result length, or the result itself in
+    the rare case that it does not fit the block.
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    block = SharedMemory(input_name)
+    try:
+        data = bytes(block.buf[:length])
+    finally:
+        block.close()
+    text = _chunk_decoder(from_encoding, errors, backend, length)(data, final=True)
+    converted = _chunk_encoder(to_encoding, errors, visual_ordering, backend, length)(text, final=True)
+    block = SharedMemory(output_name)
+    try:
+        if len(converted) > block.size:
+            return converted
+        block.buf[:len(converted)] = converted
+    finally:
+        block.close()
+    return len(converted)
+
+
+class _Slot:
+    """The shared memory blocks holding one chunk in flight and its result."""
+
+    def __init__(self):
+        self.input = self.output = None
+
+    def load(self, chunk, expansion):
+        """Copy chunk into the input block, growing both blocks if needed."""
+        from multiprocessing.shared_memory import SharedMemory
+
+        if self.input is None or self.input.size < len(chunk):
+            self.close()
+            self.input = SharedMemory(create=True, size=max(len(chunk), 1))
+            self.output = SharedMemory(create=True, size=max(len(chunk) * expansion, 1))
+        self.input.buf[:len(chunk)] = chunk
+
+    def write_result(self, result, output):
+        """Write the result of _convert_chunk to output and return its length."""
+        if isinstance(result, int):
+            output.write(self.output.buf[:result])
+            return result
+        output.write(result)
+        return len(result)
+
+    def close(self):
+        for block in (self.input, self.output):
+            if block is not None:
+                block.close()
+                block.unlink()
+        self.input = self.output = None
+
+
+def _transcode_serial(data, output, from_encoding, to_encoding, visual_ordering,
+                      errors, chunk_size, backend):
+    decode = _chunk_decoder(from_encoding, errors, backend, chunk_size)
+    encode = _chunk_encoder(to_encoding, errors, visual_ordering, backend, chunk_size)
+    written = 0
+    for start in range(0, len(data), chunk_size):
+        converted = encode(decode(data[start:start + chunk_size]))
+        output.write(converted)
+        written += len(converted)
+    converted = encode(decode(b"", final=True), final=True)
+    output.write(converted)
+    return written + len(converted)
+
+
+def _transcode_parallel(data, output, jobs, from_encoding, to_encoding, visual_ordering,
+                        errors, chunk_size, backend):
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    expansion = _max_expansion(from_encoding, to_encoding, errors)
+    # Workers started with spawn do not inherit a default set at run time.
+    backend = backend or backends.get_default_backend()
+    slots = [_Slot() for _ in range(CHUNKS_PER_JOB * jobs)]
+    free = list(slots)
+    running = deque()
+    written = 0
+    view = memoryview(data)
+    try:
+        with ProcessPoolExecutor(jobs) as pool:
+            for start, end in _line_chunks(data, chunk_size):
+                if not free:
+                    future, slot = running.popleft()
+                    written += slot.write_result(future.result(), output)
+                    free.append(slot)
+                slot = free.pop()
+                slot.load(view[start:end], expansion)
+                future = pool.submit(_convert_chunk, slot.input.name, end - start, slot.output.name,
+                                     from_encoding, to_encoding, visual_ordering, errors, backend)
+                running.append((future, slot))
+            while running:
+                future, slot = running.popleft()
+                written += slot.write_result(future.result(), output)
+    finally:
+        view.release()
+        for slot in slots:
+            slot.close()
+    return written
+
+
+def transcode_file(source, destination, from_encoding=CODEC_NAME, to_encoding='utf-8',
+                   visual_ordering=True, errors='strict', chunk_size=CHUNK_SIZE, backend=None,
+                   jobs=1):
+    """
+    Convert the file source from one encoding to another, writing destination.
+
+    Args:
+        source: A path, or a binary file object with a fileno().
+        destination: A path, or a binary file object open for writing.
+        from_encoding (str): Encoding of source: ``iran_system`` or any
+                             Python codec name.
+        to_encoding (str): Encoding written: ``iran_system``,
+                           ``iran_system_logical`` or any Python codec name.
+        visual_ordering (bool): Visual ordering when encoding to
+                                ``iran_system``, as in encode().
+        errors (str): Error handling of the other codec. Characters without
+                      an Iran System form become '?' as in encode().
+        chunk_size (int): Input bytes converted at a time.
+        backend (str): Conversion backend, as in encode().
+        jobs (int): Worker processes converting chunks in parallel; 0 for
+                    one per CPU.
+
+    Returns:
+        int: The number of bytes written.
+
+    Raises LookupError for an unknown encoding and UnicodeError when the
+    input cannot be converted under errors.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    # Unknown encodings fail here, before any file is touched.
+    codecs.lookup(from_encoding)
+    codecs.lookup(to_encoding)
+    with ExitStack() as stack:
+        data = _open_input(stack, source)
+        output = _open_output(stack, destination, source)
+        # multiprocessing.shared_memory is new in Python 3.8.
+        if (jobs > 1 and len(data) > chunk_size and sys.version_info >= (3, 8)
+                and _splits_at_line_breaks(from_encoding) and _splits_at_line_breaks(to_encoding)):
+            written = _transcode_parallel(data, output, jobs, from_encoding, to_encoding,
+                                          visual_ordering, errors, chunk_size, backend)
+        else:
+            written = _transcode_serial(data, output, from_encoding, to_encoding,
+                                        visual_ordering, errors, chunk_size, backend)
+        output.flush()
+    return written
@@ -1,5 +1,5 @@
 import os
-from setuptools import setup, find_packages
+from setuptools import Extension, setup, find_packages
 
 # Read the contents of your README file
 this_directory = os.path.abspath(os.path.dirname(__file__))
@@ -8,6 +8,15 @@ with open(os.path.join(this_directory, "README.md"), encoding="utf-8") as f:
 
 requirements = ["setuptools>=65.0.0"]
 
+# Native speedups; optional so installs without a C compiler fall back to
+# the pure Python core.
+speedups = Extension(
+    "iran_encoding._speedups",
+    sources=["iran_encoding/_speedups.c", "iran_encoding/iran_system.c"],
+    include_dirs=["iran_encoding"],
+    optional=True,
+)
+
 setup(
     name="iran-encoding",
     version="1.1.0",
@@ -18,6 +27,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/movtigroup/Iran-System-encoding",
     packages=find_packages(),
+    ext_modules=[speedups],
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
@@ -37,6 +47,7 @@ setup(
     python_requires=">=3.7",
     install_requires=requirements,
     extras_require={
+        "numpy": ["numpy>=1.17"],
         "dev": [
             "pytest>=6.0",
             "pytest-cov>=2.0",
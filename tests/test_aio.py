@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the asyncio streaming conversion
+"""
+import asyncio
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import iran_encoding
+from iran_encoding import aio, core
+from tests.test_core import load_corpus_text
+
+
+def random_pieces(value, seed, largest=50):
+    """value cut at random places."""
+    rnd = random.Random(seed)
+    pieces, start = [], 0
+    while start < len(value):
+        end = start + rnd.randint(1, largest)
+        pieces.append(value[start:end])
+        start = end
+    return pieces
+
+
+async def collect(chunks):
+    return [piece async for piece in chunks]
+
+
+class TestChunks(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.text = load_corpus_text()
+
+    async def test_encode_chunks_keeps_context(self):
+        """Pieces cut anywhere encode as the whole text does"""
+        for visual in (True, False):
+            expected = core.unicode_to_iransystem(self.text, visual)
+            for seed in range(3):
+                with self.subTest(visual=visual, seed=seed):
+                    pieces = random_pieces(self.text, seed)
+                    data = await collect(aio.encode_chunks(pieces, visual))
+                    self.assertEqual(b"".join(data), expected)
+
+    async def test_offloaded_pieces(self):
+        """Pieces converted in an executor give the same output"""
+        pieces = random_pieces(self.text, 7, largest=500)
+        with ThreadPoolExecutor(1) as executor:
+            data = await collect(aio.encode_chunks(pieces, executor=executor, offload_threshold=100))
+            self.assertEqual(b"".join(data), core.unicode_to_iransystem(self.text))
+
+            encoded = b"".join(data)
+            text = await collect(aio.decode_chunks(random_pieces(encoded, 1, 500), offload_threshold=100))
+            self.assertEqual("".join(text), core.iransystem_to_unicode(encoded))
+
+    async def test_async_iterable_input(self):
+        async def pieces():
+            for piece in random_pieces(self.text, 3):
+                await asyncio.sleep(0)
+                yield piece
+
+        data = await collect(aio.encode_chunks(pieces()))
+        self.assertEqual(b"".join(data), core.unicode_to_iransystem(self.text))
+
+    async def test_bounded_pending(self):
+        """Text without a boundary is not held back beyond max_pending"""
+        sizes = []
+        async for data in aio.encode_chunks(["abc " * 10] * 10, max_pending=64):
+            sizes.append(len(data))
+        self.assertGreater(len(sizes), 1)
+        self.assertEqual(sum(sizes), 400)
+
+    async def test_unmappable_characters(self):
+        data = await collect(aio.encode_chunks(["سلام €"]))
+        self.assertEqual(b"".join(data), core.unicode_to_iransystem("سلام €"))
+
+
+class TestStreams(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.text = load_corpus_text()
+        self.received = asyncio.get_running_loop().create_future()
+
+        async def handle(reader, writer):
+            self.received.set_result(await reader.read())
+            writer.close()
+
+        self.server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        self.address = self.server.sockets[0].getsockname()[:2]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_encoding_writer(self):
+        _, writer = await asyncio.open_connection(*self.address)
+        async with aio.EncodingWriter(writer, offload_threshold=200) as encoding_writer:
+            for piece in random_pieces(self.text, 5, largest=400):
+                await encoding_writer.write(piece)
+        self.assertEqual(await self.received, core.unicode_to_iransystem(self.text))
+
+    async def test_decoding_reader(self):
+        encoded = core.unicode_to_iransystem(self.text)
+        reader = asyncio.StreamReader()
+        reader.feed_data(encoded)
+        reader.feed_eof()
+        decoding_reader = aio.DecodingReader(reader, read_size=100)
+        first_line = await decoding_reader.readline()
+        self.assertEqual(first_line, core.iransystem_to_unicode(encoded[:encoded.index(b"\n") + 1]))
+        piece = await decoding_reader.read(10)
+        self.assertLessEqual(len(piece), 10)
+        rest = [text async for text in decoding_reader]
+        self.assertTrue(all(len(text) <= 100 for text in rest))
+        self.assertEqual(first_line + piece + "".join(rest), core.iransystem_to_unicode(encoded))
+
+    async def test_transcode_stream(self):
+        reader = asyncio.StreamReader()
+        for piece in random_pieces(self.text.encode('utf-8'), 9, largest=300):
+            reader.feed_data(piece)
+        reader.feed_eof()
+        _, writer = await asyncio.open_connection(*self.address)
+        written = await aio.transcode_stream(reader, writer, 'utf-8', 'iran_system', read_size=64)
+        writer.close()
+        expected = core.unicode_to_iransystem(self.text)
+        self.assertEqual(await self.received, expected)
+        self.assertEqual(written, len(expected))
+
+
+class TestAwaitable(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.text = load_corpus_text()
+        stats = aio.async_stats(reset=True)
+        self.addCleanup(aio.configure_async, stats['threshold'], stats['max_workers'],
+                        stats['max_queue'], 'auto')
+
+    async def test_small_values_run_inline(self):
+        self.assertEqual(await iran_encoding.encode_async("سلام"), iran_encoding.encode("سلام"))
+        self.assertEqual(await iran_encoding.decode_async(b"\xa8\xf3\x91\xf4"), "سلام")
+        stats = aio.async_stats()
+        self.assertEqual((stats['inline'], stats['offloaded']), (2, 0))
+
+    async def test_large_values_are_offloaded(self):
+        aio.configure_async(threshold=100, max_workers=2, max_queue=3, kind='thread')
+        texts = [self.text[start:start + 300] for start in range(0, len(self.text) - 300, 150)]
+        results = await asyncio.gather(*(aio.encode_async(text, visual) for text in texts
+                                         for visual in (True, False)))
+        self.assertEqual(results, [iran_encoding.encode(text, visual) for text in texts
+                                   for visual in (True, False)])
+        decoded = await asyncio.gather(*(aio.decode_async(data) for data in results))
+        self.assertEqual(decoded, [iran_encoding.decode(data) for data in results])
+
+        stats = aio.async_stats()
+        self.assertEqual(stats['executor'], 'thread')
+        self.assertEqual(stats['offloaded'], 2 * len(results))
+        self.assertLessEqual(stats['max_queue_depth'], 3)
+        self.assertEqual((stats['queue_depth'], stats['waiting']), (0, 0))
+        self.assertIsNotNone(stats['latency_ms']['p99'])
+        self.assertIsNotNone(stats['queue_wait_ms']['p50'])
+
+    async def test_process_executor(self):
+        aio.configure_async(threshold=0, max_workers=1, kind='process')
+        data = await aio.encode_async(self.text, backend='python')
+        self.assertEqual(data, iran_encoding.encode(self.text, backend='python'))
+        self.assertEqual(aio.async_stats()['executor'], 'process')
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            aio.configure_async(kind='fiber')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the backend registry and size-based selection
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import iran_encoding
+from iran_encoding import backends, core
+from tests.test_core import load_corpus_text
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.text = load_corpus_text()
+        self.encoded = core.unicode_to_iransystem(self.text)
+
+    def tearDown(self):
+        backends.set_default_backend(None)
+
+    def test_available_backends_match_core(self):
+        """Every available backend converts exactly like the Python core"""
+        names = backends.available_backends()
+        self.assertIn('python', names)
+        for name in names:
+            with self.subTest(backend=name):
+                self.assertEqual(iran_encoding.encode(self.text, backend=name), self.encoded)
+                self.assertEqual(iran_encoding.encode(self.text, False, backend=name),
+                                 core.unicode_to_iransystem(self.text, False))
+                self.assertEqual(iran_encoding.decode(self.encoded, backend=name),
+                                 core.iransystem_to_unicode(self.encoded))
+                self.assertEqual(iran_encoding.encode_many([self.text, "abc"], backend=name),
+                                 [self.encoded, b"abc"])
+                self.assertEqual(iran_encoding.decode_many([self.encoded], backend=name),
+                                 [core.iransystem_to_unicode(self.encoded)])
+
+    def test_ctypes_decodes_with_core(self):
+        """The ctypes call is slower than the core charmap decode, so it is not used"""
+        if 'ctypes' not in backends.available_backends():
+            self.skipTest("C library unavailable")
+        self.assertIs(backends.get_backend('ctypes').iransystem_to_unicode, core.iransystem_to_unicode)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            iran_encoding.encode("سلام", backend="fortran")
+        with self.assertRaises(ValueError):
+            backends.set_default_backend("fortran")
+
+    def test_register_backend(self):
+        """Registered backends are loaded on first use and selectable per call"""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return (lambda text, reverse_flag=True: b"custom"), (lambda data: "custom")
+
+        def unavailable():
+            raise ImportError("no such library")
+
+        backends.register_backend("test-custom", loader)
+        backends.register_backend("test-missing", unavailable)
+        try:
+            self.assertEqual(calls, [])
+            self.assertEqual(iran_encoding.encode("سلام", backend="test-custom"), b"custom")
+            self.assertEqual(iran_encoding.decode(b"\xa8", backend="test-custom"), "custom")
+            self.assertEqual(calls, [1])
+            with self.assertRaisesRegex(ImportError, "no such library"):
+                iran_encoding.encode("سلام", backend="test-missing")
+            self.assertNotIn("test-missing", backends.available_backends())
+        finally:
+            for name in ("test-custom", "test-missing"):
+                backends._loaders.pop(name)
+                backends._backends.pop(name, None)
+                backends._unavailable.pop(name, None)
+
+    def test_default_backend(self):
+        backends.set_default_backend('python')
+        self.assertEqual(backends.get_default_backend(), 'python')
+        self.assertIs(backends.encoder(), core.unicode_to_iransystem)
+        backends.set_default_backend(None)
+        self.assertIn(backends.get_default_backend(), ('native', 'python'))
+
+    def test_environment_variable(self):
+        """IRAN_ENCODING_BACKEND sets the default backend"""
+        code = (
+            "from iran_encoding import backends, core\n"
+            "assert backends.get_default_backend() == 'python'\n"
+            "assert backends.encoder() is core.unicode_to_iransystem\n"
+        )
+        env = dict(os.environ, IRAN_ENCODING_BACKEND='python')
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+
+    def test_unavailable_environment_backend(self):
+        """A bad IRAN_ENCODING_BACKEND warns once and falls back"""
+        code = (
+            "import warnings\n"
+            "import iran_encoding\n"
+            "with warnings.catch_warnings(record=True) as caught:\n"
+            "    warnings.simplefilter('always')\n"
+            "    assert iran_encoding.encode('\\u0633\\u0644\\u0627\\u0645') == b'\\xa8\\xf3\\x91\\xf4'\n"
+            "    iran_encoding.decode(b'\\xa8')\n"
+            "assert len(caught) == 1 and 'IRAN_ENCODING_BACKEND' in str(caught[0].message), caught\n"
+            "assert iran_encoding.backends.get_default_backend() in ('native', 'python')\n"
+        )
+        env = dict(os.environ, IRAN_ENCODING_BACKEND='no-such-backend')
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+
+
+class TestAutoSelection(unittest.TestCase):
+    def setUp(self):
+        self.cache_home = tempfile.TemporaryDirectory()
+        self.environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=self.cache_home.name)
+        self.environ.start()
+        backends._crossovers = None
+
+    def tearDown(self):
+        self.environ.stop()
+        self.cache_home.cleanup()
+        backends._crossovers = None
+
+    def test_calibration_is_cached(self):
+        """The first auto call measures crossovers and writes them to the cache file"""
+        self.assertEqual(iran_encoding.encode("سلام", backend='auto'), b"\xa8\xf3\x91\xf4")
+        with open(backends.calibration_path(), encoding='utf-8') as f:
+            cached = json.load(f)
+        self.assertEqual(cached['sizes'][0], 0)
+        self.assertTrue(set(cached['backends']) <= set(backends.available_backends()))
+
+        # A valid cache file is used as it is, without measuring again.
+        cached['sizes'], cached['backends'] = [0, 100], ['python', 'test-large']
+        with open(backends.calibration_path(), 'w', encoding='utf-8') as f:
+            json.dump(cached, f)
+        backends._crossovers = None
+        with mock.patch.object(backends, 'calibrate') as calibrate:
+            self.assertEqual(backends.load_crossovers(), ([0, 100], ['python', 'test-large']))
+        calibrate.assert_not_called()
+
+    def test_selection_by_size(self):
+        backends._crossovers = ([0, 1000], ['python', 'native'])
+        self.assertIs(backends.encoder('auto', 10), core.unicode_to_iransystem)
+        self.assertIs(backends.decoder('auto', 999), core.iransystem_to_unicode)
+        with mock.patch.object(backends, 'get_backend') as get_backend:
+            backends.encoder('auto', 5000)
+        get_backend.assert_called_once_with('native')
+
+    def test_stale_cache_is_recalibrated(self):
+        os.makedirs(os.path.dirname(backends.calibration_path()))
+        with open(backends.calibration_path(), 'w', encoding='utf-8') as f:
+            json.dump({'key': {'version': '0'}, 'sizes': [0], 'backends': ['missing']}, f)
+        sizes, names = backends.load_crossovers()
+        self.assertNotIn('missing', names)
+
+    def test_unwritable_cache_directory(self):
+        """Calibration still works when the cache cannot be written"""
+        with mock.patch.object(backends, 'calibration_path', return_value='/dev/null/crossover.json'):
+            sizes, names = backends.load_crossovers()
+        self.assertEqual(sizes[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the batch encode_many / decode_many API
+"""
+import unittest
+from array import array
+from iran_encoding import encode, decode, encode_many, decode_many
+
+
+MIXED_VALUES = [
+    "سلام",
+    "SKU-12345",
+    "",
+    "شرکت نمونه 123",
+    "Hello ۱۲۳",
+    "عدد 42 in text",
+    "خط اول\nخط دوم",
+    "ghein غ",
+]
+
+
+class TestBatch(unittest.TestCase):
+    def test_encode_many_matches_encode(self):
+        """Each batch result equals the scalar encode"""
+        for visual in (True, False):
+            with self.subTest(visual=visual):
+                expected = [encode(text, visual_ordering=visual) for text in MIXED_VALUES]
+                self.assertEqual(encode_many(MIXED_VALUES, visual_ordering=visual), expected)
+
+    def test_encode_many_accepts_iterators(self):
+        """Generators are consumed once and encoded in order"""
+        result = encode_many(text for text in MIXED_VALUES)
+        self.assertEqual(result, [encode(text) for text in MIXED_VALUES])
+
+    def test_encode_many_concatenated(self):
+        """Concatenated output splits back into the scalar results"""
+        buffer, offsets = encode_many(MIXED_VALUES, concatenate=True)
+        self.assertIsInstance(buffer, bytes)
+        self.assertIsInstance(offsets, array)
+        self.assertEqual(len(offsets), len(MIXED_VALUES) + 1)
+        for i, text in enumerate(MIXED_VALUES):
+            self.assertEqual(buffer[offsets[i]:offsets[i + 1]], encode(text))
+
+    def test_encode_many_with_embedded_nul(self):
+        """Values that contain NUL still keep their boundaries"""
+        values = ["سلام\x00دنیا", "a\x00b", "تست"]
+        self.assertEqual(encode_many(values), [encode(text) for text in values])
+
+    def test_decode_many_matches_decode(self):
+        """Each batch result equals the scalar decode"""
+        encoded = [encode(text) for text in MIXED_VALUES]
+        encoded.append(bytes([0x00, 0xA8, 0x00]))
+        self.assertEqual(decode_many(encoded), [decode(value) for value in encoded])
+
+    def test_decode_many_concatenated(self):
+        """Concatenated decode returns one string plus offsets"""
+        encoded = [encode(text) for text in MIXED_VALUES]
+        text, offsets = decode_many((bytearray(value) for value in encoded), concatenate=True)
+        for i, value in enumerate(encoded):
+            self.assertEqual(text[offsets[i]:offsets[i + 1]], decode(value))
+
+    def test_empty_batches(self):
+        """Empty input gives empty output in both modes"""
+        self.assertEqual(encode_many([]), [])
+        self.assertEqual(decode_many([]), [])
+        self.assertEqual(encode_many([], concatenate=True), (b"", array('Q', [0])))
+        self.assertEqual(decode_many([], concatenate=True), ("", array('Q', [0])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the ctypes wrapper around iran_system.c
+"""
+import mmap
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import build_c_extension
+from iran_encoding import c_wrapper, core
+from tests.test_core import load_corpus_text
+
+
+@unittest.skipUnless(c_wrapper.is_available(), "C library could not be built or loaded")
+class TestCWrapper(unittest.TestCase):
+    def test_unicode_to_iransystem_matches_core(self):
+        """The one-call C encode path is byte-identical to the core"""
+        texts = [
+            load_corpus_text(),
+            "".join(chr(c) for c in core.WIDE_CHAR_STR),
+            "سلام 123 Hello world",
+            "a\x00b سلام",
+            "\U0001F600\ud800é",
+            "",
+        ]
+        for text in texts:
+            for reverse_flag in (True, False):
+                with self.subTest(text=text[:20], reverse_flag=reverse_flag):
+                    self.assertEqual(c_wrapper.unicode_to_iransystem_c(text, reverse_flag),
+                                     core.unicode_to_iransystem(text, reverse_flag))
+
+    def test_iransystem_to_unicode_matches_core(self):
+        """The C decode path folds lower forms and keeps NUL bytes like the core"""
+        samples = [
+            bytes(range(256)),
+            bytes(range(256)) * 3,
+            core.unicode_to_iransystem(load_corpus_text()),
+            b"a\x00b\xfe",
+            b"",
+        ]
+        for data in samples:
+            with self.subTest(data=data[:20]):
+                self.assertEqual(c_wrapper.iransystem_to_unicode_c(data),
+                                 core.iransystem_to_unicode(data))
+
+    def test_script_bytes_to_iransystem_keeps_nul_bytes(self):
+        """The Ex API converts past embedded NUL bytes with per-call options"""
+        script = core.unicode_to_persian_script_bytes("سلام abc\x00123 دنیا\x00")
+        for reverse_flag in (True, False):
+            expected = core.script_bytes_to_iransystem(script, reverse_flag)
+            for data in (script, bytearray(script), memoryview(script)):
+                with self.subTest(type=type(data).__name__, reverse_flag=reverse_flag):
+                    self.assertEqual(c_wrapper.script_bytes_to_iransystem_c(data, reverse_flag),
+                                     expected)
+
+    def test_script_bytes_to_iransystem_into(self):
+        """Caller buffers are written in place, including mmap and aliased input"""
+        script = core.unicode_to_persian_script_bytes(load_corpus_text())
+        expected = core.script_bytes_to_iransystem(script)
+
+        buffer = bytearray(script)
+        self.assertEqual(c_wrapper.script_bytes_to_iransystem_into(buffer, buffer), len(script))
+        self.assertEqual(buffer, expected)
+
+        with mmap.mmap(-1, len(script)) as mapped:
+            c_wrapper.script_bytes_to_iransystem_into(script, mapped)
+            self.assertEqual(mapped[:], expected)
+
+        with self.assertRaises(ValueError):
+            c_wrapper.script_bytes_to_iransystem_into(script, bytearray(len(script) - 1))
+        with self.assertRaises(TypeError):
+            c_wrapper.script_bytes_to_iransystem_into(script, bytes(len(script)))
+
+    def test_concurrent_calls_with_mixed_flags(self):
+        """Threads using both orderings at once get their own results"""
+        texts = [load_corpus_text()[i * 200:(i + 1) * 200] for i in range(32)]
+        jobs = [(text, i % 2 == 0) for i, text in enumerate(texts)] * 4
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda job: c_wrapper.unicode_to_iransystem_c(*job), jobs))
+        self.assertEqual(results, [core.unicode_to_iransystem(*job) for job in jobs])
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestLoading(unittest.TestCase):
+    def test_import_does_not_load_or_compile(self):
+        """Importing c_wrapper only defines functions; the binary loads on first use"""
+        code = (
+            "import subprocess\n"
+            "def fail(*args, **kwargs): raise AssertionError('compiler started')\n"
+            "subprocess.run = subprocess.Popen = fail\n"
+            "import iran_encoding.c_wrapper as c\n"
+            "assert not c._loaded\n"
+            "c.is_available()\n"
+            "assert c._loaded\n"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+    def test_loads_the_extension_binary(self):
+        try:
+            from iran_encoding import _speedups
+        except ImportError:
+            self.skipTest("native extension not built")
+        self.assertTrue(c_wrapper.is_available())
+        self.assertEqual(Path(c_wrapper.library_path()), Path(_speedups.__file__))
+        self.assertIs(c_wrapper.C_LIB, c_wrapper.get_library())
+
+
+class TestCTables(unittest.TestCase):
+    def test_generated_tables_are_current(self):
+        """iran_system.c carries the tables build_c_extension.py renders from core.py"""
+        self.assertTrue(build_c_extension.generate_tables(check=True),
+                        "run: python3 build_c_extension.py --tables")
+
+    @unittest.skipUnless(shutil.which("gcc"), "gcc not available")
+    def test_table_kernels_match_legacy_implementations(self):
+        """The C benchmark harness finds no difference from the FindPos versions"""
+        with tempfile.TemporaryDirectory() as tmp:
+            binary = str(Path(tmp) / "bench_iran_system")
+            subprocess.run(["gcc", "-O2", "-I", str(ROOT / "iran_encoding"), "-o", binary,
+                            str(ROOT / "benchmarks" / "bench_iran_system.c"),
+                            str(ROOT / "iran_encoding" / "iran_system.c")],
+                           check=True, capture_output=True)
+            result = subprocess.run([binary, "--check"], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the LRU cache in front of encode and decode
+"""
+import threading
+import unittest
+
+import iran_encoding
+from iran_encoding import cache
+from tests.test_core import load_corpus_text
+
+WORDS = ["تهران", "اصفهان", "شیراز", "تبریز", "مشهد", "کرج", "قم", "اهواز"]
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(cache.disable)
+
+    def test_results_match_uncached(self):
+        expected = {(word, visual): iran_encoding.encode(word, visual) for word in WORDS for visual in (True, False)}
+        cache.enable()
+        for _ in range(3):
+            for (word, visual), data in expected.items():
+                self.assertEqual(iran_encoding.encode(word, visual), data)
+                self.assertEqual(iran_encoding.decode(data), iran_encoding._decode_bytes(data, None))
+        stats = cache.stats()
+        # Visual and logical encodings of a word are separate entries; a
+        # word without alphanumerics encodes the same either way, so the
+        # decode keys repeat.
+        self.assertEqual(stats['misses'], 2 * len(WORDS) + len(WORDS))
+        self.assertEqual(stats['hits'], 3 * 2 * 2 * len(WORDS) - stats['misses'])
+        self.assertEqual(stats['entries'], stats['misses'])
+
+    def test_entry_limit_evicts_least_recently_used(self):
+        cache.enable(max_entries=3)
+        for word in WORDS[:3]:
+            iran_encoding.encode(word)
+        iran_encoding.encode(WORDS[0])
+        iran_encoding.encode(WORDS[3])
+        self.assertEqual(cache.stats()['evictions'], 1)
+        hits = cache.stats()['hits']
+        iran_encoding.encode(WORDS[0])
+        self.assertEqual(cache.stats()['hits'], hits + 1)
+        iran_encoding.encode(WORDS[1])
+        self.assertEqual(cache.stats()['hits'], hits + 1)
+        self.assertEqual(cache.stats()['entries'], 3)
+
+    def test_byte_limit(self):
+        cache.enable(max_bytes=1000)
+        for word in WORDS * 4:
+            iran_encoding.encode(word + " " + word)
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], 1000)
+        self.assertGreater(stats['evictions'], 0)
+
+    def test_large_values_are_not_cached(self):
+        text = load_corpus_text()
+        cache.enable(max_item_size=100)
+        for _ in range(2):
+            self.assertEqual(iran_encoding.encode(text), iran_encoding._encode_text(text, True, None))
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['bypassed']), (0, 2))
+
+    def test_ascii_and_mutable_values(self):
+        cache.enable()
+        self.assertEqual(iran_encoding.encode("hello"), b"hello")
+        data = iran_encoding.encode(WORDS[0])
+        self.assertEqual(iran_encoding.decode(bytearray(data)), WORDS[0])
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['bypassed']), (1, 1))
+
+    def test_clear_and_disable(self):
+        cache.enable()
+        iran_encoding.encode(WORDS[0])
+        cache.clear()
+        self.assertEqual(cache.stats()['entries'], 0)
+        cache.disable()
+        self.assertIsNone(cache.stats())
+        self.assertEqual(iran_encoding.encode(WORDS[0]), iran_encoding._encode_text(WORDS[0], True, None))
+
+    def test_threads(self):
+        cache.enable(max_entries=5)
+        expected = {word: iran_encoding._encode_text(word, True, None) for word in WORDS}
+        failures = []
+
+        def work():
+            for _ in range(200):
+                for word in WORDS:
+                    if iran_encoding.encode(word) != expected[word]:
+                        failures.append(word)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+        stats = cache.stats()
+        self.assertLessEqual(stats['entries'], 5)
+        self.assertEqual(stats['hits'] + stats['misses'], 4 * 200 * len(WORDS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the batch modes of the command-line interface
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import iran_encoding
+
+ROOT = Path(__file__).resolve().parent.parent
+
+LINES = ["سلام دنیا", "hello 123", "", "شماره ۱۲ و Iran System", "۱۲۳"]
+
+
+def run(*args, input=b""):
+    return subprocess.run([sys.executable, "-m", "iran_encoding.cli", *args], cwd=ROOT,
+                          input=input, capture_output=True, check=True).stdout
+
+
+class TestBatchModes(unittest.TestCase):
+    def setUp(self):
+        self.text = "".join(line + "\n" for line in LINES).encode("utf-8")
+        self.encoded = [iran_encoding.encode(line) for line in LINES]
+
+    def test_encode_formats(self):
+        self.assertEqual(run("encode", "--stdin", input=self.text).decode("ascii").splitlines(),
+                         [data.hex(" ") for data in self.encoded])
+        self.assertEqual(run("encode", "--stdin", "--format", "raw", input=self.text),
+                         b"".join(data + b"\n" for data in self.encoded))
+        records = [json.loads(line) for line in run("encode", "--stdin", "--format", "json", input=self.text).splitlines()]
+        self.assertEqual(records, [{"text": line, "hex": data.hex()} for line, data in zip(LINES, self.encoded)])
+
+    def test_encode_logical_and_line_breaks(self):
+        """CR LF line breaks are removed like LF, and --logical is honoured"""
+        output = run("encode", "--stdin", "--logical", "--format", "raw", input=self.text.replace(b"\n", b"\r\n"))
+        self.assertEqual(output.splitlines(), [iran_encoding.encode(line, False) for line in LINES])
+
+    def test_decode(self):
+        raw = b"".join(data + b"\n" for data in self.encoded)
+        expected = [iran_encoding.decode(data) for data in self.encoded]
+        self.assertEqual(run("decode", "--stdin", input=raw).decode("utf-8").split("\n")[:-1], expected)
+
+        hex_lines = "".join(data.hex(" ") + "\n" for data in self.encoded).encode("ascii")
+        records = [json.loads(line) for line in run("decode", "--stdin", "--hex", "--format", "json",
+                                                    input=hex_lines).splitlines()]
+        self.assertEqual(records, [{"hex": data.hex(), "text": text} for data, text in zip(self.encoded, expected)])
+
+    def test_input_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, name) for name in ("a.txt", "b.txt")]
+            for path in paths:
+                with open(path, "wb") as f:
+                    f.write(self.text)
+            output = run("encode", "--input", paths[0], "--input", paths[1], "--format", "raw")
+        self.assertEqual(output, b"".join(data + b"\n" for data in self.encoded) * 2)
+
+    def test_errors(self):
+        result = subprocess.run([sys.executable, "-m", "iran_encoding.cli", "decode", "--stdin", "--hex"],
+                                cwd=ROOT, input=b"abc\n", capture_output=True)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn(b"Error:", result.stderr)
+
+        result = subprocess.run([sys.executable, "-m", "iran_encoding.cli", "encode"],
+                                cwd=ROOT, capture_output=True)
+        self.assertEqual(result.returncode, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the iran_system Python codec
+"""
+import codecs
+import io
+import os
+import tempfile
+import unittest
+
+from iran_encoding import codec
+from iran_encoding.core import unicode_to_iransystem, iransystem_to_unicode
+
+SAMPLE = "سلام دنیا\nشرکت نمونه 123 Hello world\nعلی و غلامعلی ۱۲۳\n"
+
+
+class TestCodec(unittest.TestCase):
+    def test_str_encode_and_bytes_decode(self):
+        """str.encode / bytes.decode use the core conversions"""
+        self.assertEqual("سلام".encode("iran_system"), bytes([0xA8, 0xF3, 0x91, 0xF4]))
+        self.assertEqual(SAMPLE.encode("iran_system"), unicode_to_iransystem(SAMPLE))
+        self.assertEqual(SAMPLE.encode("iran_system_logical"),
+                         unicode_to_iransystem(SAMPLE, reverse_flag=False))
+        encoded = unicode_to_iransystem(SAMPLE)
+        self.assertEqual(encoded.decode("iran_system"), iransystem_to_unicode(encoded))
+
+    def test_aliases(self):
+        """Common spellings resolve to the same codec"""
+        for name in ("iran_system", "Iran-System", "IRANSYSTEM", "iran system"):
+            with self.subTest(name=name):
+                self.assertEqual(codecs.lookup(name).name, "iran_system")
+        self.assertEqual(codecs.lookup("iran-system-logical").name, "iran_system_logical")
+
+    def test_errors_argument(self):
+        """Unmappable characters follow the errors handler"""
+        with self.assertRaises(UnicodeEncodeError) as ctx:
+            "سلام\U0001F600".encode("iran_system")
+        self.assertEqual(ctx.exception.encoding, "iran_system")
+        self.assertEqual(ctx.exception.start, 4)
+        self.assertEqual("سلام\U0001F600".encode("iran_system", "replace"),
+                         unicode_to_iransystem("سلام\U0001F600"))
+
+    def test_incremental_encoder_commits_or_raises(self):
+        """Every two-way split encodes like the whole string or raises"""
+        for name, reverse_flag in (("iran_system", True), ("iran_system_logical", False)):
+            expected = unicode_to_iransystem(SAMPLE, reverse_flag=reverse_flag)
+            for split in range(len(SAMPLE) + 1):
+                with self.subTest(name=name, split=split):
+                    encoder = codecs.getincrementalencoder(name)()
+                    head = encoder.encode(SAMPLE[:split])
+                    self.assertEqual(head, unicode_to_iransystem(SAMPLE[:split], reverse_flag))
+                    try:
+                        tail = encoder.encode(SAMPLE[split:])
+                    except UnicodeEncodeError:
+                        self.assertNotEqual(head, expected[:split])
+                        self.assertNotIn(SAMPLE[split - 1:split], "\nاد")
+                    else:
+                        self.assertEqual(head + tail + encoder.encode("", final=True), expected)
+
+    def test_incremental_encoder_raises_on_changed_output(self):
+        """A piece that changes written output raises instead of writing it"""
+        encoder = codecs.getincrementalencoder("iran_system")()
+        encoder.encode("سل")
+        with self.assertRaises(UnicodeEncodeError) as ctx:
+            encoder.encode("ام")
+        self.assertEqual(ctx.exception.encoding, "iran_system")
+        encoder.reset()
+        encoder.encode("abc")
+        with self.assertRaises(UnicodeEncodeError):
+            encoder.encode(" def")
+        logical = codecs.getincrementalencoder("iran_system_logical")()
+        self.assertEqual(logical.encode("abc") + logical.encode(" def"),
+                         unicode_to_iransystem("abc def", reverse_flag=False))
+
+    def test_boundary_encoder_matches_whole_string(self):
+        """Every two-way split through a BoundaryEncoder encodes like the whole string"""
+        for reverse_flag in (True, False):
+            expected = unicode_to_iransystem(SAMPLE, reverse_flag=reverse_flag)
+            for split in range(len(SAMPLE) + 1):
+                with self.subTest(reverse_flag=reverse_flag, split=split):
+                    encoder = codec.BoundaryEncoder(unicode_to_iransystem, reverse_flag)
+                    result = encoder.encode(SAMPLE[:split])
+                    result += encoder.encode(SAMPLE[split:])
+                    result += encoder.encode("", final=True)
+                    self.assertEqual(result, expected)
+
+    def test_incremental_encoder_state(self):
+        """getstate / setstate carry the encoded tail between encoders"""
+        encoder = codecs.getincrementalencoder("iran_system")()
+        head = encoder.encode("سلام Hello")
+        state = encoder.getstate()
+        other = codecs.getincrementalencoder("iran_system")()
+        other.setstate(state)
+        with self.assertRaises(UnicodeEncodeError):
+            other.encode(" world")
+        tail = other.encode("\nدنیا", final=True)
+        self.assertEqual(head + tail, unicode_to_iransystem("سلام Hello\nدنیا"))
+        encoder.reset()
+        self.assertEqual(encoder.getstate(), 0)
+
+    def test_iterencode_lines(self):
+        """Feeding one line at a time matches; one character at a time raises"""
+        lines = SAMPLE.splitlines(keepends=True)
+        result = b"".join(codecs.iterencode(lines, "iran_system"))
+        self.assertEqual(result, unicode_to_iransystem(SAMPLE))
+        with self.assertRaises(UnicodeEncodeError):
+            b"".join(codecs.iterencode(iter(SAMPLE), "iran_system"))
+
+    def test_stream_writer_flushes_on_reset(self):
+        """StreamWriter writes the held-back tail on reset"""
+        buffer = io.BytesIO()
+        writer = codecs.getwriter("iran_system")(buffer)
+        writer.write("سلام دن")
+        writer.write("یا")
+        writer.reset()
+        self.assertEqual(buffer.getvalue(), unicode_to_iransystem("سلام دنیا"))
+
+    def test_stream_reader(self):
+        """StreamReader decodes from a byte stream"""
+        encoded = unicode_to_iransystem(SAMPLE)
+        reader = codecs.getreader("iran_system")(io.BytesIO(encoded))
+        self.assertEqual(reader.read(), iransystem_to_unicode(encoded))
+
+    def test_builtin_open_round_trip(self):
+        """open(..., encoding='iran_system') writes and reads files"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sample.txt")
+            with open(path, "w", encoding="iran_system", newline="") as f:
+                for line in SAMPLE.splitlines(keepends=True):
+                    f.write(line)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), unicode_to_iransystem(SAMPLE))
+            with open(path, encoding="iran_system", newline="") as f:
+                self.assertEqual(f.read(), iransystem_to_unicode(unicode_to_iransystem(SAMPLE)))
+
+    def test_builtin_open_writes_whole_text(self):
+        """open(..., "w", encoding='iran_system') loses nothing at the end"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sample.txt")
+            for text in ("hello", "سلام", "abc سلام def", SAMPLE + "پایان"):
+                for encoding, reverse_flag in (("iran_system", True), ("iran_system_logical", False)):
+                    with self.subTest(text=text, encoding=encoding):
+                        with open(path, "w", encoding=encoding, newline="") as f:
+                            f.write(text)
+                        with open(path, "rb") as f:
+                            self.assertEqual(f.read(), unicode_to_iransystem(text, reverse_flag))
+            with open(path, "w", encoding="iran_system", newline="\r\n") as f:
+                f.write("سلام\nدنیا")
+                f.flush()
+                f.write(" و بس\n")
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), unicode_to_iransystem("سلام\r\nدنیا و بس\r\n"))
+            with open(path, "w", encoding="iran_system") as f:
+                f.write("سل")
+                with self.assertRaises(UnicodeEncodeError):
+                    f.write("ام")
+
+    def test_pending_tail_is_bounded(self):
+        """Text without a boundary is not held back beyond max_pending"""
+        encoder = codec.BoundaryEncoder(unicode_to_iransystem, max_pending=100)
+        data = b"".join(encoder.encode("abc " * 10) for _ in range(10))
+        self.assertGreater(len(data), 0)
+        self.assertLessEqual(len(encoder.pending), 100)
+        self.assertEqual(len(data + encoder.encode("", final=True)), 400)
+
+        incremental = codecs.getincrementalencoder("iran_system_logical")()
+        incremental.max_pending = 100
+        data = b"".join(incremental.encode("abc " * 10) for _ in range(10))
+        self.assertEqual(data, unicode_to_iransystem("abc " * 100, reverse_flag=False))
+        self.assertLessEqual(len(incremental.tail), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the table-driven engines in iran_encoding.core
+"""
+import json
+import os
+import unittest
+from iran_encoding import core
+
+
+def load_corpus_text():
+    """Join every string field of corpus.json into one document."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.json")
+    with open(path, encoding="utf-8") as f:
+        corpus = json.load(f)
+    return "\n".join(v for item in corpus for v in item.values() if isinstance(v, str))
+
+
+def reference_shape(script_bytes):
+    """Per-byte shaping with linear scans over the neighbour tables."""
+    result = bytearray(script_bytes)
+    length = len(script_bytes)
+    for i in range(length):
+        prev_byte = script_bytes[i - 1] if i > 0 else 0
+        next_byte = script_bytes[i + 1] if i < length - 1 else 0
+        result[i] = core._contextual_form(
+            script_bytes[i],
+            core.find_pos(prev_byte, core.PREV_CHAR_STR) >= 0,
+            core.find_pos(next_byte, core.NEXT_CHAR_STR) >= 0,
+        )
+    return bytes(result)
+
+
+class TestDecodingTable(unittest.TestCase):
+    def test_table_covers_every_byte(self):
+        """The decoding table has exactly one character per byte value"""
+        self.assertEqual(len(core.DECODING_TABLE), 256)
+
+    def test_table_matches_two_stage_chain(self):
+        """Each table entry equals the upper -> script -> wide char chain"""
+        for b in range(256):
+            with self.subTest(byte=b):
+                upper = core.iransystem_to_upper(bytes([b]))
+                script = core.iransystem_to_unicode_script(upper)[0]
+                expected = chr(core.persian_script_to_unicode(script))
+                self.assertEqual(core.DECODING_TABLE[b], expected)
+
+    def test_decode_large_buffer(self):
+        """Large buffers decode byte for byte through the table"""
+        data = bytes(range(256)) * 64
+        result = core.iransystem_to_unicode(data)
+        self.assertEqual(len(result), len(data))
+        self.assertEqual(result, core.DECODING_TABLE * 64)
+
+    def test_decode_accepts_buffer_objects(self):
+        """bytearray and memoryview inputs decode like bytes"""
+        data = bytes([0xA8, 0xF3, 0x91, 0xF4])
+        self.assertEqual(core.iransystem_to_unicode(bytearray(data)), "سلام")
+        self.assertEqual(core.iransystem_to_unicode(memoryview(data)), "سلام")
+
+
+class TestShapingTables(unittest.TestCase):
+    def test_connect_flags_match_neighbour_tables(self):
+        """Joining flags mark exactly the bytes of PREV/NEXT_CHAR_STR"""
+        for b in range(256):
+            with self.subTest(byte=b):
+                self.assertEqual(core.PREV_CONNECT_FLAGS[b] == 2, b in core.PREV_CHAR_STR)
+                self.assertEqual(core.NEXT_CONNECT_FLAGS[b] == 1, b in core.NEXT_CHAR_STR)
+
+    def test_known_contextual_forms(self):
+        """Spot check the ein, he, alef and ye forms"""
+        self.assertEqual(core.SHAPING_TABLES[3][218], 227)  # medial ein
+        self.assertEqual(core.SHAPING_TABLES[1][218], 228)  # initial ein
+        self.assertEqual(core.SHAPING_TABLES[0][229], 249)  # final he
+        self.assertEqual(core.SHAPING_TABLES[2][199], 145)  # connected alef
+        self.assertEqual(core.SHAPING_TABLES[0][237], 253)  # isolated ye
+        self.assertEqual(core.SHAPING_TABLES[0][ord('5')], 0x85)  # digit
+
+    def test_shape_script_matches_reference_on_corpus(self):
+        """Table shaping is byte-identical to the per-byte rules"""
+        text = load_corpus_text()
+        script = bytes(core.unicode_to_persian_script(ord(c)) for c in text)
+        for data in (script, core.reverse_alpha_numeric(script)):
+            self.assertEqual(core.shape_script(data), reference_shape(data))
+
+    def test_shape_script_edges(self):
+        """Empty and single-byte inputs shape without neighbours"""
+        self.assertEqual(core.shape_script(b""), b"")
+        self.assertEqual(core.shape_script(bytes([218])), bytes([225]))
+        self.assertEqual(core.shape_script(bytes([0xD3, 0xE1, 0xC7, 0xE3])),
+                         bytes([0xA8, 0xF3, 0x91, 0xF4]))
+
+
+class TestEncodePipeline(unittest.TestCase):
+    def test_script_bytes_match_per_character_mapping(self):
+        """The translate table agrees with unicode_to_persian_script"""
+        text = load_corpus_text() + "".join(chr(c) for c in core.WIDE_CHAR_STR)
+        text += "\u00e9\u0623\u0660\U0001F600\ud800"
+        expected = bytes(core.unicode_to_persian_script(ord(c)) for c in text)
+        self.assertEqual(core.unicode_to_persian_script_bytes(text), expected)
+
+    def test_reverse_alpha_numeric_runs(self):
+        """Only printable ASCII runs longer than one byte are reversed"""
+        self.assertEqual(core.reverse_alpha_numeric(b"\xd3abc\xd3"), b"\xd3cba\xd3")
+        self.assertEqual(core.reverse_alpha_numeric(b"\xd3 \xd3"), b"\xd3 \xd3")
+        self.assertEqual(core.reverse_alpha_numeric(b"ab\ncd"), b"ba\ndc")
+        self.assertEqual(core.reverse_alpha_numeric(b""), b"")
+
+    def test_unicode_to_iransystem_on_corpus(self):
+        """The fused pipeline equals mapping, reversal and shaping in turn"""
+        text = load_corpus_text()
+        script = bytes(core.unicode_to_persian_script(ord(c)) for c in text)
+        self.assertEqual(core.unicode_to_iransystem(text, reverse_flag=False),
+                         reference_shape(script))
+        self.assertEqual(core.unicode_to_iransystem(text),
+                         reference_shape(core.reverse_alpha_numeric(script)))
+
+
+class TestWordEncoder(unittest.TestCase):
+    def test_words_shape_independently(self):
+        """The table properties WordEncoder relies on"""
+        printable = range(0x20, 0x7F)
+        for b in printable:
+            self.assertEqual((core.PREV_CONNECT_FLAGS[b], core.NEXT_CONNECT_FLAGS[b]), (0, 0))
+            self.assertEqual(len({table[b] for table in core.SHAPING_TABLES}), 1)
+        for b in set(range(256)) - set(printable):
+            for table in core.SHAPING_TABLES:
+                self.assertNotIn(table[b], printable)
+
+    def test_matches_unicode_to_iransystem(self):
+        text = load_corpus_text()
+        extra = "abc ۱۲۳ 45  x\u00e9\U0001F600 سلام.  \n"
+        encoder = core.WordEncoder()
+        for value in (text, text + extra + text, extra, " ", ""):
+            for reverse_flag in (True, False):
+                with self.subTest(value=value[:20], reverse_flag=reverse_flag):
+                    self.assertEqual(encoder(value, reverse_flag),
+                                     core.unicode_to_iransystem(value, reverse_flag))
+
+    def test_bounded_vocabulary(self):
+        text = load_corpus_text()
+        encoder = core.WordEncoder(max_words=50)
+        for _ in range(2):
+            self.assertEqual(encoder(text), core.unicode_to_iransystem(text))
+            self.assertEqual(len(encoder.words), 50)
+        words = text.split(" ")
+        self.assertEqual(encoder(words[0]), core.unicode_to_iransystem(words[0]))
+        self.assertLessEqual(len(encoder.words), 50)
+        self.assertEqual(core.WordEncoder(max_words=0)(text), core.unicode_to_iransystem(text))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the DBF reader and writer
+"""
+import datetime
+import io
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+import iran_encoding
+from iran_encoding import records
+from iran_encoding.dbf import DBFField, DBFReader, DBFWriter
+
+FIELDS = [
+    DBFField('NAME', 'C', 20),
+    DBFField('CITY', 'C', 10),
+    DBFField('BALANCE', 'N', 10, 2),
+    DBFField('COUNT', 'N', 5),
+    DBFField('OPENED', 'D', 8),
+    DBFField('ACTIVE', 'L', 1),
+]
+
+ROWS = [
+    {'NAME': 'شرکت نمونه', 'CITY': 'تهران', 'BALANCE': 1250.5, 'COUNT': 12,
+     'OPENED': datetime.date(1999, 3, 21), 'ACTIVE': True},
+    {'NAME': 'Acme Ltd', 'CITY': 'قم 2', 'BALANCE': -3.25, 'COUNT': 0,
+     'OPENED': None, 'ACTIVE': False},
+    {'NAME': 'علی', 'CITY': None, 'BALANCE': None, 'COUNT': None,
+     'OPENED': datetime.date(2024, 1, 5), 'ACTIVE': None},
+]
+
+
+def read_back(text):
+    """The value a character field holding text reads back as."""
+    return iran_encoding.decode(iran_encoding.encode(text)).strip(records.PADDING)
+
+
+def expected_row(row):
+    row = dict(row)
+    for name in ('NAME', 'CITY'):
+        row[name] = read_back(row[name] or "")
+    return row
+
+
+class TestDBF(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "TABLE.DBF")
+        with DBFWriter(self.path, FIELDS) as table:
+            table.write_many(ROWS)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        with DBFReader(self.path) as table:
+            self.assertEqual(len(table), len(ROWS))
+            self.assertEqual([field.name for field in table.fields], [field.name for field in FIELDS])
+            self.assertEqual(list(table), [expected_row(row) for row in ROWS])
+            self.assertEqual(table.column('COUNT'), [12, 0, None])
+            self.assertEqual(table.last_update, datetime.date.today())
+
+    def test_file_layout(self):
+        """The file follows the dBase III layout other tools expect"""
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        version, _, _, _, count, header_size, record_size = struct.unpack('<BBBBIHH', data[:12])
+        self.assertEqual((version, count), (0x03, 3))
+        self.assertEqual(header_size, 32 + 32 * len(FIELDS) + 1)
+        self.assertEqual(record_size, 1 + sum(field.length for field in FIELDS))
+        self.assertEqual(data[header_size - 1:header_size], b"\r")
+        self.assertEqual(len(data), header_size + 3 * record_size + 1)
+        self.assertEqual(data[-1:], b"\x1a")
+        first = data[header_size:header_size + record_size]
+        self.assertEqual(first[:1], b" ")
+        self.assertEqual(first[1:21], iran_encoding.encode('شرکت نمونه').ljust(20))
+        self.assertEqual(first[31:41], b"   1250.50")
+
+    def test_projection(self):
+        """Only the selected fields are decoded"""
+        decoded = []
+
+        def counting_decode(data):
+            decoded.append(len(data))
+            return iran_encoding.decode(data)
+
+        with mock.patch.object(records, 'decode', counting_decode):
+            with DBFReader(self.path, fields=['CITY', 'COUNT']) as table:
+                rows = list(table)
+        self.assertEqual(rows, [{'CITY': read_back(row['CITY'] or ""), 'COUNT': row['COUNT']} for row in ROWS])
+        # One call for the CITY column chunk, none for NAME.
+        self.assertEqual(decoded, [3 * 10])
+        with self.assertRaises(KeyError):
+            DBFReader(self.path, fields=['PHONE'])
+
+    def test_impossible_header_date(self):
+        """A header date no calendar has does not make the table unreadable"""
+        for month, day in ((13, 1), (2, 31)):
+            with self.subTest(month=month, day=day):
+                with open(self.path, 'r+b') as f:
+                    f.seek(2)
+                    f.write(bytes([month, day]))
+                with DBFReader(self.path) as table:
+                    self.assertIsNone(table.last_update)
+                    self.assertEqual(len(list(table)), len(ROWS))
+
+    def test_unparseable_values(self):
+        """A malformed number or date reads back as its bytes"""
+        with open(self.path, 'r+b') as f:
+            header_size = struct.unpack('<H', f.read(10)[8:10])[0]
+            # BALANCE, COUNT and OPENED of the first record.
+            f.seek(header_size + 31)
+            f.write(b"**********" + b"  1x3" + b"20241301")
+        with DBFReader(self.path) as table:
+            first = next(iter(table))
+            self.assertEqual(len(list(table)), len(ROWS))
+        self.assertEqual((first['BALANCE'], first['COUNT'], first['OPENED']),
+                         (b"**********", b"1x3", b"20241301"))
+
+    def test_numbers_round_to_decimals(self):
+        self.assertEqual(DBFField('COUNT', 'N', 5).format(12.7), b"   13")
+        self.assertEqual(DBFField('COUNT', 'N', 5).format(-2.4), b"   -2")
+        self.assertEqual(DBFField('BALANCE', 'N', 6, 1).format(2.25), b"   2.2")
+
+    def test_deleted_records(self):
+        with open(self.path, 'r+b') as f:
+            header_size, record_size = struct.unpack('<HH', f.read(12)[8:12])
+            f.seek(header_size + record_size)
+            f.write(b"*")
+        with DBFReader(self.path, fields=['COUNT']) as table:
+            self.assertEqual(list(table), [{'COUNT': 12}, {'COUNT': None}])
+            self.assertEqual(table.column('COUNT'), [12, None])
+            self.assertEqual(table.column('COUNT', include_deleted=True), [12, 0, None])
+        with DBFReader(self.path, fields=['COUNT'], include_deleted=True) as table:
+            self.assertEqual(len(list(table)), 3)
+
+    def test_file_objects(self):
+        buffer = io.BytesIO()
+        with DBFWriter(buffer, FIELDS[:2], visual_ordering=False) as table:
+            table.write(['سلام 12', 'AB'])
+        self.assertFalse(buffer.closed)
+        self.assertEqual(buffer.getvalue()[-32:],
+                         b" " + iran_encoding.encode('سلام 12', False).ljust(20) + b"AB".ljust(10) + b"\x1a")
+
+        with open(self.path, 'rb') as f:
+            with DBFReader(f, fields=['NAME']) as table:
+                self.assertEqual(next(iter(table)), {'NAME': read_back('شرکت نمونه')})
+
+    def test_invalid_values(self):
+        with DBFWriter(io.BytesIO(), FIELDS) as table:
+            with self.assertRaises(ValueError):
+                table.write({'NAME': 'x' * 21})
+            with self.assertRaises(ValueError):
+                table.write({'COUNT': 123456})
+            with self.assertRaises(ValueError):
+                table.write(['too few'])
+        with self.assertRaises(ValueError):
+            DBFWriter(io.BytesIO(), [DBFField('A_VERY_LONG_NAME', 'C', 5)])
+
+    def test_not_a_dbf_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b"abc")
+        with self.assertRaises(ValueError):
+            DBFReader(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -192,6 +192,24 @@ class TestEncodingFunctions(unittest.TestCase):
                     # which is expected behavior
                     pass
 
+    def test_ascii_fast_paths(self):
+        """Pure ASCII input round-trips unchanged on both paths"""
+        for text in ["SKU-12345", "09121234567", "a b\tc\n", "\x00\x7f"]:
+            with self.subTest(text=text):
+                self.assertEqual(encode(text), text.encode("ascii"))
+                self.assertEqual(decode(text.encode("ascii")), text)
+                self.assertEqual(decode(bytearray(text, "ascii")), text)
+
+    def test_ascii_decode_matches_iran_system_table(self):
+        """The ASCII shortcut agrees with the full decoding table"""
+        from iran_encoding.core import iransystem_to_unicode
+        data = bytes(range(128))
+        self.assertEqual(decode(data), iransystem_to_unicode(data))
+
+    def test_english_locale_with_unmappable_characters(self):
+        """Non-ASCII English text converts digits and replaces the rest"""
+        self.assertEqual(encode("Hello ۱۲۳ é"), b"Hello 123 ?")
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the vectorized NumPy conversions in iran_encoding.numpy
+"""
+import random
+import unittest
+
+import iran_encoding
+from iran_encoding import core
+
+try:
+    import numpy as np
+    from iran_encoding.numpy import decode_array, encode_array
+except ImportError:
+    np = None
+
+from tests.test_core import load_corpus_text
+
+
+def random_records(count, seed=0):
+    """Mixed Persian, English, digit and edge case records of varied length."""
+    rnd = random.Random(seed)
+    alphabet = load_corpus_text() + "".join(chr(c) for c in core.WIDE_CHAR_STR)
+    alphabet += "۰۱۲۳۴۵۶۷۸۹ ABC abc 123 -/.\té€\U0001F600"
+    records = []
+    for _ in range(count):
+        length = rnd.randint(0, 30)
+        records.append("".join(rnd.choice(alphabet) for _ in range(length)))
+    records += ["", "abc", "۱۲۳", "سلام", "SKU-123 کالا", "a b", "سلام 12 ab"]
+    return records
+
+
+@unittest.skipIf(np is None, "NumPy not installed")
+class TestNumpy(unittest.TestCase):
+    def setUp(self):
+        self.records = random_records(3000)
+        self.column = np.array(self.records)
+
+    def test_encode_matches_encode(self):
+        """Every element encodes exactly as iran_encoding.encode encodes it"""
+        for visual_ordering in (True, False):
+            with self.subTest(visual_ordering=visual_ordering):
+                encoded = encode_array(self.column, visual_ordering)
+                self.assertEqual(encoded.dtype, np.dtype(f'S{self.column.dtype.itemsize // 4}'))
+                self.assertEqual(encoded.tolist(),
+                                 [iran_encoding.encode(text, visual_ordering) for text in self.records])
+
+    def test_decode_matches_decode(self):
+        """Every element decodes exactly as iran_encoding.decode decodes it"""
+        encoded = np.array([iran_encoding.encode(text) for text in self.records])
+        decoded = decode_array(encoded)
+        self.assertEqual(decoded.dtype, np.dtype(f'U{encoded.dtype.itemsize}'))
+        self.assertEqual(decoded.tolist(), [iran_encoding.decode(value) for value in encoded.tolist()])
+
+        # Every byte value, including those that only appear in legacy files.
+        all_bytes = np.array([bytes([b, 0x41]) for b in range(1, 256)])
+        self.assertEqual(decode_array(all_bytes).tolist(),
+                         [iran_encoding.decode(bytes([b, 0x41])) for b in range(1, 256)])
+
+    def test_uint8_records(self):
+        """uint8 arrays hold one record per row of their last axis"""
+        encoded = encode_array(self.column)
+        rows = encoded.view(np.uint8).reshape(len(encoded), -1)
+        self.assertEqual(decode_array(rows).tolist(), decode_array(encoded).tolist())
+        self.assertEqual(decode_array(np.frombuffer(b"\xa8\xf3\x91\xf4", dtype=np.uint8)).item(),
+                         iran_encoding.decode(b"\xa8\xf3\x91\xf4"))
+        with self.assertRaises(ValueError):
+            decode_array(np.uint8(5))
+
+    def test_shapes_and_padding(self):
+        """Arrays keep their shape and trailing padding does not change the result"""
+        grid = np.array([["سلام", "abc"], ["ABC 12", "کتاب"]], dtype='U10')
+        encoded = encode_array(grid)
+        self.assertEqual(encoded.shape, (2, 2))
+        self.assertEqual(encoded[1, 1], iran_encoding.encode("کتاب"))
+        self.assertEqual(decode_array(encoded)[0, 0], iran_encoding.decode(iran_encoding.encode("سلام")))
+
+        strided = self.column[::3]
+        self.assertEqual(encode_array(strided).tolist(), [iran_encoding.encode(text) for text in self.records[::3]])
+
+    def test_empty_input(self):
+        self.assertEqual(encode_array(np.array([], dtype='U5')).shape, (0,))
+        self.assertEqual(decode_array(np.array([], dtype='S5')).shape, (0,))
+        self.assertEqual(encode_array(np.array(["", ""])).tolist(), [b"", b""])
+        self.assertEqual(decode_array(np.zeros((3, 0), np.uint8)).tolist(), ["", "", ""])
+
+    def test_non_native_byte_order(self):
+        for dtype in ('>U4', '<U4'):
+            with self.subTest(dtype=dtype):
+                self.assertEqual(encode_array(np.array(["سلام", "abc"], dtype=dtype)).tolist(),
+                                 [iran_encoding.encode("سلام"), b"abc"])
+
+    def test_wrong_dtype(self):
+        with self.assertRaises(TypeError):
+            encode_array(np.array([b"abc"]))
+        with self.assertRaises(TypeError):
+            decode_array(np.array([1.5]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the memory-mapped fixed-width record reader
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import iran_encoding
+from iran_encoding import records
+from iran_encoding.records import Field, RecordFile, RecordLayout
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LAYOUT = RecordLayout([
+    Field('name', 0, 12),
+    Field('city', 12, 8),
+    Field('amount', 20, 6, iran_system=False),
+], record_size=28)
+
+ROWS = [
+    ("علی رضایی", "تهران", b"1200"),
+    ("شرکت نمونه", "شیراز", b"35"),
+    ("Acme Ltd", "قم", b"999999"),
+    ("", "کرج 2", b""),
+]
+
+
+def pack(rows, header=b"", trailer=b""):
+    """Encode rows into a fixed-width file image as a DOS program would."""
+    data = bytearray(header)
+    for name, city, amount in rows:
+        data += iran_encoding.encode(name).ljust(12)
+        data += iran_encoding.encode(city).ljust(8)
+        data += amount.rjust(6)
+        data += b"\r\n"
+    return bytes(data + trailer)
+
+
+class TestRecordFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "DATA.DAT")
+        self.write(pack(ROWS))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def expected(self, text):
+        """The value read back from a field holding text."""
+        return iran_encoding.decode(iran_encoding.encode(text)).strip(records.PADDING)
+
+    def test_fields(self):
+        with RecordFile(self.path, LAYOUT) as reader:
+            self.assertEqual(len(reader), len(ROWS))
+            for record, (name, city, amount) in zip(reader, ROWS):
+                self.assertEqual(record['name'], self.expected(name))
+                self.assertEqual(record['city'], self.expected(city))
+                self.assertEqual(record['amount'], amount)
+            self.assertEqual(reader[-1].as_dict(['city']), {'city': self.expected("کرج 2")})
+            self.assertEqual(reader[0].raw('amount'), b"  1200")
+            self.assertEqual(reader.raw(1, 'name'), iran_encoding.encode("شرکت نمونه").ljust(12))
+            self.assertEqual([r['amount'] for r in reader[1:3]], [b"35", b"999999"])
+            with self.assertRaises(IndexError):
+                reader[len(ROWS)]
+            with self.assertRaises(KeyError):
+                reader[0]['phone']
+
+    def test_untouched_fields_are_not_decoded(self):
+        """Only the fields that are read go through decode"""
+        decoded = []
+
+        def counting_decode(data):
+            decoded.append(bytes(data))
+            return iran_encoding.decode(data)
+
+        with mock.patch.object(records, 'decode', counting_decode):
+            with RecordFile(self.path, LAYOUT) as reader:
+                list(reader)
+                self.assertEqual(decoded, [])
+                self.assertEqual(reader[1]['city'], self.expected("شیراز"))
+        self.assertEqual(decoded, [iran_encoding.encode("شیراز").ljust(8)])
+
+    def test_columns(self):
+        with RecordFile(self.path, LAYOUT) as reader:
+            self.assertEqual(reader.column('name'), [self.expected(row[0]) for row in ROWS])
+            self.assertEqual(reader.column('amount', 1, 3), [b"35", b"999999"])
+            with mock.patch.object(records, 'CHUNK_RECORDS', 3):
+                self.assertEqual(list(reader.iter_column('city')), [self.expected(row[1]) for row in ROWS])
+            self.assertEqual(reader.column('city', 5), [])
+
+    def test_header_and_trailer(self):
+        """Header bytes are skipped and a trailing partial record is ignored"""
+        self.write(pack(ROWS, header=b"HEADER", trailer=b"\x1a"))
+        with RecordFile(self.path, LAYOUT, header_size=6) as reader:
+            self.assertEqual(len(reader), len(ROWS))
+            self.assertEqual(reader.column('amount')[-1], b"")
+
+    def test_unstripped_field(self):
+        layout = RecordLayout([Field('name', 0, 12, strip=False)], record_size=28)
+        with RecordFile(self.path, layout) as reader:
+            self.assertEqual(reader[2]['name'], "Acme Ltd    ")
+            self.assertEqual(reader.column('name')[2], "Acme Ltd    ")
+
+    def test_empty_file_and_file_object(self):
+        self.write(b"")
+        with RecordFile(self.path, LAYOUT) as reader:
+            self.assertEqual(len(reader), 0)
+            self.assertEqual(list(reader), [])
+            self.assertEqual(reader.column('name'), [])
+
+        self.write(pack(ROWS))
+        with open(self.path, 'rb') as f:
+            with RecordFile(f, LAYOUT) as reader:
+                self.assertEqual(reader[0]['amount'], b"1200")
+            self.assertFalse(f.closed)
+
+    def test_invalid_layout(self):
+        with self.assertRaises(ValueError):
+            RecordLayout([Field('a', 0, 4), Field('a', 4, 4)])
+        with self.assertRaises(ValueError):
+            RecordLayout([Field('a', 0, 4)], record_size=3)
+        with self.assertRaises(ValueError):
+            Field('a', 0, 0)
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def test_array(self):
+        with RecordFile(self.path, LAYOUT) as reader:
+            names = reader.array('name')
+            self.assertEqual([name.strip() for name in names.tolist()],
+                             [self.expected(row[0]) for row in ROWS])
+            self.assertEqual(reader.array('amount', 1, 2).tolist(), [b"    35"])
+            self.assertEqual(reader.array('city', 4).shape, (0,))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the local conversion server
+"""
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import iran_encoding
+from iran_encoding.server import ConversionServer
+
+TEXTS = ["سلام دنیا", "hello 123", "شماره ۱۲ و Iran System", ""]
+
+
+async def request(address, method, path, payload=None, raw_body=None):
+    """Send one HTTP request and return the status and decoded JSON answer."""
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+    body = raw_body if raw_body is not None else b"" if payload is None else json.dumps(payload).encode('utf-8')
+    writer.write(f"{method} {path} HTTP/1.1\r\nConnection: close\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # A short delay so that concurrent requests share a batch.
+        self.server = ConversionServer(max_delay=0.02)
+        self.address = await self.server.start(port=0)
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_encode_and_decode(self):
+        status, answer = await request(self.address, 'POST', '/encode', {'text': TEXTS[0]})
+        self.assertEqual(status, 200)
+        self.assertEqual(answer['hex'], iran_encoding.encode(TEXTS[0]).hex())
+        self.assertEqual(set(answer['latency_ms']), {'queued', 'convert', 'total'})
+
+        status, answer = await request(self.address, 'POST', '/encode', {'text': TEXTS, 'visual_ordering': False})
+        self.assertEqual(answer['hex'], [iran_encoding.encode(text, False).hex() for text in TEXTS])
+
+        encoded = [iran_encoding.encode(text).hex() for text in TEXTS]
+        status, answer = await request(self.address, 'POST', '/decode', {'hex': encoded})
+        self.assertEqual(answer['text'], [iran_encoding.decode(bytes.fromhex(data)) for data in encoded])
+
+    async def test_concurrent_requests_share_batches(self):
+        answers = await asyncio.gather(*(request(self.address, 'POST', '/encode', {'text': text})
+                                         for text in TEXTS * 5))
+        self.assertEqual([answer['hex'] for _, answer in answers],
+                         [iran_encoding.encode(text).hex() for text in TEXTS * 5])
+        self.assertGreater(max(answer['batch_size'] for _, answer in answers), 1)
+
+        status, metrics = await request(self.address, 'GET', '/metrics')
+        self.assertEqual(status, 200)
+        self.assertEqual(metrics['requests'], len(TEXTS) * 5)
+        self.assertGreater(metrics['mean_batch_size'], 1)
+        self.assertIsNotNone(metrics['latency_ms']['p99'])
+
+    async def test_bad_requests(self):
+        cases = [
+            (('POST', '/encode'), {'raw_body': b"{not json"}, 400),
+            (('POST', '/encode'), {'payload': {'text': 12}}, 400),
+            (('POST', '/encode'), {'payload': {'text': 'a', 'visual_ordering': 'yes'}}, 400),
+            (('POST', '/decode'), {'payload': {'hex': 'zz'}}, 400),
+            (('GET', '/encode'), {}, 405),
+            (('GET', '/nothing'), {}, 404),
+        ]
+        for (method, path), kwargs, expected in cases:
+            with self.subTest(path=path, kwargs=kwargs):
+                status, answer = await request(self.address, method, path, **kwargs)
+                self.assertEqual(status, expected)
+                self.assertIn('error', answer)
+        status, metrics = await request(self.address, 'GET', '/metrics')
+        self.assertEqual(metrics['errors'], len(cases))
+
+    async def test_keep_alive(self):
+        reader, writer = await asyncio.open_connection(*self.address)
+        for text in TEXTS[:2]:
+            body = json.dumps({'text': text}).encode('utf-8')
+            writer.write(b"POST /encode HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+            answer = json.loads(await reader.readexactly(length))
+            self.assertEqual(answer['hex'], iran_encoding.encode(text).hex())
+        writer.close()
+
+
+class TestUnixSocket(unittest.IsolatedAsyncioTestCase):
+    async def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "serve.sock")
+            server = ConversionServer()
+            self.assertEqual(await server.start(path=path), path)
+            try:
+                status, answer = await request(path, 'POST', '/encode', {'text': TEXTS[0]})
+                self.assertEqual(answer['hex'], iran_encoding.encode(TEXTS[0]).hex())
+            finally:
+                await server.close()
+            self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
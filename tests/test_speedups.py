@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the native iran_encoding._speedups extension
+"""
+import mmap
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+from iran_encoding import core
+
+try:
+    from iran_encoding import _speedups
+except ImportError:
+    _speedups = None
+
+from tests.test_core import load_corpus_text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@unittest.skipIf(_speedups is None, "native extension not built")
+class TestSpeedups(unittest.TestCase):
+    def setUp(self):
+        self.text = load_corpus_text()
+        self.edge_text = "".join(chr(c) for c in core.WIDE_CHAR_STR)
+        self.edge_text += "abc 123\n\t\x00éأ٠\U0001F600\ud800"
+
+    def test_encode_matches_core(self):
+        """unicode_to_iransystem is byte-identical to the Python core"""
+        for text in (self.text, self.edge_text, "", "سلام"):
+            for reverse_flag in (True, False):
+                with self.subTest(length=len(text), reverse_flag=reverse_flag):
+                    self.assertEqual(
+                        _speedups.unicode_to_iransystem(text, reverse_flag=reverse_flag),
+                        core.unicode_to_iransystem(text, reverse_flag=reverse_flag))
+
+    def test_script_bytes_match_core(self):
+        """script_bytes_to_iransystem accepts buffers and matches the core"""
+        script = core.unicode_to_persian_script_bytes(self.text + self.edge_text)
+        for data in (script, bytearray(script), memoryview(script)):
+            self.assertEqual(_speedups.script_bytes_to_iransystem(data),
+                             core.script_bytes_to_iransystem(script))
+
+    def test_decode_matches_core(self):
+        """iransystem_to_unicode matches the core for every byte value"""
+        data = bytes(range(256)) * 64
+        self.assertEqual(_speedups.iransystem_to_unicode(data), core.iransystem_to_unicode(data))
+        for value in (b"", b"abc", bytes([0xA8, 0xF3, 0x91, 0xF4]), bytes([0xC6])):
+            with self.subTest(value=value):
+                decoded = _speedups.iransystem_to_unicode(value)
+                self.assertEqual(decoded, core.iransystem_to_unicode(value))
+                self.assertEqual(hash(decoded), hash(core.iransystem_to_unicode(value)))
+
+    def test_decode_buffer_objects(self):
+        """bytearray, memoryview and mmap inputs are read in place"""
+        encoded = core.unicode_to_iransystem(self.text)
+        expected = core.iransystem_to_unicode(encoded)
+        self.assertEqual(_speedups.iransystem_to_unicode(bytearray(encoded)), expected)
+        self.assertEqual(_speedups.iransystem_to_unicode(memoryview(encoded)[1:]), expected[1:])
+        with tempfile.TemporaryFile() as f:
+            f.write(encoded)
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                self.assertEqual(_speedups.iransystem_to_unicode(mapped), expected)
+
+    def test_threads_share_the_extension(self):
+        """Concurrent large conversions give the same results"""
+        text = self.text * 20
+        expected = core.unicode_to_iransystem(text)
+        results = []
+
+        def work():
+            encoded = _speedups.unicode_to_iransystem(text)
+            results.append((encoded, _speedups.iransystem_to_unicode(encoded)))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for encoded, decoded in results:
+            self.assertEqual(encoded, expected)
+            self.assertEqual(decoded, core.iransystem_to_unicode(expected))
+
+    def test_rejects_wrong_types(self):
+        """Type errors are raised like any builtin function"""
+        with self.assertRaises(TypeError):
+            _speedups.unicode_to_iransystem(b"abc")
+        with self.assertRaises(TypeError):
+            _speedups.iransystem_to_unicode("abc")
+
+
+class TestFallback(unittest.TestCase):
+    def test_package_works_without_extension(self):
+        """The package falls back to core.py when _speedups is missing"""
+        code = (
+            "import sys; sys.modules['iran_encoding._speedups'] = None\n"
+            "import iran_encoding\n"
+            "assert iran_encoding.backends.get_default_backend() == 'python'\n"
+            "assert iran_encoding.backends.get_backend('python').unicode_to_iransystem"
+            " is iran_encoding.core.unicode_to_iransystem\n"
+            "print(iran_encoding.encode('\\u0633\\u0644\\u0627\\u0645').hex())\n"
+        )
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        self.assertEqual(output.strip(), "a8f391f4")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the start-up cost of the package and the command-line interface
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Budgets for the cumulative import time reported by -X importtime, in
+# microseconds. `import iran_encoding` takes about 3 ms and
+# `import iran_encoding.cli` about 15 ms (mostly argparse) on a laptop; the
+# budgets leave room for slow CI machines while still catching a heavy
+# module being imported eagerly again.
+PACKAGE_BUDGET_US = 15_000
+CLI_BUDGET_US = 60_000
+
+# Modules that the plain package import must not pull in. They are only
+# needed by some functions and are imported there.
+DEFERRED_MODULES = (
+    're', 'typing', 'json', 'platform', 'timeit', 'threading', 'enum',
+    'collections', 'array', 'ctypes', 'ast', 'argparse', 'numpy',
+)
+
+
+def import_times(statement):
+    """
+    Run statement under -X importtime in a fresh interpreter and return
+    {module: cumulative microseconds} for the modules it imported.
+
+    Bytecode is cached in a private directory and the statement is run once
+    beforehand, so compiling the sources does not count against the budget.
+    """
+    with tempfile.TemporaryDirectory() as pycache:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+        def run(code):
+            stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                                    check=True, capture_output=True, text=True).stderr
+            times = {}
+            for line in stderr.splitlines():
+                if line.startswith("import time:") and "|" in line:
+                    _, cumulative, name = line.split("|")
+                    if cumulative.strip().isdigit():
+                        times[name.strip()] = int(cumulative)
+            return times
+
+        run(statement)
+        interpreter = run("pass")
+        # The fastest of a few runs, to keep the check stable on busy machines.
+        runs = [run(statement) for _ in range(3)]
+    best = min(runs, key=lambda times: sum(times.values()))
+    return {name: cost for name, cost in best.items() if name not in interpreter}
+
+
+class TestStartup(unittest.TestCase):
+    def test_package_import(self):
+        times = import_times("import iran_encoding")
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, times, f"import iran_encoding imports {module}")
+        self.assertLess(times['iran_encoding'], PACKAGE_BUDGET_US)
+
+    def test_cli_import(self):
+        times = import_times("import iran_encoding.cli")
+        for module in ('ast', 'json', 'ctypes', 'typing'):
+            self.assertNotIn(module, times, f"import iran_encoding.cli imports {module}")
+        self.assertLess(times['iran_encoding.cli'], CLI_BUDGET_US)
+
+    def test_deferred_imports_still_work(self):
+        """Functions relying on deferred modules import them on first use"""
+        code = (
+            "import sys, iran_encoding\n"
+            "assert 're' not in sys.modules\n"
+            "assert iran_encoding.detect_locale('سلام') == 'fa'\n"
+            "assert iran_encoding.PERSIAN_LETTERS_PATTERN.search('سلام')\n"
+            "assert iran_encoding.encode('سلام ABC') == iran_encoding.core.unicode_to_iransystem('سلام ABC')\n"
+            "buffer, offsets = iran_encoding.encode_many(['ab', 'سلام'], concatenate=True)\n"
+            "assert list(offsets) == [0, 2, 6]\n"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
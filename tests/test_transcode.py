@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the file transcoder
+"""
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from iran_encoding import codec, core, transcode
+from iran_encoding.transcode import transcode_file
+from tests.test_core import load_corpus_text
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestTranscode(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        # Repeat the corpus so small chunks cut it in many places.
+        self.text = (load_corpus_text() + "\nسطر آخر بدون شکست 12 abc") * 3
+        self.utf8 = self.path("text.txt", self.text.encode('utf-8'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name, data=None):
+        path = os.path.join(self.directory.name, name)
+        if data is not None:
+            with open(path, 'wb') as f:
+                f.write(data)
+        return path
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_encode_matches_whole_text(self):
+        """Line-aligned chunks give the output of converting the whole text"""
+        for visual in (True, False):
+            expected = core.unicode_to_iransystem(self.text, visual)
+            for chunk_size in (1, 7, 100, 1 << 20):
+                with self.subTest(visual=visual, chunk_size=chunk_size):
+                    out = self.path("out.is")
+                    written = transcode_file(self.utf8, out, 'utf-8', 'iran_system',
+                                             visual_ordering=visual, chunk_size=chunk_size)
+                    self.assertEqual(self.read(out), expected)
+                    self.assertEqual(written, len(expected))
+
+    def test_encode_without_line_breaks(self):
+        """Text without line breaks is carried in bounded pieces"""
+        text = self.text.replace("\n", " ")
+        source = self.path("flat.txt", text.encode('utf-8'))
+        out = self.path("flat.is")
+        transcode_file(source, out, 'utf-8', 'iran_system', chunk_size=100)
+        self.assertEqual(self.read(out), core.unicode_to_iransystem(text))
+
+        ascii_text = "abc " * (codec.MAX_PENDING // 2)
+        source = self.path("ascii.txt", ascii_text.encode('ascii'))
+        written = transcode_file(source, out, 'utf-8', 'iran_system_logical', chunk_size=4096)
+        self.assertEqual(self.read(out), ascii_text.encode('ascii'))
+        self.assertEqual(written, len(ascii_text))
+
+    def test_decode(self):
+        data = core.unicode_to_iransystem(self.text)
+        source = self.path("in.is", data)
+        for chunk_size in (3, 1 << 20):
+            out = self.path("out.txt")
+            transcode_file(source, out, 'iran_system', 'utf-8', chunk_size=chunk_size)
+            self.assertEqual(self.read(out).decode('utf-8'), core.iransystem_to_unicode(data))
+
+    def test_other_codecs(self):
+        """Multi-byte characters cut by a chunk boundary are decoded whole"""
+        source = self.path("in.utf16", self.text.encode('utf-16'))
+        out = self.path("out.is")
+        transcode_file(source, out, 'utf-16', 'iran_system_logical', chunk_size=5)
+        self.assertEqual(self.read(out), core.unicode_to_iransystem(self.text, False))
+
+        transcode_file(self.utf8, out, 'utf-8', 'utf-16', chunk_size=5)
+        self.assertEqual(self.read(out), self.text.encode('utf-16'))
+
+    def test_parallel_matches_serial(self):
+        """Worker processes produce the bytes of the serial conversion"""
+        encoded = self.path("in.is", core.unicode_to_iransystem(self.text))
+        for source, from_encoding, to_encoding in ((self.utf8, 'utf-8', 'iran_system'),
+                                                   (self.utf8, 'utf-8', 'iran_system_logical'),
+                                                   (encoded, 'iran_system', 'utf-8'),
+                                                   (self.utf8, 'utf-8', 'utf-16')):
+            with self.subTest(from_encoding=from_encoding, to_encoding=to_encoding):
+                serial, parallel = self.path("serial.out"), self.path("parallel.out")
+                transcode_file(source, serial, from_encoding, to_encoding)
+                written = transcode_file(source, parallel, from_encoding, to_encoding,
+                                         chunk_size=300, jobs=2)
+                self.assertEqual(self.read(parallel), self.read(serial))
+                self.assertEqual(written, len(self.read(serial)))
+
+    def test_line_chunks(self):
+        data = b"ab\ncd\nefghij\nk"
+        self.assertEqual(list(transcode._line_chunks(data, 4)), [(0, 3), (3, 6), (6, 13), (13, 14)])
+        self.assertEqual(list(transcode._line_chunks(data, 100)), [(0, 14)])
+        self.assertEqual(list(transcode._line_chunks(b"", 4)), [])
+
+    def test_result_larger_than_block(self):
+        """A result that outgrows its shared memory block is returned directly"""
+        # Every byte becomes a six byte character reference such as &#233;.
+        source = self.path("refs.txt", b"\xe9\xe8\n" * 200)
+        serial, parallel = self.path("serial.out"), self.path("parallel.out")
+        transcode_file(source, serial, 'latin-1', 'ascii', errors='xmlcharrefreplace')
+        transcode_file(source, parallel, 'latin-1', 'ascii', errors='xmlcharrefreplace',
+                       chunk_size=100, jobs=2)
+        self.assertEqual(self.read(parallel), self.read(serial))
+
+    def test_empty_file_and_file_objects(self):
+        source = self.path("empty.txt", b"")
+        out = self.path("out.is")
+        self.assertEqual(transcode_file(source, out, 'utf-8', 'iran_system'), 0)
+        self.assertEqual(self.read(out), b"")
+
+        buffer = io.BytesIO()
+        with open(self.utf8, 'rb') as f:
+            transcode_file(f, buffer, 'utf-8', 'iran_system')
+            self.assertFalse(f.closed)
+        self.assertEqual(buffer.getvalue(), core.unicode_to_iransystem(self.text))
+
+    def test_errors(self):
+        source = self.path("bad.txt", b"ok\xff\n")
+        with self.assertRaises(UnicodeDecodeError):
+            transcode_file(source, self.path("out.is"), 'utf-8', 'iran_system')
+        transcode_file(source, self.path("out.is"), 'utf-8', 'iran_system', errors='replace')
+        with self.assertRaises(LookupError):
+            transcode_file(source, self.path("out.is"), 'no-such-codec', 'iran_system')
+        with self.assertRaises(ValueError):
+            transcode_file(source, source, 'utf-8', 'iran_system')
+
+    def test_cli(self):
+        encoded = self.path("out.is")
+        decoded = self.path("back.txt")
+        command = [sys.executable, "-m", "iran_encoding.cli", "transcode"]
+        subprocess.run(command + ["--from", "utf-8", "--to", "iran_system", self.utf8, encoded],
+                       cwd=ROOT, check=True)
+        self.assertEqual(self.read(encoded), core.unicode_to_iransystem(self.text))
+        subprocess.run(command + ["--jobs", "2", encoded, decoded], cwd=ROOT, check=True)
+        self.assertEqual(self.read(decoded).decode('utf-8'),
+                         core.iransystem_to_unicode(self.read(encoded)))
+
+        result = subprocess.run(command + ["--from", "no-such-codec", self.utf8, encoded],
+                                cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("Error:", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()